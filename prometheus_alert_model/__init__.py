@@ -2,3 +2,5 @@
 # Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
 
 from .main import Alert, AlertGroup
+from .matchers import Matcher
+from .relabel import RelabelPlan
@@ -0,0 +1,224 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+"""Command line interface. Installed as `prometheus-alert-model`.
+
+```
+prometheus-alert-model transform --rules rules.yml --timing < in.jsonl > out.jsonl
+prometheus-alert-model replay --rules rules.yml --output out.jsonl 2020-11-*.jsonl.gz
+```
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from functools import partial
+from typing import IO, Any, Callable, List, Optional, Sequence
+
+from .main import AlertGroup
+from .relabel import RelabelPlan
+from .replay import Replay, read_lines
+
+try:
+    import yaml  # type: ignore
+except ImportError:  # pragma: no cover
+    yaml = None  # type: ignore
+
+
+def _load_rules(path: str) -> List[Any]:
+    """Loads `RelabelPlan` rules from a JSON or YAML file.
+
+    YAML requires PyYAML to be installed.
+    """
+
+    with open(path, "rb") as file:
+        content = file.read()
+
+    if path.endswith((".yml", ".yaml")):
+        if yaml is None:
+            raise ValueError("Reading YAML rules requires PyYAML to be installed.")
+        return yaml.safe_load(content) or []
+
+    return json.loads(content)
+
+
+def _open_output(path: str, buffer_size: int) -> IO[bytes]:
+    if path == "-":
+        return os.fdopen(os.dup(sys.stdout.fileno()), "wb", buffering=buffer_size)
+    return open(path, "wb", buffering=buffer_size)
+
+
+def _load_plan(args: argparse.Namespace) -> Optional[RelabelPlan]:
+    return RelabelPlan(_load_rules(args.rules)) if args.rules else None
+
+
+def _replay(args: argparse.Namespace) -> int:
+    plan = _load_plan(args)
+    replay = Replay(
+        read_lines(args.files, args.buffer_size),
+        transforms=[plan.apply] if plan else [],
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        trusted=args.trusted,
+        skip_invalid=args.skip_invalid,
+    )
+
+    with _open_output(args.output, args.buffer_size) as output:
+        for line in replay:
+            output.write(line)
+            output.write(b"\n")
+
+    for number, message in replay.errors:
+        print(f"Skipped payload {number}: {message}", file=sys.stderr)
+    print(f"Replayed {replay}", file=sys.stderr)
+
+    return 0
+
+
+def _transform(args: argparse.Namespace) -> int:
+    plan = _load_plan(args)
+    parse: Callable[[bytes], AlertGroup]
+    if args.trusted:
+        parse = partial(AlertGroup.from_trusted_json, lazy_timestamps=True)
+    else:
+        parse = AlertGroup.parse_raw
+    lines = read_lines(args.files, args.buffer_size)
+    clock = time.perf_counter
+
+    stages = ("read", "parse", "transform", "serialize", "write")
+    seconds = dict.fromkeys(stages, 0.0)
+    payloads = 0
+    alerts = 0
+
+    with _open_output(args.output, args.buffer_size) as output:
+        started = clock()
+        last = started
+        for line in lines:
+            now = clock()
+            seconds["read"] += now - last
+            last = now
+
+            alert_group = parse(line)
+            now = clock()
+            seconds["parse"] += now - last
+            last = now
+
+            if plan is not None:
+                plan.apply(alert_group)
+            now = clock()
+            seconds["transform"] += now - last
+            last = now
+
+            data = alert_group.to_webhook_json()
+            now = clock()
+            seconds["serialize"] += now - last
+            last = now
+
+            output.write(data)
+            output.write(b"\n")
+            now = clock()
+            seconds["write"] += now - last
+            last = now
+
+            payloads += 1
+            alerts += len(alert_group.alerts)
+
+    if args.timing:
+        total = clock() - started
+        print(f"Transformed {payloads} payloads with {alerts} alerts", file=sys.stderr)
+        for stage in stages:
+            share = seconds[stage] / total * 100 if total else 0.0
+            print(f"{stage:>9}: {seconds[stage]:10.3f} s {share:5.1f} %", file=sys.stderr)
+        print(f"{'total':>9}: {total:10.3f} s", file=sys.stderr)
+
+    return 0
+
+
+def _add_common_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "files", nargs="*", default=["-"], help="Archives to read. Defaults to stdin."
+    )
+    parser.add_argument("--rules", help="JSON or YAML file with RelabelPlan rules.")
+    parser.add_argument("--output", default="-", help="Output file. Defaults to stdout.")
+    parser.add_argument(
+        "--trusted", action="store_true", help="Skip validation of payloads."
+    )
+    parser.add_argument(
+        "--buffer-size",
+        type=int,
+        default=1048576,
+        help="Size of read and write buffers in bytes. Defaults to 1048576.",
+    )
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="prometheus-alert-model",
+        description="Tools for Prometheus Alertmanager webhook payloads.",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    transform = subparsers.add_parser(
+        "transform",
+        help="Apply rules to a stream of payloads.",
+        description=(
+            "Reads JSONL (optionally gzip compressed) one line at a time, "
+            "applies rules and writes JSONL. Memory stays constant regardless "
+            "of the input size."
+        ),
+    )
+    _add_common_arguments(transform)
+    transform.add_argument(
+        "--timing",
+        action="store_true",
+        help="Report time spent per stage to standard error.",
+    )
+    transform.set_defaults(handler=_transform)
+
+    replay = subparsers.add_parser(
+        "replay",
+        help="Parse and transform archived payloads across processes.",
+        description=(
+            "Reads JSONL archives (optionally gzip compressed), applies rules "
+            "in parallel and writes JSONL in input order. Reports throughput "
+            "to standard error."
+        ),
+    )
+    _add_common_arguments(replay)
+    replay.add_argument(
+        "--workers", type=int, help="Number of processes. Defaults to number of CPUs."
+    )
+    replay.add_argument(
+        "--chunk-size", type=int, default=64, help="Payloads per task. Defaults to 64."
+    )
+    replay.add_argument(
+        "--skip-invalid",
+        action="store_true",
+        help="Skip payloads that fail to parse or transform instead of stopping.",
+    )
+    replay.set_defaults(handler=_replay)
+
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Runs the command line interface.
+
+    Args:
+        argv (Optional[Sequence[str]], optional): Arguments without program
+            name. Defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: Exit code.
+    """
+
+    args = _parser().parse_args(argv)
+
+    return args.handler(args)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
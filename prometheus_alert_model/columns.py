@@ -0,0 +1,274 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+from array import array
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+from typing_extensions import Literal
+
+try:
+    import numpy  # type: ignore
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .main import AlertGroup
+
+MISSING = -1
+"""Code of an element that does not exist in an alert."""
+
+
+class AlertColumns:
+    """Dictionary-encoded columnar view of annotations or labels of a group.
+
+    Every name is a row in a name × alert matrix of integer codes. A code is
+    the index of the value in `values` or `MISSING` if the alert does not
+    contain the name. Rows are NumPy arrays if NumPy is installed and
+    `array.array` otherwise. Use `AlertGroup.to_columns` to create it.
+
+    Changes to the view do not affect the alert group until `write` is called.
+
+    Args:
+        names (List[str]): Names in row order.
+        values (List[str]): Distinct values in code order.
+        rows (List[array]): One row of codes per name.
+        size (int): Number of alerts.
+        target (Literal["annotations", "labels"]): Element type of the view.
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        values: List[str],
+        rows: List[array],
+        size: int,
+        target: Literal["annotations", "labels"],
+    ) -> None:
+        self.names = names
+        self.values = values
+        self.size = size
+        self.target = target
+
+        self._name_index = {name: index for index, name in enumerate(names)}
+        self._value_index = {value: code for code, value in enumerate(values)}
+
+        self.codes: Any
+        if numpy is not None:
+            self.codes = numpy.array(rows, dtype=numpy.int32).reshape(len(rows), size)
+        else:
+            self.codes = rows
+
+    @classmethod
+    def from_group(
+        cls,
+        alert_group: "AlertGroup",
+        target: Literal["annotations", "labels"] = "labels",
+    ) -> "AlertColumns":
+        """Encodes annotations or labels of all alerts in a group.
+
+        Args:
+            alert_group (AlertGroup): Alert group to encode. Will not be mutated.
+            target (Literal["annotations", "labels"], optional): Elements to
+                encode. Defaults to "labels".
+
+        Returns:
+            AlertColumns: Columnar view of the elements.
+        """
+
+        size = len(alert_group.alerts)
+        name_index: Dict[str, int] = {}
+        value_index: Dict[str, int] = {}
+        rows: List[array] = []
+
+        for position, alert in enumerate(alert_group.alerts):
+            for name, value in alert.__dict__[target].items():
+                row = name_index.get(name)
+                if row is None:
+                    row = name_index[name] = len(rows)
+                    rows.append(array("i", [MISSING]) * size)
+
+                code = value_index.get(value)
+                if code is None:
+                    code = value_index[value] = len(value_index)
+
+                rows[row][position] = code
+
+        return cls(list(name_index), list(value_index), rows, size, target)
+
+    # --------------------------------------------------------------------------
+
+    def _code(self, value: str) -> int:
+        code = self._value_index.get(value)
+
+        if code is None:
+            code = self._value_index[value] = len(self.values)
+            self.values.append(value)
+
+        return code
+
+    def column(self, name: str) -> List[Optional[str]]:
+        """Decodes the values of a name for all alerts.
+
+        Returns:
+            List[Optional[str]]: Value per alert or `None` if the alert does
+                not contain the name.
+        """
+
+        row = self.codes[self._name_index[name]]
+
+        return [self.values[code] if code != MISSING else None for code in row]
+
+    def common(self) -> Dict[str, str]:
+        """Calculates elements that all alerts share.
+
+        Returns:
+            Dict[str, str]: Names and values that are the same in all alerts.
+        """
+
+        if self.size == 0 or not self.names:
+            return {}
+
+        if numpy is not None:
+            first = self.codes[:, 0]
+            shared = (self.codes == first[:, None]).all(axis=1) & (first != MISSING)
+            return {
+                self.names[row]: self.values[first[row]]
+                for row in numpy.flatnonzero(shared)
+            }
+
+        return {
+            name: self.values[row[0]]
+            for name, row in zip(self.names, self.codes)
+            if row[0] != MISSING and row.count(row[0]) == self.size
+        }
+
+    def counts(self, name: str) -> Dict[str, int]:
+        """Counts how many alerts carry each value of a name.
+
+        Returns:
+            Dict[str, int]: Number of alerts per value. Alerts that do not
+                contain the name are not counted.
+        """
+
+        row = self.codes[self._name_index[name]]
+
+        if numpy is not None:
+            codes, counts = numpy.unique(row[row != MISSING], return_counts=True)
+            return {self.values[code]: int(count) for code, count in zip(codes, counts)}
+
+        return {
+            self.values[code]: count
+            for code, count in Counter(row).items()
+            if code != MISSING
+        }
+
+    def positions(self, name: str, value: str) -> List[int]:
+        """Finds alerts that carry the given value for the given name.
+
+        Returns:
+            List[int]: Positions of matching alerts in the group.
+        """
+
+        row_index = self._name_index.get(name)
+        code = self._value_index.get(value)
+
+        if row_index is None or code is None:
+            return []
+
+        row = self.codes[row_index]
+
+        if numpy is not None:
+            return numpy.flatnonzero(row == code).tolist()
+
+        return [position for position, c in enumerate(row) if c == code]
+
+    # --------------------------------------------------------------------------
+
+    def set(
+        self, name: str, value: str, positions: Optional[Iterable[int]] = None
+    ) -> None:
+        """Sets the value of a name for some or all alerts.
+
+        Args:
+            name (str): Name to set. Added as new row if it does not exist.
+            value (str): Value to set.
+            positions (Optional[Iterable[int]], optional): Positions of alerts
+                to update. All alerts if `None`. Defaults to `None`.
+        """
+
+        code = self._code(value)
+        row_index = self._name_index.get(name)
+
+        if row_index is None:
+            row_index = self._name_index[name] = len(self.names)
+            self.names.append(name)
+            if numpy is not None:
+                new_row = numpy.full((1, self.size), MISSING, dtype=numpy.int32)
+                self.codes = numpy.vstack([self.codes, new_row])
+            else:
+                self.codes.append(array("i", [MISSING]) * self.size)
+
+        row = self.codes[row_index]
+
+        if positions is None:
+            row[:] = code if numpy is not None else array("i", [code]) * self.size
+        elif numpy is not None:
+            row[list(positions)] = code
+        else:
+            for position in positions:
+                row[position] = code
+
+    def remove(self, name: str) -> None:
+        """Removes a name from all alerts. Ignored if the name does not exist."""
+
+        row_index = self._name_index.pop(name, None)
+
+        if row_index is None:
+            return
+
+        del self.names[row_index]
+        if numpy is not None:
+            self.codes = numpy.delete(self.codes, row_index, axis=0)
+        else:
+            del self.codes[row_index]
+
+        self._name_index = {name: index for index, name in enumerate(self.names)}
+
+    def write(self, alert_group: "AlertGroup") -> None:
+        """Writes the view back into the alert group it was created from.
+
+        Replaces the elements of every alert, updates common elements from
+        the columns and drops memoized specific elements.
+
+        Args:
+            alert_group (AlertGroup): Alert group the view was created from.
+
+        Raises:
+            ValueError: If the number of alerts changed in the meantime.
+        """
+
+        if len(alert_group.alerts) != self.size:
+            raise ValueError(
+                f"View has {self.size} alerts, group has {len(alert_group.alerts)}."
+            )
+
+        if numpy is not None:
+            rows = self.codes.tolist()
+        else:
+            rows = [row.tolist() for row in self.codes]
+        values = self.values
+
+        for position, alert in enumerate(alert_group.alerts):
+            alert.__dict__[self.target] = {
+                name: values[row[position]]
+                for name, row in zip(self.names, rows)
+                if row[position] != MISSING
+            }
+
+        alert_group.__dict__[f"common_{self.target}"] = self.common()
+
+        if alert_group._counters is not None:
+            alert_group.index_common_elements()
+
+        alert_group.update_specific_elements(self.target)
@@ -0,0 +1,236 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .main import Alert, AlertGroup
+from .matchers import Matcher, parse_matchers
+
+
+def _matches_all(matchers: Sequence[Matcher], labels: Mapping[str, str]) -> bool:
+    return all(matcher.matches(labels.get(matcher.name)) for matcher in matchers)
+
+
+def _has_ended(ends_at: datetime, at: datetime) -> bool:
+    """Checks if an end time has passed. The zero time never passes."""
+
+    return 1 < ends_at.year and ends_at <= at
+
+
+class InhibitRule:
+    """Alertmanager inhibition rule.
+
+    A target alert is inhibited if a firing source alert exists that has the
+    same values for all `equal` labels. Missing labels count as empty. Like
+    in Alertmanager, an alert that matches both source and target matchers
+    is not inhibited by source alerts that also match both.
+
+    Args:
+        source_matchers (Iterable[Union[Matcher, str]]): Label matchers for
+            source alerts. Strings are parsed with `Matcher.parse`.
+        target_matchers (Iterable[Union[Matcher, str]]): Label matchers for
+            target alerts.
+        equal (Sequence[str], optional): Labels that must be equal in source
+            and target. Defaults to no labels.
+
+    Raises:
+        ValueError: If a matcher is not for labels.
+    """
+
+    def __init__(
+        self,
+        source_matchers: Iterable[Union[Matcher, str]],
+        target_matchers: Iterable[Union[Matcher, str]],
+        equal: Sequence[str] = (),
+    ) -> None:
+        self.source_matchers = parse_matchers(source_matchers)
+        self.target_matchers = parse_matchers(target_matchers)
+        self.equal = tuple(equal)
+
+        for matcher in self.source_matchers + self.target_matchers:
+            if matcher.target != "labels":
+                raise ValueError("Inhibition rules only support label matchers.")
+
+    @classmethod
+    def from_obj(cls, obj: Dict[str, Any]) -> "InhibitRule":
+        """Creates rule from an entry of `inhibit_rules` in the Alertmanager config.
+
+        Supports `source_matchers`, `target_matchers` and `equal` as well as
+        the deprecated `source_match`, `source_match_re`, `target_match` and
+        `target_match_re`.
+
+        Args:
+            obj (Dict[str, Any]): Decoded rule, for example loaded from YAML.
+                Will not be mutated.
+
+        Returns:
+            InhibitRule: Rule constructed from the object.
+        """
+
+        matchers: Dict[str, List[Union[Matcher, str]]] = {}
+
+        for side in ("source", "target"):
+            matchers[side] = list(obj.get(f"{side}_matchers", []))
+            for name, value in obj.get(f"{side}_match", {}).items():
+                matchers[side].append(Matcher(name, value))
+            for name, value in obj.get(f"{side}_match_re", {}).items():
+                matchers[side].append(Matcher(name, value, "=~"))
+
+        return cls(matchers["source"], matchers["target"], obj.get("equal", ()))
+
+
+class InhibitionEngine:
+    """Evaluates inhibition rules across alerts from many alert groups.
+
+    Firing source alerts are indexed per rule by the values of their `equal`
+    labels. Checking if an alert is inhibited is a dictionary lookup per rule
+    that matches the alert as target. Call `update` with every new payload.
+    Alerts that are resolved in a later payload or whose `ends_at` has
+    passed drop out of the index.
+
+    ```python
+    engine = InhibitionEngine(InhibitRule.from_obj(r) for r in config["inhibit_rules"])
+    engine.update(alert_group)
+    inhibited, not_inhibited = engine.evaluate(alert_group)
+    ```
+
+    Args:
+        rules (Iterable[InhibitRule]): Rules to evaluate.
+    """
+
+    def __init__(self, rules: Iterable[InhibitRule]) -> None:
+        self.rules = list(rules)
+
+        # Per rule: equal-label values -> fingerprint -> (ends at, matches target).
+        self._sources: List[Dict[Tuple[str, ...], Dict[str, Tuple[datetime, bool]]]] = [
+            {} for _ in self.rules
+        ]
+        # Fingerprint -> (rule position, equal-label values) it is indexed under.
+        self._keys: Dict[str, List[Tuple[int, Tuple[str, ...]]]] = {}
+
+    def __len__(self) -> int:
+        """Returns the number of indexed source alerts."""
+
+        return len(self._keys)
+
+    def _discard(self, fingerprint: str) -> None:
+        for position, key in self._keys.pop(fingerprint, ()):
+            bucket = self._sources[position][key]
+            del bucket[fingerprint]
+            if not bucket:
+                del self._sources[position][key]
+
+    def update(
+        self, alerts: Union[AlertGroup, Iterable[Alert]], at: Optional[datetime] = None
+    ) -> None:
+        """Adds, replaces or removes source alerts.
+
+        Alerts are identified by fingerprint. Firing alerts replace earlier
+        versions and resolved alerts are removed.
+
+        Args:
+            alerts (Union[AlertGroup, Iterable[Alert]]): New alerts or alert
+                group.
+            at (Optional[datetime], optional): Point in time to check `ends_at`
+                against. Defaults to now.
+        """
+
+        at = at or datetime.now(timezone.utc)
+
+        if isinstance(alerts, AlertGroup):
+            alerts = alerts.alerts
+
+        for alert in alerts:
+            self._discard(alert.fingerprint)
+
+            if alert.status == "resolved" or _has_ended(alert.ends_at, at):
+                continue
+
+            labels = alert.labels
+            keys = []
+            for position, rule in enumerate(self.rules):
+                if _matches_all(rule.source_matchers, labels):
+                    key = tuple(labels.get(name, "") for name in rule.equal)
+                    matches_target = _matches_all(rule.target_matchers, labels)
+                    bucket = self._sources[position].setdefault(key, {})
+                    bucket[alert.fingerprint] = (alert.ends_at, matches_target)
+                    keys.append((position, key))
+
+            if keys:
+                self._keys[alert.fingerprint] = keys
+
+    def is_inhibited(self, alert: Alert, at: Optional[datetime] = None) -> bool:
+        """Checks if an alert is inhibited by any indexed source alert.
+
+        Source alerts whose `ends_at` has passed are removed on the way.
+
+        Args:
+            alert (Alert): Alert to check. Does not have to be indexed.
+            at (Optional[datetime], optional): Point in time to check `ends_at`
+                against. Defaults to now.
+
+        Returns:
+            bool: `True` if the alert is inhibited.
+        """
+
+        at = at or datetime.now(timezone.utc)
+        labels = alert.labels
+
+        for position, rule in enumerate(self.rules):
+            if not _matches_all(rule.target_matchers, labels):
+                continue
+
+            key = tuple(labels.get(name, "") for name in rule.equal)
+            bucket = self._sources[position].get(key)
+            if not bucket:
+                continue
+
+            two_sided = _matches_all(rule.source_matchers, labels)
+            expired = []
+            found = False
+
+            for fingerprint, (ends_at, matches_target) in bucket.items():
+                if _has_ended(ends_at, at):
+                    expired.append(fingerprint)
+                elif not (two_sided and matches_target):
+                    found = True
+                    break
+
+            for fingerprint in expired:
+                self._discard(fingerprint)
+
+            if found:
+                return True
+
+        return False
+
+    def evaluate(
+        self, alert_group: AlertGroup, at: Optional[datetime] = None
+    ) -> Tuple[List[str], List[str]]:
+        """Splits alerts of a group into inhibited and not inhibited alerts.
+
+        Does not index the alerts of the group. Call `update` first if they
+        should be able to inhibit each other.
+
+        Args:
+            alert_group (AlertGroup): Alert group to evaluate.
+            at (Optional[datetime], optional): Point in time to check `ends_at`
+                against. Defaults to now.
+
+        Returns:
+            Tuple[List[str], List[str]]: Fingerprints of inhibited alerts and of
+                alerts that are not inhibited, both in the order of the group.
+        """
+
+        at = at or datetime.now(timezone.utc)
+        inhibited: List[str] = []
+        not_inhibited: List[str] = []
+
+        for alert in alert_group.alerts:
+            if self.is_inhibited(alert, at):
+                inhibited.append(alert.fingerprint)
+            else:
+                not_inhibited.append(alert.fingerprint)
+
+        return inhibited, not_inhibited
@@ -0,0 +1,217 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+"""Opt-in instrumentation of parsing and mutating alert groups.
+
+Every parse (`parse_obj`, `parse_raw`, `from_trusted_json`, `from_trusted_obj`)
+and every mutation (`remove`, `remove_re`, `add`, `override`, `add_prefix`,
+`apply` and the `update_*` methods) of `AlertGroup` reports an
+`OperationEvent` to all registered hooks. Only calls made by the user are
+reported. Calls that an instrumented method makes internally are part of the
+outer operation. Failed calls are not reported. Calling the constructor
+directly, as in `AlertGroup(**obj)`, is not instrumented. Use `parse_obj`
+instead to have parsing reported.
+
+As long as no hook is registered, instrumented methods only check whether the
+registry is empty before doing their work.
+
+```python
+from prometheus_alert_model.instrumentation import PrometheusHook, add_hook, recording
+
+add_hook(PrometheusHook())
+
+with recording() as events:
+    alert_group.remove(labels="instance")
+print(events)
+```
+"""
+
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable, Iterator, List, NamedTuple, Optional, Tuple, TypeVar
+
+try:
+    import prometheus_client  # type: ignore
+except ImportError:  # pragma: no cover
+    prometheus_client = None  # type: ignore
+
+
+class OperationEvent(NamedTuple):
+    """Measurement of a single operation on an alert group."""
+
+    operation: str
+    """Name of the method, for example `remove_re` or `parse_raw`."""
+
+    seconds: float
+    """Wall clock duration of the call."""
+
+    alerts: int
+    """Number of alerts in the group."""
+
+    elements: int
+    """Number of alert annotations and labels read or written. Actions with
+    names count one element per name and alert, `remove_re` and the `update_*`
+    methods count all elements of their targets and parsers count all
+    elements of the parsed group."""
+
+
+Hook = Callable[[OperationEvent], None]
+
+_hooks: Tuple[Hook, ...] = ()
+_local = threading.local()
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+def add_hook(hook: Hook) -> None:
+    """Registers a hook that is called with every `OperationEvent`.
+
+    Hooks are called synchronously in the thread that performed the operation.
+    Groups created by calling the constructor directly, as in
+    `AlertGroup(**obj)`, are not reported. Only the parsers listed in the
+    module documentation are.
+
+    Args:
+        hook (Hook): Callable that takes an `OperationEvent`.
+    """
+
+    global _hooks
+    _hooks = _hooks + (hook,)
+
+
+def remove_hook(hook: Hook) -> None:
+    """Unregisters a hook.
+
+    Args:
+        hook (Hook): Previously registered hook.
+
+    Raises:
+        ValueError: If the hook is not registered.
+    """
+
+    global _hooks
+    hooks = list(_hooks)
+    hooks.remove(hook)
+    _hooks = tuple(hooks)
+
+
+@contextmanager
+def recording() -> Iterator[List[OperationEvent]]:
+    """Collects events of all operations performed within the context.
+
+    Yields:
+        List[OperationEvent]: List that events are appended to.
+    """
+
+    events: List[OperationEvent] = []
+    add_hook(events.append)
+    try:
+        yield events
+    finally:
+        remove_hook(events.append)
+
+
+def _instrumented(
+    operation: str,
+    measure: Callable[[Any, tuple, dict], Tuple[int, int]],
+    on_result: bool = False,
+) -> Callable[[_F], _F]:
+    """Reports calls of the decorated method to registered hooks.
+
+    `measure` returns the number of alerts and elements. It is called with the
+    instance, the positional and the keyword arguments before the call, or
+    with the returned object instead of the instance after the call if
+    `on_result` is set. Measuring is not included in the duration.
+    """
+
+    def decorator(method: _F) -> _F:
+        @wraps(method)
+        def wrapper(obj: Any, *args: Any, **kwargs: Any) -> Any:
+            if not _hooks or getattr(_local, "active", False):
+                return method(obj, *args, **kwargs)
+
+            if not on_result:
+                alerts, elements = measure(obj, args, kwargs)
+
+            _local.active = True
+            try:
+                start = perf_counter()
+                result = method(obj, *args, **kwargs)
+                seconds = perf_counter() - start
+            finally:
+                _local.active = False
+
+            if on_result:
+                alerts, elements = measure(result, args, kwargs)
+
+            event = OperationEvent(operation, seconds, alerts, elements)
+            for hook in _hooks:
+                hook(event)
+
+            return result
+
+        return wrapper  # type: ignore
+
+    return decorator
+
+
+class PrometheusHook:
+    """Exports operation events as Prometheus histograms.
+
+    Observes duration, alerts and elements per operation in the histograms
+    `{namespace}_operation_duration_seconds`, `{namespace}_operation_alerts`
+    and `{namespace}_operation_elements` with the label `operation`. Requires
+    `prometheus_client` to be installed.
+
+    Args:
+        registry (Any, optional): Registry to register the histograms with.
+            Defaults to the default registry of `prometheus_client`.
+        namespace (str, optional): Prefix of metric names. Defaults to
+            `prometheus_alert_model`.
+
+    Raises:
+        ImportError: If `prometheus_client` is not installed.
+    """
+
+    def __init__(
+        self, registry: Optional[Any] = None, namespace: str = "prometheus_alert_model"
+    ) -> None:
+        if prometheus_client is None:
+            raise ImportError(
+                "PrometheusHook requires prometheus_client to be installed."
+            )
+
+        if registry is None:
+            registry = prometheus_client.REGISTRY
+
+        def histogram(name: str, documentation: str, buckets: Any) -> Any:
+            return prometheus_client.Histogram(
+                f"{namespace}_operation_{name}",
+                documentation,
+                ["operation"],
+                registry=registry,
+                buckets=buckets,
+            )
+
+        self.duration = histogram(
+            "duration_seconds",
+            "Duration of operations on alert groups.",
+            prometheus_client.Histogram.DEFAULT_BUCKETS,
+        )
+        self.alerts = histogram(
+            "alerts",
+            "Number of alerts in alert groups operated on.",
+            (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf")),
+        )
+        self.elements = histogram(
+            "elements",
+            "Number of annotations and labels touched by operations.",
+            (10, 100, 1000, 10000, 100000, 1000000, float("inf")),
+        )
+
+    def __call__(self, event: OperationEvent) -> None:
+        self.duration.labels(event.operation).observe(event.seconds)
+        self.alerts.labels(event.operation).observe(event.alerts)
+        self.elements.labels(event.operation).observe(event.elements)
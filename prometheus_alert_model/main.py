@@ -1,14 +1,46 @@
 # Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
 # Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
 
+import sys
 from datetime import datetime
 from re import Pattern, compile
-from typing import Dict, List, Optional, Sequence, Union
-
-from pydantic import BaseModel, Field, validator
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from pydantic import BaseModel, Field, PrivateAttr, validator
+from pydantic.datetime_parse import parse_datetime
+from pydantic.parse import Protocol
+from pydantic.types import StrBytes
 from typing_extensions import Literal
 
-from .utils import intersect
+from .columns import AlertColumns
+from .instrumentation import _instrumented
+from .matchers import ElementIndex, Matcher, parse_matchers
+from .utils import (
+    CopyOnWriteDict,
+    DeepSizer,
+    ElementCounter,
+    dumps,
+    format_datetime,
+    intersect,
+    loads,
+    parse_timestamp,
+)
+
+_Target = Literal["annotations", "labels"]
+_TARGETS: Tuple[_Target, ...] = ("annotations", "labels")
 
 
 class Alert(BaseModel):
@@ -25,7 +57,7 @@ class Alert(BaseModel):
         description=(
             "Annotations that are specific to this alert in the context of the "
             "whole alert group. Does not have to be provided in the payload "
-            "and is automatically calculated."
+            "and is automatically calculated on first access."
         ),
     )
     specific_labels: Dict[str, str] = Field(
@@ -33,13 +65,318 @@ class Alert(BaseModel):
         description=(
             "Labels that are specific to this alert in the context of the "
             "whole alert group. Does not have to be provided in the payload "
-            "and is automatically calculated."
+            "and is automatically calculated on first access."
         ),
     )
 
+    _common: Optional[Dict[str, Dict[str, str]]] = PrivateAttr(default=None)
+    _timestamps: Optional[Tuple[str, str]] = PrivateAttr(default=None)
+
     class Config:
         extra = "allow"
         allow_population_by_field_name = True
+        json_encoders = {CopyOnWriteDict: dict}
+
+    @validator("starts_at", "ends_at", pre=True)
+    def parse_timestamps(cls, v):
+        """Parses timestamps in the format of Alertmanager with a cache."""
+
+        return parse_timestamp(v) if isinstance(v, str) else v
+
+    @classmethod
+    def from_trusted_obj(
+        cls, obj: Dict[str, Any], lazy_timestamps: bool = False
+    ) -> "Alert":
+        """Creates alert from a trusted decoded payload without validating it.
+
+        See `AlertGroup.from_trusted_obj` for details and caveats.
+
+        Args:
+            obj (Dict[str, Any]): Decoded alert. Will not be mutated.
+            lazy_timestamps (bool, optional): Defer parsing `starts_at` and
+                `ends_at` until they are first read. Defaults to `False`.
+
+        Returns:
+            Alert: Alert constructed from the payload.
+        """
+
+        values = {_ALERT_FIELD_NAMES.get(key, key): value for key, value in obj.items()}
+        starts_at = values.pop("starts_at")
+        ends_at = values.pop("ends_at")
+
+        if lazy_timestamps and isinstance(starts_at, str) and isinstance(ends_at, str):
+            alert = cls.construct(**values)
+            object.__setattr__(alert, "_timestamps", (starts_at, ends_at))
+            return alert
+
+        values["starts_at"] = _to_datetime(starts_at)
+        values["ends_at"] = _to_datetime(ends_at)
+
+        return cls.construct(**values)
+
+    def __getattr__(self, name: str) -> Any:
+        """Calculates and memoizes specific elements and lazy timestamps."""
+
+        if name in _TIMESTAMP_POSITIONS and self._timestamps is not None:
+            value = _to_datetime(self._timestamps[_TIMESTAMP_POSITIONS[name]])
+            self.__dict__[name] = value
+            self.__fields_set__.add(name)
+            return value
+
+        if name not in _SPECIFIC_TARGETS or self._common is None:
+            raise AttributeError(
+                f"'{self.__class__.__name__}' object has no attribute '{name}'"
+            )
+
+        common = self._common[_SPECIFIC_TARGETS[name]]
+        specific = {
+            key: value
+            for key, value in self.__dict__[_SPECIFIC_TARGETS[name]].items()
+            if key not in common
+        }
+
+        self.__dict__[name] = specific
+        self.__fields_set__.add(name)
+
+        return specific
+
+    def memory_report(self) -> "MemoryReport":
+        """Measures deep memory usage of the alert.
+
+        Common elements of the group the alert belongs to are not included.
+        See `AlertGroup.memory_report` for details.
+
+        Returns:
+            MemoryReport: Sizes in bytes and duplicates. `group` and `indexes`
+                are always zero.
+        """
+
+        return _memory_report(DeepSizer(exclude=[self._common]), [self], self)
+
+    def _copy(self) -> "Alert":
+        """Copies the alert including its annotations and labels.
+
+        Specific elements are not copied and must be updated by the group.
+        """
+
+        values = dict(self.__dict__)
+        values["annotations"] = dict(self.__dict__["annotations"])
+        values["labels"] = dict(self.__dict__["labels"])
+        values.pop("specific_annotations", None)
+        values.pop("specific_labels", None)
+
+        fields_set = self.__fields_set__ - set(_SPECIFIC_TARGETS)
+        alert = self.construct(_fields_set=fields_set, **values)
+        alert.__dict__.pop("specific_annotations", None)
+        alert.__dict__.pop("specific_labels", None)
+        object.__setattr__(alert, "_timestamps", self._timestamps)
+
+        return alert
+
+    def _materialize(self) -> None:
+        """Ensures that specific elements and lazy timestamps are stored.
+
+        Lazily calculated fields are appended to `__dict__` when first read.
+        Restores the declared order of fields, so that `dict`, `json` and
+        `repr` look the same as for eagerly parsed alerts.
+        """
+
+        values = self.__dict__
+
+        for name in _SPECIFIC_TARGETS:
+            if name not in values:
+                getattr(self, name)
+
+        if self._timestamps is not None:
+            for name in _TIMESTAMP_POSITIONS:
+                if name not in values:
+                    getattr(self, name)
+
+        if list(values)[: len(_ALERT_FIELD_ORDER)] != _ALERT_FIELD_ORDER:
+            ordered = {
+                name: values[name] for name in _ALERT_FIELD_ORDER if name in values
+            }
+            ordered.update(values)
+            values.clear()
+            values.update(ordered)
+
+    def _iter(self, to_dict: bool = False, *args: Any, **kwargs: Any) -> Any:
+        self._materialize()
+
+        for key, value in super()._iter(to_dict, *args, **kwargs):
+            if to_dict and isinstance(value, CopyOnWriteDict):
+                value = value.copy()
+            yield key, value
+
+    def __iter__(self) -> Any:
+        self._materialize()
+        return super().__iter__()
+
+    def __repr_args__(self) -> Any:
+        self._materialize()
+        return super().__repr_args__()
+
+    def __getstate__(self) -> Any:
+        self._materialize()
+        return super().__getstate__()
+
+
+_SPECIFIC_TARGETS = {"specific_annotations": "annotations", "specific_labels": "labels"}
+_TIMESTAMP_POSITIONS = {"starts_at": 0, "ends_at": 1}
+_SPECIFIC_NAMES = {target: name for name, target in _SPECIFIC_TARGETS.items()}
+
+
+def _to_datetime(value: Any) -> datetime:
+    return parse_timestamp(value) if isinstance(value, str) else parse_datetime(value)
+
+
+_ALERT_FIELD_NAMES = {field.alias: name for name, field in Alert.__fields__.items()}
+_ALERT_FIELDS = frozenset(Alert.__fields__)
+_ALERT_FIELD_ORDER = list(Alert.__fields__)
+
+# Fields and aliases in the order Alertmanager emits them in webhook payloads.
+_ALERT_WEBHOOK_FIELDS = tuple(
+    (name, Alert.__fields__[name].alias)
+    for name in (
+        "status",
+        "labels",
+        "annotations",
+        "starts_at",
+        "ends_at",
+        "generator_url",
+        "fingerprint",
+    )
+)
+
+
+def _count_elements(alerts: List[Alert], targets: Sequence[str]) -> int:
+    return sum(len(alert.__dict__[target]) for alert in alerts for target in targets)
+
+
+def _measure_parsed(alert_group: Any, args: tuple, kwargs: dict) -> Tuple[int, int]:
+    """Measures a parsed alert group for instrumentation."""
+
+    alerts = alert_group.__dict__["alerts"]
+
+    return len(alerts), _count_elements(alerts, _TARGETS)
+
+
+def _measure_targets(*default: _Target) -> Callable[[Any, tuple, dict], Tuple[int, int]]:
+    """Creates instrumentation measure for methods with argument `targets`."""
+
+    def measure(alert_group: Any, args: tuple, kwargs: dict) -> Tuple[int, int]:
+        targets = args[0] if args else kwargs.get("targets", default)
+        targets = (targets,) if isinstance(targets, str) else targets
+        alerts = alert_group.__dict__["alerts"]
+
+        return len(alerts), _count_elements(alerts, targets)
+
+    return measure
+
+
+def _measure_operations(
+    alert_group: Any, operations: Sequence[Tuple[str, Dict[str, Any]]]
+) -> Tuple[int, int]:
+    """Measures actions for instrumentation.
+
+    Actions with names touch one element per name and alert. `remove_re` reads
+    all elements of its targets.
+    """
+
+    alerts = alert_group.__dict__["alerts"]
+    elements = 0
+
+    for action, kwargs in operations:
+        for target in _TARGETS:
+            argument = kwargs.get(target)
+            if not argument:
+                continue
+            elif action == "remove_re":
+                elements += _count_elements(alerts, (target,))
+            elif isinstance(argument, str):
+                elements += len(alerts)
+            else:
+                elements += len(alerts) * len(argument)
+
+    return len(alerts), elements
+
+
+def _measure_action(action: str) -> Callable[[Any, tuple, dict], Tuple[int, int]]:
+    """Creates instrumentation measure for an action method."""
+
+    def measure(alert_group: Any, args: tuple, kwargs: dict) -> Tuple[int, int]:
+        operation = {**dict(zip(_TARGETS, args)), **kwargs}
+        return _measure_operations(alert_group, [(action, operation)])
+
+    return measure
+
+
+def _measure_apply(alert_group: Any, args: tuple, kwargs: dict) -> Tuple[int, int]:
+    return _measure_operations(alert_group, args[0] if args else kwargs["operations"])
+
+
+class AlertGroupDiff(NamedTuple):
+    """Changes between two payloads of the same alert group."""
+
+    added: List[Alert]
+    """Alerts that did not exist before."""
+
+    removed: List[Alert]
+    """Alerts that do not exist anymore. Taken from the previous group."""
+
+    resolved: List[Alert]
+    """Alerts that were firing before and are resolved now."""
+
+    changed: List[Alert]
+    """Alerts with changed annotations or labels and alerts that were resolved
+    before and are firing again."""
+
+
+class MemoryReport(NamedTuple):
+    """Deep memory usage of an alert group in bytes.
+
+    Every object is counted once, in the first category that reaches it, in
+    the order of the fields below.
+    """
+
+    labels: int
+    """Labels of alerts, common labels and group labels."""
+
+    annotations: int
+    """Annotations of alerts and common annotations."""
+
+    specific: int
+    """Memoized specific annotations and labels. Their names and values are
+    shared with the elements they are derived from."""
+
+    extra: int
+    """Values of fields that are not part of the Alertmanager schema."""
+
+    alerts: int
+    """Alerts themselves including the list of alerts, timestamps and other
+    fields."""
+
+    indexes: int
+    """Fingerprint index, element indexes and counters of common elements."""
+
+    group: int
+    """Alert group itself including its other fields."""
+
+    total: int
+    """Sum of all categories."""
+
+    duplicate_strings: int
+    """Number of strings that are equal to another string but not shared."""
+
+    duplicate_string_bytes: int
+    """Bytes used by duplicate strings."""
+
+    duplicate_dicts: int
+    """Number of annotations and labels of alerts that are equal to the ones
+    of another alert but not shared."""
+
+    duplicate_dict_bytes: int
+    """Bytes used by duplicate dicts without their names and values."""
 
 
 class AlertGroup(BaseModel):
@@ -54,20 +391,27 @@ class AlertGroup(BaseModel):
     common_labels: Dict[str, str] = Field(alias="commonLabels")
     alerts: List[Alert]
 
+    _counters: Optional[Dict[str, ElementCounter]] = PrivateAttr(default=None)
+    _fingerprints: Optional[Tuple[List[Alert], int, Dict[str, Alert]]] = PrivateAttr(
+        default=None
+    )
+    _element_indexes: Optional[Tuple[List[Alert], int, Dict[str, ElementIndex]]] = (
+        PrivateAttr(default=None)
+    )
+
     @validator("alerts")
     def check_specific(cls, v, values):
-        """Updates specific labels and annotations."""
+        """Prepares lazy calculation of specific labels and annotations."""
 
-        for alert in v:
-            alert.specific_annotations = {
-                name: alert.annotations[name]
-                for name in set(alert.annotations) - set(values.get("common_annotations"))
-            }
+        common = {
+            "annotations": values.get("common_annotations"),
+            "labels": values.get("common_labels"),
+        }
 
-            alert.specific_labels = {
-                name: alert.labels[name]
-                for name in set(alert.labels) - set(values.get("common_labels"))
-            }
+        for alert in v:
+            object.__setattr__(alert, "_common", common)
+            alert.__dict__.pop("specific_annotations", None)
+            alert.__dict__.pop("specific_labels", None)
 
         return v
 
@@ -77,44 +421,143 @@ class AlertGroup(BaseModel):
 
     # --------------------------------------------------------------------------
 
+    @classmethod
+    @_instrumented("parse_obj", _measure_parsed, on_result=True)
+    def parse_obj(cls, obj: Any) -> "AlertGroup":
+        """Creates alert group from a decoded payload and validates it.
+
+        Same as `BaseModel.parse_obj` but reported to instrumentation hooks.
+        """
+
+        return super().parse_obj(obj)
+
+    @classmethod
+    @_instrumented("parse_raw", _measure_parsed, on_result=True)
+    def parse_raw(
+        cls,
+        b: StrBytes,
+        *,
+        content_type: Optional[str] = None,
+        encoding: str = "utf8",
+        proto: Optional[Protocol] = None,
+        allow_pickle: bool = False,
+    ) -> "AlertGroup":
+        """Creates alert group from a JSON encoded payload and validates it.
+
+        Same as `BaseModel.parse_raw` but reported to instrumentation hooks.
+        """
+
+        # Pydantic annotates optional arguments without `Optional`.
+        return super().parse_raw(
+            b,
+            content_type=content_type,  # type: ignore
+            encoding=encoding,
+            proto=proto,  # type: ignore
+            allow_pickle=allow_pickle,
+        )
+
+    @classmethod
+    @_instrumented("from_trusted_json", _measure_parsed, on_result=True)
+    def from_trusted_json(
+        cls, data: Union[bytes, bytearray, str], lazy_timestamps: bool = False
+    ) -> "AlertGroup":
+        """Creates alert group from trusted JSON without validating it.
+
+        Decodes with `orjson` if it is installed. See `from_trusted_obj` for
+        details and caveats.
+
+        Args:
+            data (Union[bytes, bytearray, str]): JSON encoded payload.
+            lazy_timestamps (bool, optional): Defer parsing timestamps of
+                alerts until they are first read. Defaults to `False`.
+
+        Returns:
+            AlertGroup: Alert group constructed from the payload.
+        """
+
+        return cls.from_trusted_obj(loads(data), lazy_timestamps)
+
+    @classmethod
+    @_instrumented("from_trusted_obj", _measure_parsed, on_result=True)
+    def from_trusted_obj(
+        cls, obj: Dict[str, Any], lazy_timestamps: bool = False
+    ) -> "AlertGroup":
+        """Creates alert group from a trusted decoded payload without validating it.
+
+        Models are created with `construct()`. Only timestamps are parsed.
+        Everything else is taken as is, so the payload must match the
+        Alertmanager schema. Use `parse_obj` or `parse_raw` for untrusted input.
+
+        With `lazy_timestamps`, `starts_at` and `ends_at` of every alert are
+        kept as strings and only parsed when they are first read. Handlers
+        that never look at timestamps skip parsing entirely and
+        `to_webhook_json` emits the original strings.
+
+        Args:
+            obj (Dict[str, Any]): Decoded payload. Will not be mutated.
+            lazy_timestamps (bool, optional): Defer parsing timestamps of
+                alerts until they are first read. Defaults to `False`.
+
+        Returns:
+            AlertGroup: Alert group constructed from the payload.
+        """
+
+        values = {_GROUP_FIELD_NAMES.get(key, key): value for key, value in obj.items()}
+
+        values["alerts"] = [
+            Alert.from_trusted_obj(alert, lazy_timestamps) for alert in values["alerts"]
+        ]
+
+        alert_group = cls.construct(**values)
+        alert_group.update_specific_elements()
+
+        return alert_group
+
+    # --------------------------------------------------------------------------
+
+    @_instrumented("update_specific_elements", _measure_targets(*_TARGETS))
     def update_specific_elements(
         self,
         targets: Union[
             Sequence[Literal["annotations", "labels"]], Literal["annotations", "labels"]
         ] = ["annotations", "labels"],
     ) -> None:
-        """Updates specific labels and annotations."""
+        """Updates specific labels and annotations.
+
+        Drops the memoized specific elements of every alert. They are
+        recalculated against the current common elements on next access.
+        """
 
         targets = (targets,) if isinstance(targets, str) else targets
+        names = [_SPECIFIC_NAMES[target] for target in targets]
 
-        for target in targets:
-            for alert in self.alerts:
-                alert.__dict__[f"specific_{target}"] = {
-                    name: alert.__dict__[target][name]
-                    for name in set(alert.__dict__[target])
-                    - set(self.__dict__[f"common_{target}"])
-                }
+        self._element_indexes = None
+
+        common = {
+            "annotations": self.__dict__["common_annotations"],
+            "labels": self.__dict__["common_labels"],
+        }
+
+        for alert in self.alerts:
+            object.__setattr__(alert, "_common", common)
+            for name in names:
+                alert.__dict__.pop(name, None)
 
+    @_instrumented("update_specific_annotations", _measure_targets("annotations"))
     def update_specific_annotations(self) -> None:
         """Updates specific annotations."""
 
-        for alert in self.alerts:
-            alert.specific_annotations = {
-                name: alert.annotations[name]
-                for name in set(alert.annotations) - set(self.common_annotations)
-            }
+        self.update_specific_elements("annotations")
 
+    @_instrumented("update_specific_labels", _measure_targets("labels"))
     def update_specific_labels(self) -> None:
         """Updates specific labels."""
 
-        for alert in self.alerts:
-            alert.specific_labels = {
-                name: alert.labels[name]
-                for name in set(alert.labels) - set(self.common_labels)
-            }
+        self.update_specific_elements("labels")
 
     # --------------------------------------------------------------------------
 
+    @_instrumented("update_common_elements", _measure_targets(*_TARGETS))
     def update_common_elements(
         self,
         targets: Union[
@@ -123,28 +566,460 @@ class AlertGroup(BaseModel):
     ) -> None:
         """Updates common annotations and labels.
 
+        If common elements are indexed (see `index_common_elements`), they are
+        derived from the element counters instead of intersecting all alerts.
+
         Args:
             targets (Union[Sequence[Literal["annotations", "labels"]], Literal["annotations", "labels"], optional):
                 Targets that should be updated. Defaults to ["annotations", "labels"].
         """
 
-        for target in targets:
-            self.__dict__[f"common_{target}"] = intersect(
-                [alert.__dict__[target] for alert in self.alerts]
-            )
+        targets = (targets,) if isinstance(targets, str) else targets
 
+        for target in targets:
+            if self._counters is not None:
+                self.__dict__[f"common_{target}"] = self._counters[target].intersection()
+            else:
+                self.__dict__[f"common_{target}"] = intersect(
+                    alert.__dict__[target] for alert in self.alerts
+                )
+
+    @_instrumented("update_common_annotations", _measure_targets("annotations"))
     def update_common_annotations(self) -> None:
         """Updates common annotations."""
 
-        self.common_annotations = intersect([alert.annotations for alert in self.alerts])
+        self.update_common_elements("annotations")
 
+    @_instrumented("update_common_labels", _measure_targets("labels"))
     def update_common_labels(self) -> None:
         """Updates common labels."""
 
-        self.common_labels = intersect([alert.labels for alert in self.alerts])
+        self.update_common_elements("labels")
+
+    def index_common_elements(self) -> None:
+        """Enables incremental tracking of common annotations and labels.
+
+        Counts how many alerts carry each annotation and label. From now on
+        `remove`, `remove_re`, `add`, `override` and `add_prefix` keep the
+        counters up-to-date and `update_common_elements` only has to look at
+        the counters. Common elements are updated right away.
+
+        If alerts are changed without using the methods of this class, call
+        this method again to rebuild the counters.
+        """
+
+        self._counters = {
+            target: ElementCounter(alert.__dict__[target] for alert in self.alerts)
+            for target in ("annotations", "labels")
+        }
+
+        self.update_common_elements()
+
+    def compact(self) -> None:
+        """Reduces memory used by annotations and labels.
+
+        Names and values are deduplicated so that equal strings are stored
+        only once in the whole group. Alerts with identical annotations or
+        labels share a single `dict` behind a `CopyOnWriteDict`. The first
+        write to such an element creates a private copy, so all methods and
+        direct changes keep working as before.
+
+        Specific elements are not compacted because they are calculated on
+        first access.
+        """
+
+        strings: Dict[str, str] = {}
+
+        def intern(elements: Mapping[str, str]) -> Tuple[Tuple[str, str], ...]:
+            return tuple(
+                (strings.setdefault(name, name), strings.setdefault(value, value))
+                for name, value in elements.items()
+            )
+
+        for target in _TARGETS:
+            self.__dict__[f"common_{target}"] = dict(
+                intern(self.__dict__[f"common_{target}"])
+            )
+
+        for target in _TARGETS:
+            shared: Dict[Tuple[Tuple[str, str], ...], Dict[str, str]] = {}
+            occurrences: Dict[int, int] = {}
+            dcts = []
+
+            for alert in self.alerts:
+                items = intern(alert.__dict__[target])
+                dct = shared.get(items)
+                if dct is None:
+                    dct = shared[items] = dict(items)
+                occurrences[id(dct)] = occurrences.get(id(dct), 0) + 1
+                dcts.append(dct)
+
+            for alert, dct in zip(self.alerts, dcts):
+                if occurrences[id(dct)] > 1:
+                    alert.__dict__[target] = CopyOnWriteDict(dct)
+                else:
+                    alert.__dict__[target] = dct
+
+        self.update_specific_elements()
+
+    def to_columns(
+        self, target: Literal["annotations", "labels"] = "labels"
+    ) -> AlertColumns:
+        """Creates a dictionary-encoded columnar view of annotations or labels.
+
+        Useful for bulk analysis and transformations. Call `AlertColumns.write`
+        to apply changes made to the view to this group.
+
+        Args:
+            target (Literal["annotations", "labels"], optional): Elements to
+                encode. Defaults to "labels".
+
+        Returns:
+            AlertColumns: Columnar view of the elements.
+        """
+
+        return AlertColumns.from_group(self, target)
+
+    def to_webhook_obj(self) -> Dict[str, Any]:
+        """Creates a dictionary in the shape of the Alertmanager webhook payload.
+
+        Keys are the aliases used by Alertmanager. Timestamps are formatted
+        as RFC 3339 strings. Specific elements are never included while
+        extra fields are. The returned dictionary shares annotations and
+        labels with this group, so it must not be mutated.
+
+        Returns:
+            Dict[str, Any]: Payload ready to be serialized.
+        """
+
+        values = self.__dict__
+        obj = {alias: values[name] for name, alias in _GROUP_WEBHOOK_FIELDS}
+        obj["alerts"] = [_alert_to_webhook_obj(alert) for alert in values["alerts"]]
+
+        for name in values.keys() - _GROUP_FIELDS:
+            obj[name] = values[name]
+
+        return obj
+
+    def to_webhook_json(self) -> bytes:
+        """Serializes the group to JSON in the shape of the webhook payload.
+
+        Faster than `json(by_alias=True, exclude=...)` as it skips the
+        generic pydantic encoder. Uses `orjson` if it is installed. See
+        `to_webhook_obj` for details.
+
+        Returns:
+            bytes: UTF-8 encoded JSON document.
+        """
+
+        return dumps(self.to_webhook_obj())
+
+    def memory_report(self) -> MemoryReport:
+        """Measures deep memory usage of the alert group.
+
+        Follows all references of the group and sums the sizes reported by
+        `sys.getsizeof`. Shared objects are counted once. Objects that are
+        shared with other groups, like cached timestamps, are included.
+
+        Also counts equal strings and equal annotations or labels that are
+        stored separately. Both can be shared with `compact`. Measuring takes
+        time proportional to the number of objects and is meant for sizing
+        and diagnostics, not for every payload.
+
+        Returns:
+            MemoryReport: Sizes in bytes and duplicates.
+        """
+
+        return _memory_report(DeepSizer(), self.__dict__["alerts"], self)
 
     # --------------------------------------------------------------------------
 
+    def _fingerprint_index(self) -> Dict[str, Alert]:
+        """Returns alerts by fingerprint. Built on first use.
+
+        The index is rebuilt if the list of alerts has been replaced or its
+        length changed without using `add_alerts` or `remove_alerts`.
+        """
+
+        cached = self._fingerprints
+
+        if (
+            cached is not None
+            and cached[0] is self.alerts
+            and cached[1] == len(self.alerts)
+        ):
+            return cached[2]
+
+        index = {alert.fingerprint: alert for alert in self.alerts}
+        self._fingerprints = (self.alerts, len(self.alerts), index)
+
+        return index
+
+    def get(self, fingerprint: str, default: Optional[Alert] = None) -> Optional[Alert]:
+        """Looks up an alert by its fingerprint in constant time.
+
+        The index is built on first use. If several alerts share a
+        fingerprint, the last one is returned.
+
+        Args:
+            fingerprint (str): Fingerprint of the alert.
+            default (Optional[Alert], optional): Returned if no alert has the
+                fingerprint. Defaults to `None`.
+
+        Returns:
+            Optional[Alert]: The alert or `default`.
+        """
+
+        return self._fingerprint_index().get(fingerprint, default)
+
+    def __contains__(self, fingerprint: object) -> bool:
+        """Checks in constant time if an alert with the fingerprint exists."""
+
+        return fingerprint in self._fingerprint_index()
+
+    def add_alerts(self, alerts: Sequence[Alert]) -> None:
+        """Adds alerts to the group.
+
+        Common elements are narrowed down by intersecting them with the
+        elements of the new alerts, so existing alerts are not scanned again.
+
+        Args:
+            alerts (Sequence[Alert]): Alerts to add.
+        """
+
+        if not alerts:
+            return
+
+        index = self._fingerprint_index()
+
+        for target in _TARGETS:
+            if self.alerts:
+                elements = [self.__dict__[f"common_{target}"]]
+            else:
+                elements = []
+            elements.extend(alert.__dict__[target] for alert in alerts)
+            self.__dict__[f"common_{target}"] = intersect(elements)
+
+            if self._counters is not None:
+                for alert in alerts:
+                    self._counters[target].add(alert.__dict__[target])
+
+        for alert in alerts:
+            index[alert.fingerprint] = alert
+        self.alerts.extend(alerts)
+        self._fingerprints = (self.alerts, len(self.alerts), index)
+
+        self.update_specific_elements()
+
+    def remove_alerts(self, fingerprints: Iterable[str]) -> List[Alert]:
+        """Removes alerts with the given fingerprints from the group.
+
+        All alerts that share a given fingerprint are removed. Unknown
+        fingerprints are ignored. Removed alerts keep their specific elements
+        relative to this group.
+
+        If common elements are indexed (see `index_common_elements`), the
+        element counters are decremented by the removed alerts only and common
+        elements are derived from them. Otherwise the remaining alerts are
+        intersected again. Specific elements of the remaining alerts are only
+        dropped if common elements actually changed.
+
+        Args:
+            fingerprints (Iterable[str]): Fingerprints of alerts to remove.
+
+        Returns:
+            List[Alert]: Removed alerts.
+        """
+
+        index = self._fingerprint_index()
+        found = {fingerprint for fingerprint in fingerprints if fingerprint in index}
+
+        if not found:
+            return []
+
+        for fingerprint in found:
+            del index[fingerprint]
+
+        removed: List[Alert] = []
+        kept: List[Alert] = []
+        for alert in self.alerts:
+            (removed if alert.fingerprint in found else kept).append(alert)
+
+        self.alerts[:] = kept
+        self._fingerprints = (self.alerts, len(self.alerts), index)
+        self._element_indexes = None
+
+        changed = False
+
+        for target in _TARGETS:
+            if self._counters is not None:
+                counter = self._counters[target]
+                for alert in removed:
+                    counter.discard(alert.__dict__[target])
+                common = counter.intersection()
+            else:
+                common = intersect(alert.__dict__[target] for alert in kept)
+
+            if common != self.__dict__[f"common_{target}"]:
+                self.__dict__[f"common_{target}"] = common
+                changed = True
+
+        if changed:
+            self.update_specific_elements()
+
+        return removed
+
+    def _element_index(self, target: _Target) -> ElementIndex:
+        """Returns the inverted index of annotations or labels. Built on first use.
+
+        Dropped by `update_specific_elements`, which all methods that change
+        elements call. Rebuilt if the list of alerts has been replaced or its
+        length changed.
+        """
+
+        cached = self._element_indexes
+
+        if (
+            cached is None
+            or cached[0] is not self.alerts
+            or cached[1] != len(self.alerts)
+        ):
+            cached = self._element_indexes = (self.alerts, len(self.alerts), {})
+
+        index = cached[2].get(target)
+
+        if index is None:
+            index = cached[2][target] = ElementIndex(
+                [alert.__dict__[target] for alert in self.alerts]
+            )
+
+        return index
+
+    def select(self, matchers: Iterable[Union[Matcher, str]]) -> "AlertGroup":
+        """Selects alerts that satisfy all given matchers.
+
+        Matchers work like in Alertmanager. Strings are parsed as label
+        matchers, for example `'severity=~"critical|warning"'`. Use `Matcher`
+        with `target="annotations"` to match annotations.
+
+        Evaluated with an inverted index of element values to alerts that is
+        built on first use and reused until elements are changed.
+
+        ```python
+        critical = alert_group.select(['severity="critical"', 'team!~"db|infra"'])
+        ```
+
+        Args:
+            matchers (Iterable[Union[Matcher, str]]): Matchers to combine.
+
+        Returns:
+            AlertGroup: New alert group with copies of the selected alerts and
+                updated common elements. Changing it does not affect this group.
+
+        Raises:
+            ValueError: If a matcher string is invalid.
+        """
+
+        by_target: Dict[_Target, List[Matcher]] = {}
+        for matcher in parse_matchers(matchers):
+            by_target.setdefault(matcher.target, []).append(matcher)
+
+        positions: Optional[List[int]] = None
+        for target, target_matchers in by_target.items():
+            selected = self._element_index(target).select(target_matchers)
+            if positions is None:
+                positions = selected
+            else:
+                selected_set = set(selected)
+                positions = [p for p in positions if p in selected_set]
+
+        if positions is None:
+            positions = list(range(len(self.alerts)))
+
+        values = dict(self.__dict__)
+        values["group_labels"] = dict(self.group_labels)
+        values["alerts"] = [self.alerts[position]._copy() for position in positions]
+
+        alert_group = self.construct(_fields_set=set(self.__fields_set__), **values)
+        alert_group.update_common_elements()
+        alert_group.update_specific_elements()
+
+        return alert_group
+
+    def diff(self, previous: "AlertGroup") -> AlertGroupDiff:
+        """Compares this alert group with a previous payload of the same group.
+
+        Alerts are matched by fingerprint using the fingerprint index of the
+        previous group. Alerts that share a fingerprint are matched in the
+        order they appear in. Annotations and labels of matched alerts are compared
+        directly. Most resends are identical and comparing equal dicts is
+        cheaper than hashing their content first.
+
+        ```python
+        changes = alert_group.diff(previous_alert_group)
+        if any(changes):
+            notify(changes)
+        ```
+
+        Args:
+            previous (AlertGroup): Earlier payload to compare against.
+
+        Returns:
+            AlertGroupDiff: Added, removed, resolved and changed alerts. Alerts
+                are in the order of their group.
+        """
+
+        index = previous._fingerprint_index()
+        unique = len(index) == len(previous.alerts)
+        duplicates: Dict[str, List[Alert]] = {}
+        if not unique:
+            for alert in previous.alerts:
+                duplicates.setdefault(alert.fingerprint, []).append(alert)
+
+        matched: Dict[str, int] = {}
+        added, resolved, changed = [], [], []
+
+        for alert in self.alerts:
+            fingerprint = alert.fingerprint
+            position = matched.get(fingerprint, 0)
+
+            if unique:
+                old = index.get(fingerprint) if position == 0 else None
+            else:
+                candidates = duplicates.get(fingerprint, [])
+                old = candidates[position] if position < len(candidates) else None
+
+            if old is None:
+                added.append(alert)
+                continue
+
+            matched[fingerprint] = position + 1
+
+            if alert.status != old.status:
+                if alert.status == "resolved":
+                    resolved.append(alert)
+                else:
+                    changed.append(alert)
+            elif (
+                alert.__dict__["labels"] != old.__dict__["labels"]
+                or alert.__dict__["annotations"] != old.__dict__["annotations"]
+            ):
+                changed.append(alert)
+
+        if unique:
+            removed = [a for a in previous.alerts if a.fingerprint not in matched]
+        else:
+            removed = []
+            for alert in previous.alerts:
+                fingerprint = alert.fingerprint
+                if matched.get(fingerprint, 0) > 0:
+                    matched[fingerprint] -= 1
+                else:
+                    removed.append(alert)
+
+        return AlertGroupDiff(added, removed, resolved, changed)
+
+    @_instrumented("remove", _measure_action("remove"))
     def remove(
         self,
         annotations: Optional[Union[List[str], str]] = None,
@@ -159,7 +1034,7 @@ class AlertGroup(BaseModel):
                 remove. Defaults to `None`.
         """
 
-        targets: Dict[str, Union[List[str], str]] = {}
+        targets: Dict[Literal["annotations", "labels"], Union[List[str], str]] = {}
 
         if annotations:
             targets["annotations"] = annotations
@@ -170,14 +1045,21 @@ class AlertGroup(BaseModel):
         for target, values in targets.items():
             names_to_pop: List[str] = [values] if isinstance(values, str) else values
 
+            counter = self._counters[target] if self._counters is not None else None
+
             for name_to_pop in names_to_pop:
                 self.__dict__[f"common_{target}"].pop(name_to_pop, None)
                 for alert in self.alerts:
-                    alert.__dict__[target].pop(name_to_pop, None)
-                    alert.__dict__[f"specific_{target}"].pop(name_to_pop, None)
+                    value = alert.__dict__[target].pop(name_to_pop, None)
+                    if counter is not None and value is not None:
+                        counter.decrement(name_to_pop, value)
+
+        if targets:
+            self.update_specific_elements(list(targets.keys()))
 
     # --------------------------------------------------------------------------
 
+    @_instrumented("remove_re", _measure_action("remove_re"))
     def remove_re(
         self,
         annotations: Optional[Union[List[Union[Pattern, str]], Pattern, str]] = None,
@@ -194,6 +1076,9 @@ class AlertGroup(BaseModel):
                 Patterns that should be matched unanchored against labels.
                 If a `str` is given instead of a `Pattern`, the `str` will be
                 compiled to `Pattern`. Defaults to `None`.
+
+        Every distinct name is matched only once per call. To reuse matches
+        across calls and groups, use `RelabelPlan`.
         """
 
         targets: Dict[
@@ -210,32 +1095,26 @@ class AlertGroup(BaseModel):
         if targets:
             for target, target_value in targets.items():
 
-                patterns: List[Pattern]
-                if isinstance(target_value, str):
-                    patterns = [compile(target_value)]
-                elif isinstance(target_value, Pattern):
-                    patterns = [target_value]
-                else:
-                    patterns = [
-                        compile(pattern) if isinstance(pattern, str) else pattern
-                        for pattern in target_value
-                    ]
+                matches = _NameMatches(_compile_patterns(target_value))
 
-                for pattern in patterns:
-                    elements = self.__dict__[f"common_{target}"]
+                counter = self._counters[target] if self._counters is not None else None
 
-                    for name_to_pop in {e for e in elements if pattern.search(e)}:
-                        elements.pop(name_to_pop, None)
+                elements = self.__dict__[f"common_{target}"]
+                for name_to_pop in [e for e in elements if matches[e]]:
+                    elements.pop(name_to_pop)
 
-                    for alert in self.alerts:
-                        elements = alert.__dict__[target]
-                        for name_to_pop in {e for e in elements if pattern.search(e)}:
-                            elements.pop(name_to_pop, None)
+                for alert in self.alerts:
+                    elements = alert.__dict__[target]
+                    for name_to_pop in [e for e in elements if matches[e]]:
+                        value = elements.pop(name_to_pop)
+                        if counter is not None:
+                            counter.decrement(name_to_pop, value)
 
             self.update_specific_elements(list(targets.keys()))
 
     # --------------------------------------------------------------------------
 
+    @_instrumented("add", _measure_action("add"))
     def add(
         self,
         annotations: Optional[Dict[str, str]] = None,
@@ -260,6 +1139,8 @@ class AlertGroup(BaseModel):
 
         if targets:
             for target, items_to_add in targets.items():
+                counter = self._counters[target] if self._counters is not None else None
+
                 for name, value in items_to_add.items():
                     unique_values = set()
 
@@ -269,6 +1150,8 @@ class AlertGroup(BaseModel):
                         if name not in elements:
                             elements[name] = value
                             unique_values.add(value)
+                            if counter is not None:
+                                counter.increment(name, value)
                         else:
                             unique_values.add(elements[name])
 
@@ -279,6 +1162,7 @@ class AlertGroup(BaseModel):
 
     # --------------------------------------------------------------------------
 
+    @_instrumented("override", _measure_action("override"))
     def override(
         self,
         annotations: Optional[Dict[str, str]] = None,
@@ -303,15 +1187,23 @@ class AlertGroup(BaseModel):
 
         if targets:
             for target, items_to_override in targets.items():
+                counter = self._counters[target] if self._counters is not None else None
+
                 for name, value in items_to_override.items():
                     self.__dict__[f"common_{target}"][name] = value
                     for alert in self.alerts:
-                        alert.__dict__[target][name] = value
+                        elements = alert.__dict__[target]
+                        if counter is not None:
+                            if name in elements:
+                                counter.decrement(name, elements[name])
+                            counter.increment(name, value)
+                        elements[name] = value
 
             self.update_specific_elements(list(targets.keys()))
 
     # --------------------------------------------------------------------------
 
+    @_instrumented("add_prefix", _measure_action("add_prefix"))
     def add_prefix(
         self,
         annotations: Optional[Dict[str, str]] = None,
@@ -338,15 +1230,343 @@ class AlertGroup(BaseModel):
 
         if targets:
             for target, prefixes_to_add in targets.items():
+                counter = self._counters[target] if self._counters is not None else None
+
                 for name, prefix in prefixes_to_add.items():
                     self.__dict__[f"common_{target}"][name] = (
                         prefix + self.__dict__[f"common_{target}"][name]
                     )
                     for alert in self.alerts:
-                        alert.__dict__[target][name] = (
-                            prefix + alert.__dict__[target][name]
-                        )
+                        elements = alert.__dict__[target]
+                        if counter is not None:
+                            counter.decrement(name, elements[name])
+                            counter.increment(name, prefix + elements[name])
+                        elements[name] = prefix + elements[name]
 
             self.update_specific_elements(list(targets.keys()))
 
     # --------------------------------------------------------------------------
+
+    @_instrumented("apply", _measure_apply)
+    def apply(self, operations: Sequence[Tuple[str, Dict[str, Any]]]) -> None:
+        """Applies multiple actions in a single pass over all alerts.
+
+        Leads to the same result as calling the respective methods one after
+        another, but every alert is only visited once and specific elements
+        are only updated once at the end.
+
+        ```python
+        alert_group.apply([
+            ("remove_re", {"labels": r"^__.*$"}),
+            ("add", {"labels": {"cluster": "a"}}),
+            ("add_prefix", {"annotations": {"summary": "Cluster A: "}}),
+        ])
+        ```
+
+        Args:
+            operations (Sequence[Tuple[str, Dict[str, Any]]]): Ordered actions.
+                Every action is a tuple of the method name (`remove`,
+                `remove_re`, `add`, `override` or `add_prefix`) and keyword
+                arguments for the method.
+
+        Raises:
+            ValueError: If an unknown method name is given.
+        """
+
+        steps = compile_operations(operations)
+
+        if steps:
+            self._apply_steps(steps)
+
+    def _apply_steps(self, steps: List[Tuple[str, _Target, Any]]) -> None:
+        """Applies compiled steps to all alerts and the common elements.
+
+        Raises:
+            KeyError: If a step of action `add_prefix` refers to a name that
+                is not common at that point. Raised before anything changes.
+        """
+
+        self._check_steps(steps)
+
+        counters = self._counters
+        # Steps of action `add` that did not end up with the same value in all alerts.
+        diverged: Set[Tuple[int, str]] = set()
+
+        for alert in self.alerts:
+            for index, (action, target, argument) in enumerate(steps):
+                elements = alert.__dict__[target]
+                counter = counters[target] if counters is not None else None
+
+                if action == "remove":
+                    for name in argument:
+                        value = elements.pop(name, None)
+                        if counter is not None and value is not None:
+                            counter.decrement(name, value)
+                elif action == "remove_re":
+                    for name in [e for e in elements if argument[e]]:
+                        value = elements.pop(name)
+                        if counter is not None:
+                            counter.decrement(name, value)
+                elif action == "add":
+                    for name, value in argument.items():
+                        if name not in elements:
+                            elements[name] = value
+                            if counter is not None:
+                                counter.increment(name, value)
+                        elif elements[name] != value:
+                            diverged.add((index, name))
+                elif action == "override":
+                    for name, value in argument.items():
+                        if counter is not None:
+                            if name in elements:
+                                counter.decrement(name, elements[name])
+                            counter.increment(name, value)
+                        elements[name] = value
+                else:
+                    for name, prefix in argument.items():
+                        if counter is not None:
+                            counter.decrement(name, elements[name])
+                            counter.increment(name, prefix + elements[name])
+                        elements[name] = prefix + elements[name]
+
+        for index, (action, target, argument) in enumerate(steps):
+            common = self.__dict__[f"common_{target}"]
+
+            if action == "remove":
+                for name in argument:
+                    common.pop(name, None)
+            elif action == "remove_re":
+                for name in [e for e in common if argument[e]]:
+                    common.pop(name)
+            elif action == "add":
+                for name, value in argument.items():
+                    if self.alerts and (index, name) not in diverged:
+                        common[name] = value
+            elif action == "override":
+                common.update(argument)
+            else:
+                for name, prefix in argument.items():
+                    # Names added with diverging values are not common.
+                    if name in common:
+                        common[name] = prefix + common[name]
+
+        self.update_specific_elements(list({target for _, target, _ in steps}))
+
+    def _check_steps(self, steps: List[Tuple[str, _Target, Any]]) -> None:
+        """Checks that every alert has the names prefixed by `add_prefix` steps.
+
+        Follows the names of the common elements through the steps. After
+        `add` and `override` all alerts have the given names.
+        """
+
+        names = {target: set(self.__dict__[f"common_{target}"]) for target in _TARGETS}
+
+        for action, target, argument in steps:
+            present = names[target]
+
+            if action == "remove":
+                present.difference_update(argument)
+            elif action == "remove_re":
+                present.difference_update([name for name in present if argument[name]])
+            elif action == "add_prefix":
+                for name in argument:
+                    if name not in present:
+                        raise KeyError(name)
+            else:
+                present.update(argument)
+
+    # --------------------------------------------------------------------------
+
+
+_GROUP_FIELD_NAMES = {field.alias: name for name, field in AlertGroup.__fields__.items()}
+_GROUP_FIELDS = frozenset(AlertGroup.__fields__)
+
+_GROUP_WEBHOOK_FIELDS = tuple(
+    (name, AlertGroup.__fields__[name].alias)
+    for name in (
+        "receiver",
+        "status",
+        "alerts",
+        "group_labels",
+        "common_labels",
+        "common_annotations",
+        "external_url",
+        "version",
+        "group_key",
+        "truncated_alerts",
+    )
+)
+
+
+def _alert_to_webhook_obj(alert: Alert) -> Dict[str, Any]:
+    values = alert.__dict__
+    timestamps = alert._timestamps
+
+    if timestamps is not None:
+        # Emit the original strings of timestamps that have not been read.
+        values = {"starts_at": timestamps[0], "ends_at": timestamps[1], **values}
+
+    obj = {alias: values[name] for name, alias in _ALERT_WEBHOOK_FIELDS}
+
+    if not isinstance(obj["startsAt"], str):
+        obj["startsAt"] = format_datetime(obj["startsAt"])
+    if not isinstance(obj["endsAt"], str):
+        obj["endsAt"] = format_datetime(obj["endsAt"])
+
+    for name in values.keys() - _ALERT_FIELDS:
+        obj[name] = values[name]
+
+    return obj
+
+
+def _memory_report(
+    sizer: DeepSizer, alerts: List[Alert], container: Union[Alert, AlertGroup]
+) -> MemoryReport:
+    """Measures alerts and the group (or single alert) containing them."""
+
+    values = container.__dict__ if isinstance(container, AlertGroup) else {}
+
+    labels = sizer.size(
+        *[alert.__dict__["labels"] for alert in alerts],
+        *[values[name] for name in ("common_labels", "group_labels") if name in values],
+    )
+    annotations = sizer.size(
+        *[alert.__dict__["annotations"] for alert in alerts],
+        *[values[name] for name in ("common_annotations",) if name in values],
+    )
+    specific = sizer.size(
+        *[
+            alert.__dict__[name]
+            for alert in alerts
+            for name in _SPECIFIC_TARGETS
+            if name in alert.__dict__
+        ]
+    )
+    extra = sizer.size(
+        *[values[name] for name in values.keys() - _GROUP_FIELDS],
+        *[
+            alert.__dict__[name]
+            for alert in alerts
+            for name in alert.__dict__.keys() - _ALERT_FIELDS
+        ],
+    )
+
+    if isinstance(container, AlertGroup):
+        alerts_size = sizer.size(alerts)
+        indexes = sizer.size(
+            container._counters, container._fingerprints, container._element_indexes
+        )
+        group = sizer.size(container)
+    else:
+        alerts_size = sizer.size(container)
+        indexes = group = 0
+
+    duplicate_dicts = 0
+    duplicate_dict_bytes = 0
+    for target in _TARGETS:
+        shared: Dict[frozenset, Mapping[str, str]] = {}
+        for alert in alerts:
+            elements = alert.__dict__[target]
+            if isinstance(elements, CopyOnWriteDict):
+                elements = elements._data
+            if shared.setdefault(frozenset(elements.items()), elements) is not elements:
+                duplicate_dicts += 1
+                duplicate_dict_bytes += sys.getsizeof(elements)
+
+    return MemoryReport(
+        labels=labels,
+        annotations=annotations,
+        specific=specific,
+        extra=extra,
+        alerts=alerts_size,
+        indexes=indexes,
+        group=group,
+        total=labels + annotations + specific + extra + alerts_size + indexes + group,
+        duplicate_strings=sizer.duplicate_strings,
+        duplicate_string_bytes=sizer.duplicate_string_bytes,
+        duplicate_dicts=duplicate_dicts,
+        duplicate_dict_bytes=duplicate_dict_bytes,
+    )
+
+
+_ACTIONS = ("remove", "remove_re", "add", "override", "add_prefix")
+
+
+def _compile_patterns(
+    value: Union[List[Union[Pattern, str]], Pattern, str],
+) -> List[Pattern]:
+    """Normalizes one or multiple patterns to a list of compiled patterns."""
+
+    if isinstance(value, str):
+        return [compile(value)]
+    elif isinstance(value, Pattern):
+        return [value]
+    else:
+        return [
+            compile(pattern) if isinstance(pattern, str) else pattern for pattern in value
+        ]
+
+
+class _NameMatches(Dict[str, bool]):
+    """Memoizes whether any of the given patterns matches a name.
+
+    If `maxsize` is given, the memo is cleared whenever it is full.
+    """
+
+    def __init__(self, patterns: List[Pattern], maxsize: Optional[int] = None) -> None:
+        super().__init__()
+        self.patterns = patterns
+        self.maxsize = maxsize
+
+    def __missing__(self, name: str) -> bool:
+        if self.maxsize is not None and len(self) >= self.maxsize:
+            self.clear()
+
+        match = self[name] = any(pattern.search(name) for pattern in self.patterns)
+        return match
+
+
+def compile_operations(
+    operations: Sequence[Tuple[str, Dict[str, Any]]],
+    cache_size: Optional[int] = None,
+) -> List[Tuple[str, _Target, Any]]:
+    """Normalizes actions to a list of `(action, target, argument)` steps.
+
+    Shared by `AlertGroup.apply` and `relabel.RelabelPlan`. Regular
+    expressions are compiled here, so the steps can be applied to many groups.
+
+    Args:
+        operations (Sequence[Tuple[str, Dict[str, Any]]]): Pairs of action
+            name and keyword arguments as taken by `AlertGroup.apply`.
+        cache_size (Optional[int], optional): Maximum number of names to
+            memoize per pattern match. Unbounded if `None`. Defaults to `None`.
+
+    Raises:
+        ValueError: If an action is unknown.
+
+    Returns:
+        List[Tuple[str, str, Any]]: Steps for `AlertGroup._apply_steps`.
+    """
+
+    steps: List[Tuple[str, _Target, Any]] = []
+
+    for action, kwargs in operations:
+        if action not in _ACTIONS:
+            raise ValueError(f"Unknown action '{action}'. Must be one of {_ACTIONS}.")
+
+        for target in _TARGETS:
+            argument = kwargs.get(target)
+
+            if not argument:
+                continue
+
+            if action == "remove":
+                argument = [argument] if isinstance(argument, str) else list(argument)
+            elif action == "remove_re":
+                argument = _NameMatches(_compile_patterns(argument), cache_size)
+            else:
+                argument = dict(argument)
+
+            steps.append((action, target, argument))
+
+    return steps
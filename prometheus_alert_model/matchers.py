@@ -0,0 +1,263 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import json
+import re
+from typing import (
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from typing_extensions import Literal
+
+_OPERATORS = ("=", "!=", "=~", "!~")
+
+_MATCHER = re.compile(
+    r"""
+    \s*(?P<name>[^\s=!~"]+)\s*
+    (?P<operator>=~|!~|!=|=)\s*
+    (?:"(?P<quoted>(?:[^"\\]|\\.)*)"|(?P<value>[^"]*?))\s*
+    """,
+    re.VERBOSE,
+)
+
+_ESCAPE = re.compile(r"\\(.)", re.DOTALL)
+_ESCAPED = {'"': '"', "\\": "\\", "n": "\n"}
+
+
+def _unescape(text: str) -> str:
+    """Unescapes a quoted matcher value like Alertmanager does.
+
+    Only `\\"`, `\\\\` and `\\n` are escape sequences. All other backslashes
+    are kept, so regular expressions like `host\\.example` stay intact.
+    """
+
+    return _ESCAPE.sub(lambda m: _ESCAPED.get(m.group(1), m.group(0)), text)
+
+
+class Matcher:
+    """Alertmanager style matcher for a single annotation or label.
+
+    Like in Alertmanager, a missing element is treated like an element with
+    an empty value and regular expressions are anchored at both ends.
+
+    Args:
+        name (str): Name of the annotation or label.
+        value (str): Value or regular expression to compare against.
+        operator (Literal["=", "!=", "=~", "!~"], optional): Type of the
+            matcher. Defaults to "=".
+        target (Literal["annotations", "labels"], optional): Elements to
+            match against. Defaults to "labels".
+
+    Raises:
+        ValueError: If the operator is unknown.
+        re.error: If the regular expression is invalid.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        value: str,
+        operator: Literal["=", "!=", "=~", "!~"] = "=",
+        target: Literal["annotations", "labels"] = "labels",
+    ) -> None:
+        if operator not in _OPERATORS:
+            raise ValueError(f"Unknown matcher operator '{operator}'.")
+
+        self.name = name
+        self.value = value
+        self.operator = operator
+        self.target = target
+
+        self._pattern = re.compile(value) if operator in ("=~", "!~") else None
+        self._negative = self.matches("")
+
+    @classmethod
+    def parse(
+        cls, text: str, target: Literal["annotations", "labels"] = "labels"
+    ) -> "Matcher":
+        """Parses a matcher like `severity=~"critical|warning"`.
+
+        Quotes around the value are optional. Quoted values can contain
+        escaped quotes, backslashes and newlines. Other backslashes are kept
+        as they are, like in Alertmanager.
+
+        Args:
+            text (str): Matcher to parse.
+            target (Literal["annotations", "labels"], optional): Elements to
+                match against. Defaults to "labels".
+
+        Returns:
+            Matcher: Parsed matcher.
+
+        Raises:
+            ValueError: If the text is not a valid matcher.
+        """
+
+        match = _MATCHER.fullmatch(text)
+
+        if match is None:
+            raise ValueError(f"Invalid matcher '{text}'.")
+
+        if match.group("quoted") is not None:
+            value = _unescape(match.group("quoted"))
+        else:
+            value = match.group("value")
+
+        return cls(match.group("name"), value, match.group("operator"), target)  # type: ignore
+
+    def matches(self, value: Optional[str]) -> bool:
+        """Checks a single value. `None` stands for a missing element."""
+
+        value = value or ""
+
+        if self.operator == "=":
+            return value == self.value
+        if self.operator == "!=":
+            return value != self.value
+        if self.operator == "=~":
+            return self._pattern.fullmatch(value) is not None  # type: ignore
+        return self._pattern.fullmatch(value) is None  # type: ignore
+
+    def _key(self) -> Tuple[str, str, str, str]:
+        return (self.name, self.operator, self.value, self.target)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Matcher) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        value = json.dumps(self.value)
+        return f"{self.__class__.__name__}({self.name}{self.operator}{value})"
+
+
+def parse_matchers(
+    matchers: Iterable[Union[Matcher, str]],
+    target: Literal["annotations", "labels"] = "labels",
+) -> List[Matcher]:
+    """Parses matchers given as strings and keeps existing `Matcher` objects.
+
+    Args:
+        matchers (Iterable[Union[Matcher, str]]): Matchers to parse.
+        target (Literal["annotations", "labels"], optional): Target of parsed
+            matchers. Defaults to "labels".
+
+    Returns:
+        List[Matcher]: Parsed matchers.
+    """
+
+    return [m if isinstance(m, Matcher) else Matcher.parse(m, target) for m in matchers]
+
+
+class ElementIndex:
+    """Inverted index from annotation or label values to alert positions.
+
+    Equality matchers are answered with a single lookup and regular
+    expressions are evaluated once per distinct value instead of once per
+    alert. Matchers that also match missing elements are evaluated as the
+    complement of the positions they do not match.
+
+    Args:
+        dcts (Sequence[Mapping[str, str]]): Annotations or labels of every
+            alert in order. Will not be mutated.
+    """
+
+    def __init__(self, dcts: Sequence[Mapping[str, str]]) -> None:
+        self.size = len(dcts)
+
+        index: Dict[str, Dict[str, List[int]]] = {}
+        self.positions: Mapping[str, Mapping[str, Collection[int]]] = index
+
+        for position, dct in enumerate(dcts):
+            for name, value in dct.items():
+                values = index.get(name)
+                if values is None:
+                    values = index[name] = {}
+                positions = values.get(value)
+                if positions is None:
+                    values[value] = [position]
+                else:
+                    positions.append(position)
+
+    def _all(self) -> Set[int]:
+        """Returns all positions."""
+
+        return set(range(self.size))
+
+    def _match(self, matcher: Matcher) -> Tuple[Set[int], bool]:
+        """Finds matching or, for negative matchers, non-matching positions.
+
+        Returns:
+            Tuple[Set[int], bool]: Positions and whether they are negative.
+        """
+
+        values = self.positions.get(matcher.name, {})
+        negative = matcher._negative
+
+        if matcher.operator in ("=", "!=") and matcher.value:
+            return set(values.get(matcher.value, ())), negative
+
+        positions: Set[int] = set()
+        for value, value_positions in values.items():
+            if matcher.matches(value) is not negative:
+                positions.update(value_positions)
+
+        return positions, negative
+
+    def select(
+        self,
+        matchers: Iterable[Matcher],
+        cache: Optional[Dict[Matcher, Tuple[Set[int], bool]]] = None,
+    ) -> List[int]:
+        """Finds positions of alerts that satisfy all matchers.
+
+        Args:
+            matchers (Iterable[Matcher]): Matchers to combine. Their target is
+                not checked.
+            cache (Optional[Dict[Matcher, Tuple[Set[int], bool]]], optional):
+                Results of single matchers to reuse across multiple calls with
+                overlapping matchers. Filled as needed. Defaults to `None`.
+
+        Returns:
+            List[int]: Matching positions in ascending order.
+        """
+
+        included: List[Set[int]] = []
+        excluded: List[Set[int]] = []
+
+        for matcher in matchers:
+            if cache is None:
+                positions, negative = self._match(matcher)
+            else:
+                found = cache.get(matcher)
+                if found is None:
+                    found = cache[matcher] = self._match(matcher)
+                positions, negative = found
+            (excluded if negative else included).append(positions)
+
+        if included:
+            included.sort(key=len)
+            result = set(included[0])
+            for positions in included[1:]:
+                if not result:
+                    break
+                result &= positions
+        else:
+            result = self._all()
+
+        for positions in excluded:
+            if not result:
+                break
+            result -= positions
+
+        return sorted(result)
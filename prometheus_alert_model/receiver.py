@@ -0,0 +1,412 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import asyncio
+import inspect
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .main import AlertGroup
+
+_logger = logging.getLogger(__name__)
+
+_REASONS = {
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+}
+
+Transform = Callable[[AlertGroup], Any]
+Callback = Callable[[AlertGroup], Any]
+
+
+def _process(body: bytes, transforms: Sequence[Transform], trusted: bool) -> AlertGroup:
+    """Parses and transforms a payload. Runs in the executor."""
+
+    if trusted:
+        alert_group = AlertGroup.from_trusted_json(body, lazy_timestamps=True)
+    else:
+        alert_group = AlertGroup.parse_raw(body)
+
+    for transform in transforms:
+        transform(alert_group)
+
+    return alert_group
+
+
+class WebhookReceiver:
+    """Receives Alertmanager webhooks without blocking the event loop.
+
+    Request bodies are put on a bounded queue right away. Requests are
+    rejected with status 429 while the queue is full, so Alertmanager backs
+    off and retries. Workers take bodies from the queue and parse and
+    transform them in an executor. Up to `concurrency` payloads are
+    processed at the same time, so small payloads do not wait behind a
+    large one. Resulting alert groups are passed to the callbacks on the
+    event loop. Callbacks may be coroutine functions.
+
+    The receiver can serve HTTP itself with only the standard library:
+
+    ```python
+    async def main():
+        async with WebhookReceiver([handle], transforms=[plan.apply]) as receiver:
+            server = await receiver.serve("0.0.0.0", 8080)
+            await server.serve_forever()
+    ```
+
+    It is also an ASGI application, so it can be run by any ASGI server or
+    mounted into frameworks like FastAPI with `app.mount("/alerts", receiver)`.
+
+    With the default thread pool, parsing still competes for the GIL but
+    the event loop stays responsive. Pass a `ProcessPoolExecutor` to parse
+    on multiple cores. Transforms must then be picklable, for example
+    `RelabelPlan.apply` or functions defined at module level.
+
+    Args:
+        callbacks (Iterable[Callable[[AlertGroup], Any]]): Called one after
+            the other with every processed alert group. Groups are passed
+            on as soon as they are processed, so they can overtake each
+            other if `concurrency` is larger than 1.
+        transforms (Sequence[Callable[[AlertGroup], Any]], optional): Called
+            with every parsed alert group in order within the executor.
+            Should change the group in place. Defaults to no transforms.
+        max_queue (int, optional): Maximum number of queued bodies.
+            Defaults to 100.
+        concurrency (int, optional): Number of payloads processed at the
+            same time. Also the size of the default thread pool.
+            Defaults to 4.
+        executor (Optional[Executor], optional): Executor to process
+            payloads in. Not shut down by the receiver. Defaults to a
+            thread pool owned by the receiver.
+        trusted (bool, optional): Skip validation like
+            `AlertGroup.from_trusted_json` and parse timestamps lazily.
+            Defaults to `False`.
+        path (Optional[str], optional): Only accept requests to this path.
+            Any path if `None`. Defaults to `None`.
+        max_body_size (int, optional): Maximum size of a request body in
+            bytes. Larger requests are rejected with status 413.
+            Defaults to 67108864.
+        on_error (Optional[Callable[[bytes, Exception], Any]], optional):
+            Called with the body and the exception if processing a payload
+            or a callback fails. Defaults to logging the exception.
+    """
+
+    def __init__(
+        self,
+        callbacks: Iterable[Callback],
+        transforms: Sequence[Transform] = (),
+        max_queue: int = 100,
+        concurrency: int = 4,
+        executor: Optional[Executor] = None,
+        trusted: bool = False,
+        path: Optional[str] = None,
+        max_body_size: int = 67108864,
+        on_error: Optional[Callable[[bytes, Exception], Any]] = None,
+    ) -> None:
+        self.callbacks = list(callbacks)
+        self.transforms = list(transforms)
+        self.max_queue = max_queue
+        self.concurrency = concurrency
+        self.trusted = trusted
+        self.path = path
+        self.max_body_size = max_body_size
+        self.on_error = on_error
+
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._queue: "Optional[asyncio.Queue[bytes]]" = None
+        self._workers: List[asyncio.Task] = []
+        self._servers: List[asyncio.AbstractServer] = []
+
+    # --------------------------------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        """Whether the workers are running."""
+
+        return self._queue is not None
+
+    async def start(self) -> None:
+        """Starts the workers. Ignored if they are already running."""
+
+        if self._queue is not None:
+            return
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.concurrency)
+
+        self._queue = asyncio.Queue(self.max_queue)
+        self._workers = [
+            asyncio.ensure_future(self._work(self._queue))
+            for _ in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        """Closes servers, processes all queued bodies and stops the workers."""
+
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+
+        if self._queue is None:
+            return
+
+        await self._queue.join()
+        self._queue = None
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def __aenter__(self) -> "WebhookReceiver":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.stop()
+
+    def submit(self, body: bytes) -> bool:
+        """Puts a body on the queue without waiting.
+
+        Args:
+            body (bytes): JSON encoded payload.
+
+        Returns:
+            bool: `False` if the queue is full and the body was dropped.
+
+        Raises:
+            RuntimeError: If the receiver is not running.
+        """
+
+        if self._queue is None:
+            raise RuntimeError("Receiver is not running. Call 'start' first.")
+
+        try:
+            self._queue.put_nowait(body)
+        except asyncio.QueueFull:
+            return False
+
+        return True
+
+    async def _work(self, queue: "asyncio.Queue[bytes]") -> None:
+        loop = asyncio.get_event_loop()
+
+        while True:
+            body = await queue.get()
+            try:
+                alert_group = await loop.run_in_executor(
+                    self._executor, _process, body, self.transforms, self.trusted
+                )
+                for callback in self.callbacks:
+                    result = callback(alert_group)
+                    if inspect.isawaitable(result):
+                        await result
+            except Exception as error:
+                if self.on_error is not None:
+                    self.on_error(body, error)
+                else:
+                    _logger.exception("Failed to process webhook payload.")
+            finally:
+                queue.task_done()
+
+    # --------------------------------------------------------------------------
+
+    async def handle(self, method: str, path: str, body: bytes) -> int:
+        """Handles a request and returns the status code to respond with.
+
+        Starts the workers if they are not running yet.
+
+        Args:
+            method (str): HTTP method.
+            path (str): Requested path. A query string is ignored.
+            body (bytes): Request body.
+
+        Returns:
+            int: 202 if the body was queued, 429 if the queue is full and
+                404 or 405 for requests that are not webhooks.
+        """
+
+        if self.path is not None and path.split("?", 1)[0] != self.path:
+            return 404
+        if method != "POST":
+            return 405
+
+        await self.start()
+
+        return 202 if self.submit(body) else 429
+
+    async def serve(
+        self, host: Optional[str] = None, port: int = 8080
+    ) -> asyncio.AbstractServer:
+        """Starts the workers and an HTTP/1.1 server on the event loop.
+
+        The server supports keep-alive but not chunked request bodies. It is
+        closed by `stop`.
+
+        Args:
+            host (Optional[str], optional): Interface to listen on. All
+                interfaces if `None`. Defaults to `None`.
+            port (int, optional): Port to listen on. Defaults to 8080.
+
+        Returns:
+            asyncio.AbstractServer: Running server.
+        """
+
+        await self.start()
+
+        server = await asyncio.start_server(self._serve_connection, host, port)
+        self._servers.append(server)
+
+        return server
+
+    async def _serve_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    self._respond(writer, 400, False)
+                    break
+
+                status, keep_alive, length = _parse_head(head)
+                if length > self.max_body_size:
+                    status, keep_alive = 413, False
+
+                if status == 0:
+                    body = await reader.readexactly(length)
+                    request_line = head.split(b"\r\n", 1)[0].decode("latin-1")
+                    method, target = request_line.split(" ", 2)[:2]
+                    status = await self.handle(method, target, body)
+
+                self._respond(writer, status, keep_alive)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _respond(writer: asyncio.StreamWriter, status: int, keep_alive: bool) -> None:
+        headers = [
+            f"HTTP/1.1 {status} {_REASONS[status]}",
+            "Content-Length: 0",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == 429:
+            headers.append("Retry-After: 1")
+
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1"))
+
+    # --------------------------------------------------------------------------
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        """ASGI application. Starts and stops the workers with the lifespan."""
+
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            body = await self._read_body(receive)
+            if body is None:
+                status = 413
+            else:
+                status = await self.handle(scope["method"], scope["path"], body)
+
+            headers = [(b"content-length", b"0")]
+            if status == 429:
+                headers.append((b"retry-after", b"1"))
+
+            await send(
+                {"type": "http.response.start", "status": status, "headers": headers}
+            )
+            await send({"type": "http.response.body", "body": b""})
+
+    async def _lifespan(self, receive: Any, send: Any) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await self.start()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.stop()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _read_body(self, receive: Any) -> Optional[bytes]:
+        """Reads an ASGI request body.
+
+        Returns `None` if the body is too large or the client disconnected.
+        """
+
+        chunks = []
+        size = 0
+        more_body = True
+
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return None
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            more_body = message.get("more_body", False)
+            if size > self.max_body_size:
+                return None
+
+        return b"".join(chunks)
+
+
+def _parse_head(head: bytes) -> Tuple[int, bool, int]:
+    """Checks the head of an HTTP request.
+
+    Returns:
+        Tuple[int, bool, int]: Status code to respond with right away or 0,
+            whether to keep the connection alive and the body length.
+    """
+
+    lines = head.decode("latin-1").split("\r\n")
+    parts = lines[0].split(" ")
+
+    if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+        return 400, False, 0
+
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    connection = headers.get("connection", "").lower()
+    if parts[2] == "HTTP/1.0":
+        keep_alive = connection == "keep-alive"
+    else:
+        keep_alive = connection != "close"
+
+    if "transfer-encoding" in headers:
+        return 411, False, 0
+    if parts[0] == "POST" and "content-length" not in headers:
+        return 411, False, 0
+
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        return 400, False, 0
+
+    if length < 0:
+        return 400, False, 0
+
+    return 0, keep_alive, length
@@ -0,0 +1,92 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .main import AlertGroup, compile_operations
+
+
+class RelabelPlan:
+    """Reusable set of actions that is compiled once and applied to many groups.
+
+    Modeled after `relabel_configs` in Prometheus. The configuration is a list
+    of rules that are applied in order. Every rule is a mapping with the key
+    `action` and further keys depending on the action. It has the same shape
+    as the respective YAML, so it can be loaded from a file with any YAML
+    library.
+
+    ```yaml
+    - action: labeldrop
+      regex: __.*
+    - action: add
+      labels:
+        cluster: a
+    - action: add_prefix
+      annotations:
+        summary: "Cluster A: "
+    ```
+
+    Supported actions:
+
+    - `remove`, `remove_re`, `add`, `override` and `add_prefix` take the keys
+        `annotations` and `labels` with the same values as the respective
+        methods of `AlertGroup`.
+    - `labeldrop` takes the key `regex` and removes all labels with names
+        that fully match the regex. Like in Prometheus, the regex is anchored.
+
+    Patterns are compiled once per plan. Which names match which rule is
+    memoized per plan, so names that occur in many alerts and groups are
+    only matched once.
+
+    Args:
+        config (Sequence[Mapping[str, Any]]): Rules to apply in order.
+        cache_size (Optional[int], optional): Maximum number of names to
+            memoize per rule. Unbounded if `None`. Defaults to 10000.
+
+    Raises:
+        ValueError: If a rule is invalid.
+    """
+
+    def __init__(
+        self, config: Sequence[Mapping[str, Any]], cache_size: Optional[int] = 10000
+    ) -> None:
+        operations: List[Tuple[str, Dict[str, Any]]] = []
+
+        for rule in config:
+            rule = dict(rule)
+            action = rule.pop("action", None)
+
+            if action == "labeldrop":
+                if "regex" not in rule:
+                    raise ValueError("Action 'labeldrop' requires key 'regex'.")
+                operations.append(("remove_re", {"labels": f"^(?:{rule['regex']})$"}))
+            elif action is None:
+                raise ValueError(f"Rule {rule} is missing key 'action'.")
+            else:
+                unknown = rule.keys() - {"annotations", "labels"}
+                if unknown:
+                    raise ValueError(f"Unknown keys {unknown} in rule for '{action}'.")
+                operations.append((action, rule))
+
+        self._steps = compile_operations(operations, cache_size=cache_size)
+
+    def apply(self, alert_group: AlertGroup) -> None:
+        """Applies the plan to an alert group in a single pass.
+
+        Args:
+            alert_group (AlertGroup): Alert group to transform in place.
+        """
+
+        if self._steps:
+            alert_group._apply_steps(self._steps)
+
+    def apply_all(self, alert_groups: Iterable[AlertGroup]) -> None:
+        """Applies the plan to multiple alert groups.
+
+        Args:
+            alert_groups (Iterable[AlertGroup]): Alert groups to transform in
+                place.
+        """
+
+        for alert_group in alert_groups:
+            self.apply(alert_group)
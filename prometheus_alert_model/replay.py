@@ -0,0 +1,241 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import gzip
+import io
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import IO, Deque, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .receiver import Transform, _process
+
+
+def open_archive(path: str, buffer_size: int = 1048576) -> IO[bytes]:
+    """Opens an archive of payloads for reading in binary mode.
+
+    Args:
+        path (str): Path to a file. Files ending with `.gz` are decompressed.
+            `-` stands for standard input.
+        buffer_size (int, optional): Size of the read buffer in bytes. Large
+            buffers reduce the number of system calls for long lines.
+            Defaults to 1048576.
+
+    Returns:
+        IO[bytes]: Binary stream. Must be closed by the caller.
+    """
+
+    if path == "-":
+        return os.fdopen(os.dup(sys.stdin.fileno()), "rb", buffering=buffer_size)
+    if path.endswith(".gz"):
+        return io.BufferedReader(gzip.GzipFile(path, "rb"), buffer_size)  # type: ignore
+    return open(path, "rb", buffering=buffer_size)
+
+
+def read_lines(paths: Iterable[str], buffer_size: int = 1048576) -> Iterator[bytes]:
+    """Yields the non-empty lines of JSONL archives one after the other.
+
+    Only one line is kept in memory at a time.
+
+    Args:
+        paths (Iterable[str]): Paths to archives. See `open_archive`.
+        buffer_size (int, optional): Size of the read buffer in bytes.
+            Defaults to 1048576.
+
+    Yields:
+        bytes: Lines without trailing whitespace.
+    """
+
+    for path in paths:
+        with open_archive(path, buffer_size) as file:
+            for line in file:
+                line = line.rstrip()
+                if line:
+                    yield line
+
+
+def _process_chunk(
+    chunk: List[bytes],
+    transforms: Sequence[Transform],
+    trusted: bool,
+    skip_invalid: bool,
+) -> Tuple[List[bytes], int, List[Tuple[int, str]]]:
+    """Parses, transforms and serializes a chunk of payloads.
+
+    Runs in worker processes. Returns JSON instead of alert groups because
+    pickling bytes is much cheaper than pickling models. Failures are
+    returned as position in the chunk and message, because not all
+    exceptions can be pickled. Stops at the first failure unless
+    `skip_invalid` is set.
+    """
+
+    results = []
+    alerts = 0
+    errors = []
+
+    for position, body in enumerate(chunk):
+        try:
+            alert_group = _process(body, transforms, trusted)
+        except Exception as error:
+            errors.append((position, f"{type(error).__name__}: {error}"))
+            if not skip_invalid:
+                break
+            continue
+        alerts += len(alert_group.alerts)
+        results.append(alert_group.to_webhook_json())
+
+    return results, alerts, errors
+
+
+def _chunked(payloads: Iterable[bytes], size: int) -> Iterator[List[bytes]]:
+    chunk: List[bytes] = []
+
+    for payload in payloads:
+        chunk.append(payload)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+class Replay:
+    """Parses and transforms many payloads across multiple processes.
+
+    Payloads are sent to a `ProcessPoolExecutor` in chunks. Every worker
+    parses the payloads of a chunk into alert groups, applies the transforms
+    and serializes the groups back to JSON with `AlertGroup.to_webhook_json`.
+    Only bytes cross process boundaries, so pickling does not dominate.
+    Iterating yields the results in input order. Only a few chunks per
+    worker are in flight at the same time, so memory does not grow with
+    the number of payloads.
+
+    ```python
+    plan = RelabelPlan(rules)
+    replay = Replay(read_lines(["2020-11-03.jsonl.gz"]), transforms=[plan.apply])
+    with open("out.jsonl", "wb") as file:
+        for line in replay:
+            file.write(line + b"\\n")
+    print(replay.payloads_per_second, replay.alerts_per_second)
+    ```
+
+    If a payload fails to be parsed or transformed, the iterator raises a
+    `ValueError` with the number of the payload after yielding all results
+    before it. With `skip_invalid` such payloads are skipped instead and
+    recorded in `errors`.
+
+    Args:
+        payloads (Iterable[bytes]): JSON encoded payloads, for example from
+            `read_lines`.
+        transforms (Sequence[Callable[[AlertGroup], Any]], optional): Called
+            with every parsed alert group in order. Must be picklable, for
+            example `RelabelPlan.apply` or functions defined at module level.
+            Defaults to no transforms.
+        workers (Optional[int], optional): Number of worker processes.
+            Processes everything in the current process if 1. Number of CPUs
+            if `None`. Defaults to `None`.
+        chunk_size (int, optional): Number of payloads sent to a worker at
+            once. Defaults to 64.
+        trusted (bool, optional): Skip validation like
+            `AlertGroup.from_trusted_json` and parse timestamps lazily.
+            Timestamps that are not read are written as they are.
+            Defaults to `False`.
+        skip_invalid (bool, optional): Skip payloads that fail instead of
+            stopping. Defaults to `False`.
+    """
+
+    def __init__(
+        self,
+        payloads: Iterable[bytes],
+        transforms: Sequence[Transform] = (),
+        workers: Optional[int] = None,
+        chunk_size: int = 64,
+        trusted: bool = False,
+        skip_invalid: bool = False,
+    ) -> None:
+        self.transforms = list(transforms)
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.trusted = trusted
+        self.skip_invalid = skip_invalid
+
+        self.payloads = 0
+        """Number of payloads yielded so far."""
+
+        self.alerts = 0
+        """Number of alerts in payloads yielded so far."""
+
+        self.seconds = 0.0
+        """Seconds from the start of the iteration until the last yield."""
+
+        self.errors: List[Tuple[int, str]] = []
+        """Number (starting at 1) and error message of failed payloads."""
+
+        self._payloads = payloads
+
+    @property
+    def payloads_per_second(self) -> float:
+        return self.payloads / self.seconds if self.seconds else 0.0
+
+    @property
+    def alerts_per_second(self) -> float:
+        return self.alerts / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        text = (
+            f"{self.payloads} payloads with {self.alerts} alerts in "
+            f"{self.seconds:.3f} s ({self.payloads_per_second:.1f} payloads/s, "
+            f"{self.alerts_per_second:.1f} alerts/s)"
+        )
+        if self.errors:
+            text += f", {len(self.errors)} invalid payloads"
+        return text
+
+    def __iter__(self) -> Iterator[bytes]:
+        start = time.perf_counter()
+        chunks = _chunked(self._payloads, self.chunk_size)
+
+        for results, alerts, errors in self._process(chunks):
+            processed = self.payloads + len(self.errors)
+            self.errors.extend((processed + i + 1, message) for i, message in errors)
+            self.payloads += len(results)
+            self.alerts += alerts
+            for result in results:
+                yield result
+            self.seconds = time.perf_counter() - start
+
+            if errors and not self.skip_invalid:
+                number, message = self.errors[-1]
+                raise ValueError(f"Payload {number} is invalid: {message}")
+
+    def _process(
+        self, chunks: Iterator[List[bytes]]
+    ) -> Iterator[Tuple[List[bytes], int, List[Tuple[int, str]]]]:
+        if self.workers == 1:
+            for chunk in chunks:
+                yield _process_chunk(
+                    chunk, self.transforms, self.trusted, self.skip_invalid
+                )
+            return
+
+        with ProcessPoolExecutor(self.workers) as executor:
+            pending: Deque[Future] = deque()
+
+            for chunk in chunks:
+                pending.append(
+                    executor.submit(
+                        _process_chunk,
+                        chunk,
+                        self.transforms,
+                        self.trusted,
+                        self.skip_invalid,
+                    )
+                )
+                if len(pending) >= 2 * self.workers:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
@@ -0,0 +1,154 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
+
+from pydantic.datetime_parse import parse_datetime
+from typing_extensions import Literal
+
+from .main import AlertGroup
+from .matchers import Matcher, parse_matchers
+
+_API_OPERATORS: Dict[Tuple[bool, bool], Literal["=", "!=", "=~", "!~"]] = {
+    (False, True): "=",
+    (False, False): "!=",
+    (True, True): "=~",
+    (True, False): "!~",
+}
+
+
+class Silence:
+    """Alertmanager silence with label matchers and a time window.
+
+    Args:
+        matchers (Iterable[Union[Matcher, str]]): Label matchers that must all
+            match. Strings are parsed with `Matcher.parse`.
+        starts_at (datetime): Start of the silence. Must be timezone aware.
+        ends_at (datetime): End of the silence, exclusive. Must be timezone
+            aware.
+        id (Optional[str], optional): Identifier of the silence. Defaults to
+            `None`.
+
+    Raises:
+        ValueError: If there is no matcher or a matcher is not for labels.
+    """
+
+    def __init__(
+        self,
+        matchers: Iterable[Union[Matcher, str]],
+        starts_at: datetime,
+        ends_at: datetime,
+        id: Optional[str] = None,
+    ) -> None:
+        self.matchers = parse_matchers(matchers)
+        self.starts_at = starts_at
+        self.ends_at = ends_at
+        self.id = id
+
+        if not self.matchers:
+            raise ValueError("Silence must have at least one matcher.")
+
+        if any(matcher.target != "labels" for matcher in self.matchers):
+            raise ValueError("Silences only support label matchers.")
+
+    @classmethod
+    def from_obj(cls, obj: Dict[str, Any]) -> "Silence":
+        """Creates silence from an object returned by the Alertmanager API.
+
+        Expects the schema of `/api/v2/silences` with the keys `matchers`,
+        `startsAt`, `endsAt` and optionally `id`. Every matcher has the keys
+        `name`, `value`, `isRegex` and optionally `isEqual`.
+
+        Args:
+            obj (Dict[str, Any]): Decoded silence. Will not be mutated.
+
+        Returns:
+            Silence: Silence constructed from the object.
+        """
+
+        matchers = [
+            Matcher(
+                matcher["name"],
+                matcher["value"],
+                _API_OPERATORS[(matcher["isRegex"], matcher.get("isEqual", True))],
+            )
+            for matcher in obj["matchers"]
+        ]
+
+        return cls(
+            matchers,
+            parse_datetime(obj["startsAt"]),
+            parse_datetime(obj["endsAt"]),
+            obj.get("id"),
+        )
+
+    def is_active(self, at: datetime) -> bool:
+        """Checks if the silence is active at the given time."""
+
+        return self.starts_at <= at < self.ends_at
+
+
+class SilenceSet:
+    """Evaluates many silences against all alerts of alert groups.
+
+    Silences with the same matchers are compiled into one entry, so their
+    matchers are evaluated only once. Matchers are evaluated against the
+    inverted label index of the alert group (see `AlertGroup.select`) and
+    results of matchers shared by several silences are reused. The cost
+    mostly depends on the number of candidate alerts of each silence instead
+    of silences times alerts.
+
+    ```python
+    silence_set = SilenceSet(Silence.from_obj(obj) for obj in response.json())
+    silenced, unsilenced = silence_set.evaluate(alert_group)
+    ```
+
+    Args:
+        silences (Iterable[Silence]): Silences to evaluate.
+    """
+
+    def __init__(self, silences: Iterable[Silence]) -> None:
+        self.silences = list(silences)
+
+        entries: Dict[FrozenSet[Matcher], List[Silence]] = {}
+        for silence in self.silences:
+            entries.setdefault(frozenset(silence.matchers), []).append(silence)
+
+        self._entries = [
+            (list(matchers), silences) for matchers, silences in entries.items()
+        ]
+
+    def evaluate(
+        self, alert_group: AlertGroup, at: Optional[datetime] = None
+    ) -> Tuple[List[str], List[str]]:
+        """Splits alerts into silenced and not silenced alerts.
+
+        Args:
+            alert_group (AlertGroup): Alert group to evaluate. Will not be
+                mutated except for caching its label index.
+            at (Optional[datetime], optional): Point in time to evaluate
+                silences at. Defaults to now.
+
+        Returns:
+            Tuple[List[str], List[str]]: Fingerprints of silenced alerts and
+                of alerts that are not silenced, both in the order of the group.
+        """
+
+        at = at or datetime.now(timezone.utc)
+        index = alert_group._element_index("labels")
+        cache: Dict[Matcher, Tuple[Set[int], bool]] = {}
+        silenced: Set[int] = set()
+
+        for matchers, silences in self._entries:
+            if len(silenced) == index.size:
+                break
+            if any(silence.is_active(at) for silence in silences):
+                silenced.update(index.select(matchers, cache))
+
+        alerts = alert_group.alerts
+
+        return (
+            [alert.fingerprint for i, alert in enumerate(alerts) if i in silenced],
+            [alert.fingerprint for i, alert in enumerate(alerts) if i not in silenced],
+        )
@@ -0,0 +1,296 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import (
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .main import Alert, AlertGroup
+from .matchers import ElementIndex, Matcher, parse_matchers
+
+
+class _LabelIndex(ElementIndex):
+    """Inverted label index over the slots of a store. Updated incrementally."""
+
+    def __init__(self, names: Optional[Collection[str]] = None) -> None:
+        self.size = 0
+        self.names = frozenset(names) if names is not None else None
+        self._sets: Dict[str, Dict[str, Set[int]]] = {}
+        self._slots: Set[int] = set()
+        self.positions = self._sets
+
+    def _all(self) -> Set[int]:
+        return set(self._slots)
+
+    def add(self, slot: int, labels: Mapping[str, str]) -> None:
+        self._slots.add(slot)
+        self.size = len(self._slots)
+
+        for name, value in labels.items():
+            if self.names is None or name in self.names:
+                self._sets.setdefault(name, {}).setdefault(value, set()).add(slot)
+
+    def discard(self, slot: int, labels: Mapping[str, str]) -> None:
+        self._slots.discard(slot)
+        self.size = len(self._slots)
+
+        for name, value in labels.items():
+            if self.names is not None and name not in self.names:
+                continue
+            values = self._sets[name]
+            slots = values[value]
+            slots.discard(slot)
+            if not slots:
+                del values[value]
+                if not values:
+                    del self._sets[name]
+
+
+class AlertStore:
+    """Keeps the latest state of alerts across all alert groups.
+
+    Alerts are upserted by fingerprint, so resends of a group only replace
+    what is already stored. An alert that is routed into several groups is
+    stored once and belongs to all of them. If it is resolved in one group,
+    it only leaves that group and is removed once it is in no group anymore.
+    The store keeps alerts in the order they were last seen. Stale alerts are evicted from the front until none is older
+    than `ttl` and the least recently seen alerts are evicted once there are
+    more than `max_alerts`. Neither requires a scan over all stored alerts.
+
+    Alerts are indexed by group key and by labels. Stored alerts are the
+    objects from the ingested groups and must not be changed afterwards.
+
+    ```python
+    store = AlertStore(ttl=timedelta(hours=1), max_alerts=100000)
+    store.ingest(alert_group)
+    store.select(['severity="critical"'])
+    ```
+
+    Args:
+        ttl (Optional[timedelta], optional): Maximum time since an alert was
+            last seen. Unlimited if `None`. Defaults to `None`.
+        max_alerts (Optional[int], optional): Maximum number of alerts.
+            Unlimited if `None`. Defaults to `None`.
+        keep_resolved (bool, optional): Keep resolved alerts until they are
+            evicted instead of removing them right away. Defaults to `False`.
+        indexed_labels (Optional[Collection[str]], optional): Names of labels
+            to index. Matchers for other labels are checked per candidate
+            alert. Restricting the index to labels with few distinct values
+            saves a lot of memory. All labels if `None`. Defaults to `None`.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[timedelta] = None,
+        max_alerts: Optional[int] = None,
+        keep_resolved: bool = False,
+        indexed_labels: Optional[Collection[str]] = None,
+    ) -> None:
+        self.ttl = ttl
+        self.max_alerts = max_alerts
+        self.keep_resolved = keep_resolved
+
+        # Fingerprint -> slot, ordered from least to most recently seen.
+        self._slots: "OrderedDict[str, int]" = OrderedDict()
+        self._alerts: List[Optional[Alert]] = []
+        self._group_keys: List[Tuple[str, ...]] = []
+        self._seen: List[datetime] = []
+        self._free: List[int] = []
+
+        # Group key -> slots in the order they joined the group.
+        self._by_group_key: Dict[str, Dict[int, None]] = {}
+        self._index = _LabelIndex(indexed_labels)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, fingerprint: object) -> bool:
+        return fingerprint in self._slots
+
+    def __iter__(self) -> Iterator[Alert]:
+        """Yields alerts from least to most recently seen."""
+
+        for slot in self._slots.values():
+            yield self._alerts[slot]  # type: ignore
+
+    def get(self, fingerprint: str) -> Optional[Alert]:
+        """Returns the latest version of an alert or `None`."""
+
+        slot = self._slots.get(fingerprint)
+
+        return self._alerts[slot] if slot is not None else None
+
+    # --------------------------------------------------------------------------
+
+    def _join(self, slot: int, group_key: str) -> None:
+        """Adds the alert in a slot to a group."""
+
+        self._group_keys[slot] += (group_key,)
+        self._by_group_key.setdefault(group_key, {})[slot] = None
+
+    def _leave(self, slot: int, group_key: str) -> None:
+        """Removes the alert in a slot from a group."""
+
+        self._group_keys[slot] = tuple(
+            key for key in self._group_keys[slot] if key != group_key
+        )
+
+        slots = self._by_group_key[group_key]
+        del slots[slot]
+        if not slots:
+            del self._by_group_key[group_key]
+
+    def _remove(self, fingerprint: str) -> None:
+        slot = self._slots.pop(fingerprint)
+
+        self._index.discard(slot, self._alerts[slot].labels)  # type: ignore
+        for group_key in self._group_keys[slot]:
+            self._leave(slot, group_key)
+
+        self._alerts[slot] = None
+        self._free.append(slot)
+
+    def discard(self, fingerprint: str) -> None:
+        """Removes an alert. Ignored if the alert is not stored."""
+
+        if fingerprint in self._slots:
+            self._remove(fingerprint)
+
+    def ingest(
+        self,
+        alert_group: Union[AlertGroup, Iterable[AlertGroup]],
+        at: Optional[datetime] = None,
+    ) -> None:
+        """Upserts all alerts of one or more alert groups and evicts alerts.
+
+        Args:
+            alert_group (Union[AlertGroup, Iterable[AlertGroup]]): Alert groups
+                to ingest.
+            at (Optional[datetime], optional): Point in time the groups were
+                received. Defaults to now.
+        """
+
+        at = at or datetime.now(timezone.utc)
+        groups = [alert_group] if isinstance(alert_group, AlertGroup) else alert_group
+
+        for group in groups:
+            group_key = group.group_key
+
+            for alert in group.alerts:
+                fingerprint = alert.fingerprint
+                slot = self._slots.get(fingerprint)
+
+                if alert.status == "resolved" and not self.keep_resolved:
+                    if slot is not None and group_key in self._group_keys[slot]:
+                        self._leave(slot, group_key)
+                        if not self._group_keys[slot]:
+                            self._remove(fingerprint)
+                    continue
+
+                if slot is None:
+                    if self._free:
+                        slot = self._free.pop()
+                        self._seen[slot] = at
+                    else:
+                        slot = len(self._alerts)
+                        self._alerts.append(None)
+                        self._group_keys.append(())
+                        self._seen.append(at)
+                    self._slots[fingerprint] = slot
+                    self._alerts[slot] = alert
+                    self._index.add(slot, alert.labels)
+                    self._join(slot, group_key)
+                    continue
+
+                previous: Alert = self._alerts[slot]  # type: ignore
+                if previous.labels != alert.labels:
+                    self._index.discard(slot, previous.labels)
+                    self._index.add(slot, alert.labels)
+                self._alerts[slot] = alert
+
+                if group_key not in self._group_keys[slot]:
+                    self._join(slot, group_key)
+
+                self._seen[slot] = at
+                self._slots.move_to_end(fingerprint)
+
+        self.evict(at)
+
+    def evict(self, at: Optional[datetime] = None) -> int:
+        """Evicts alerts that exceed `ttl` or `max_alerts`.
+
+        Called by `ingest`. Only looks at the least recently seen alerts.
+
+        Args:
+            at (Optional[datetime], optional): Point in time to compare `ttl`
+                against. Defaults to now.
+
+        Returns:
+            int: Number of evicted alerts.
+        """
+
+        at = at or datetime.now(timezone.utc)
+        evicted = 0
+
+        while self._slots:
+            fingerprint, slot = next(iter(self._slots.items()))
+            too_many = self.max_alerts is not None and len(self._slots) > self.max_alerts
+            too_old = self.ttl is not None and self._seen[slot] + self.ttl < at
+            if not (too_many or too_old):
+                break
+            self._remove(fingerprint)
+            evicted += 1
+
+        return evicted
+
+    # --------------------------------------------------------------------------
+
+    def by_group_key(self, group_key: str) -> List[Alert]:
+        """Returns all stored alerts of an alert group.
+
+        Alerts are in the order they joined the group.
+        """
+
+        return [self._alerts[slot] for slot in self._by_group_key.get(group_key, ())]  # type: ignore
+
+    def select(self, matchers: Iterable[Union[Matcher, str]]) -> List[Alert]:
+        """Returns stored alerts whose labels satisfy all matchers.
+
+        Args:
+            matchers (Iterable[Union[Matcher, str]]): Label matchers. Strings
+                are parsed with `Matcher.parse`.
+
+        Returns:
+            List[Alert]: Matching alerts.
+
+        Raises:
+            ValueError: If a matcher is invalid or not for labels.
+        """
+
+        parsed = parse_matchers(matchers)
+
+        if any(matcher.target != "labels" for matcher in parsed):
+            raise ValueError("Store only supports label matchers.")
+
+        names = self._index.names
+        indexed = [m for m in parsed if names is None or m.name in names]
+        unindexed = [m for m in parsed if names is not None and m.name not in names]
+
+        selected = []
+        for slot in self._index.select(indexed):
+            alert: Alert = self._alerts[slot]  # type: ignore
+            if all(m.matches(alert.labels.get(m.name)) for m in unindexed):
+                selected.append(alert)
+
+        return selected
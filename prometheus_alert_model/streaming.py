@@ -0,0 +1,246 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import codecs
+import json
+import re
+import tempfile
+from typing import IO, Any, Dict, Iterator, Optional
+
+from .main import _GROUP_FIELD_NAMES, Alert, AlertGroup
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+_HEADER_FIELDS = set(AlertGroup.__fields__) - {"alerts"}
+
+
+class _Scanner:
+    """Tokenizes a JSON document read incrementally from a stream."""
+
+    def __init__(self, stream: IO, chunk_size: int) -> None:
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> None:
+        """Reads the next chunk and drops the already consumed part of the buffer.
+
+        Reads at least as much as is pending in the buffer, so a single large
+        value is read in a logarithmic number of steps.
+        """
+
+        if self._eof:
+            raise ValueError("Unexpected end of JSON stream.")
+
+        pending = len(self._buffer) - self._pos
+        chunk = self._stream.read(max(self._chunk_size, pending))
+
+        if isinstance(chunk, bytes):
+            text = self._decoder.decode(chunk, final=not chunk)
+        else:
+            text = chunk
+
+        self._eof = not chunk
+        self._buffer = self._buffer[self._pos :] + text
+        self._pos = 0
+
+    def peek(self) -> str:
+        """Returns the next non-whitespace character without consuming it."""
+
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()  # type: ignore
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            self._fill()
+
+    def expect(self, char: str) -> None:
+        """Consumes the given character or raises `ValueError`."""
+
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found}' in JSON stream.")
+        self._pos += 1
+
+    def consume(self, char: str) -> bool:
+        """Consumes the given character if it is next."""
+
+        if self.peek() == char:
+            self._pos += 1
+            return True
+        return False
+
+    def value(self, raw: Optional[IO] = None) -> Any:
+        """Decodes the next value. Copies its JSON text to `raw` if given."""
+
+        self.peek()
+
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            else:
+                # A value at the very end of the buffer might be a truncated number.
+                if end < len(self._buffer) or self._eof:
+                    if raw is not None:
+                        raw.write(self._buffer[self._pos : end])
+                    self._pos = end
+                    return obj
+
+            self._fill()
+
+
+class AlertGroupReader:
+    """Reads an alert group from a stream with bounded memory.
+
+    First reads everything except for the alerts and provides it as `header`.
+    Afterwards, iterating over the reader yields the alerts one at a time.
+    Specific elements of the alerts are calculated lazily from the common
+    elements in the header.
+
+    ```python
+    with open("payload.json", "rb") as file:
+        reader = AlertGroupReader(file)
+        print(reader.header.group_key)
+        for alert in reader:
+            print(alert.specific_labels)
+    ```
+
+    Alertmanager puts the alerts in front of most other fields. In that case
+    the raw JSON of the alerts is buffered in a temporary file that is only
+    kept in memory up to `spool_size` characters. If the alerts come after
+    all fields of `AlertGroup`, they are read directly from the stream and
+    unknown fields that follow them are skipped.
+
+    Args:
+        stream (IO): Binary (UTF-8) or text stream, for example an open file
+            or `socket.makefile("rb")`. Is not closed by the reader.
+        chunk_size (int, optional): Number of bytes or characters to read
+            at once. Defaults to 65536.
+        spool_size (int, optional): Maximum number of characters of buffered
+            alerts to keep in memory. Defaults to 1048576.
+        trusted (bool, optional): Skip validation like
+            `AlertGroup.from_trusted_obj`. Defaults to `False`.
+
+    Raises:
+        ValueError: If the stream does not contain a JSON object with the
+            field `alerts`.
+    """
+
+    def __init__(
+        self,
+        stream: IO,
+        chunk_size: int = 65536,
+        spool_size: int = 1048576,
+        trusted: bool = False,
+    ) -> None:
+        self._scanner = _Scanner(stream, chunk_size)
+        self._chunk_size = chunk_size
+        self._trusted = trusted
+        self._spool: Optional[IO] = None
+        self._consumed = False
+
+        values: Dict[str, Any] = {}
+        alerts_found = False
+
+        self._scanner.expect("{")
+
+        if not self._scanner.consume("}"):
+            while True:
+                key = self._scanner.value()
+                self._scanner.expect(":")
+
+                if key == "alerts":
+                    alerts_found = True
+                    if _HEADER_FIELDS <= {_GROUP_FIELD_NAMES.get(k, k) for k in values}:
+                        break
+                    self._spool = tempfile.SpooledTemporaryFile(
+                        max_size=spool_size, mode="w+", encoding="utf-8"
+                    )
+                    self._copy_array(self._spool)
+                    self._spool.seek(0)
+                else:
+                    values[key] = self._scanner.value()
+
+                if not self._scanner.consume(","):
+                    self._scanner.expect("}")
+                    break
+
+        if not alerts_found:
+            raise ValueError("Field 'alerts' is missing in JSON stream.")
+
+        values["alerts"] = []
+
+        if trusted:
+            self.header = AlertGroup.from_trusted_obj(values)
+        else:
+            self.header = AlertGroup.parse_obj(values)
+
+        self._common = {
+            "annotations": self.header.common_annotations,
+            "labels": self.header.common_labels,
+        }
+
+    def _copy_array(self, raw: IO) -> None:
+        """Copies the raw JSON of an array element by element."""
+
+        self._scanner.expect("[")
+        raw.write("[")
+
+        if not self._scanner.consume("]"):
+            while True:
+                self._scanner.value(raw=raw)
+                if not self._scanner.consume(","):
+                    self._scanner.expect("]")
+                    break
+                raw.write(",")
+
+        raw.write("]")
+
+    def _iter_array(self, scanner: _Scanner) -> Iterator[Any]:
+        scanner.expect("[")
+
+        if not scanner.consume("]"):
+            while True:
+                yield scanner.value()
+                if not scanner.consume(","):
+                    scanner.expect("]")
+                    break
+
+    def _create_alert(self, obj: Dict[str, Any]) -> Alert:
+        alert = Alert.from_trusted_obj(obj) if self._trusted else Alert.parse_obj(obj)
+
+        object.__setattr__(alert, "_common", self._common)
+        alert.__dict__.pop("specific_annotations", None)
+        alert.__dict__.pop("specific_labels", None)
+
+        return alert
+
+    def __iter__(self) -> Iterator[Alert]:
+        """Yields the alerts one at a time. Can only be iterated once."""
+
+        if self._consumed:
+            return
+
+        self._consumed = True
+
+        if self._spool is not None:
+            try:
+                for obj in self._iter_array(_Scanner(self._spool, self._chunk_size)):
+                    yield self._create_alert(obj)
+            finally:
+                self._spool.close()
+        else:
+            for obj in self._iter_array(self._scanner):
+                yield self._create_alert(obj)
+
+            while self._scanner.consume(","):
+                self._scanner.value()
+                self._scanner.expect(":")
+                self._scanner.value()
+            self._scanner.expect("}")
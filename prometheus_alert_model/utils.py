@@ -1,31 +1,434 @@
 # Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
 # Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
 
-from typing import Dict, List
+import gc
+import json
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import (
+    Any,
+    Dict,
+    ItemsView,
+    Iterable,
+    Iterator,
+    KeysView,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Set,
+    Union,
+    ValuesView,
+)
 
+from pydantic.datetime_parse import parse_datetime
 
-def intersect(list_of_dcts: List[Dict[str, str]]) -> Dict[str, str]:
-    """Calculates the key-value intersection of a list of dictionaries.
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+_MISSING = object()
+
+_NOT_SIZED = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)
+
+_TIMESTAMP = re.compile(
+    r"(\d{4})-(\d\d)-(\d\d)[Tt ](\d\d):(\d\d):(\d\d)(?:\.(\d{1,6})\d*)?"
+    r"(?:([Zz])|([+-])(\d\d):?(\d\d))\Z"
+)
+
+
+def intersect(list_of_dcts: Iterable[Mapping[str, str]]) -> Dict[str, str]:
+    """Calculates the key-value intersection of multiple dictionaries.
+
+    Starts with the smallest dictionary if a sequence is given and only checks
+    the surviving elements against every following dictionary. Stops as soon
+    as the intersection is empty.
 
     Args:
-        list_of_dcts (List[Dict[str, str]]): List of dictionaries to intersect.
-            Will not be mutated.
+        list_of_dcts (Iterable[Mapping[str, str]]): Dictionaries to intersect.
+            Can be any iterable, for example a generator. Will not be mutated.
 
     Returns:
         Dict[str, str]: A new dictionary that contains the intersection of all
             key-value combinations. Meaning all key-values that occur in very
-            single dictionary in the given list. If the given list is empty,
-            an empty `dict` will be returned. If the given list contains only
-            one `dict`, this `dict` will be copied and returned.
+            single dictionary in the given iterable. If the given iterable is
+            empty, an empty `dict` will be returned. If the given iterable
+            contains only one `dict`, this `dict` will be copied and returned.
+    """
+
+    if isinstance(list_of_dcts, Sequence):
+        if len(list_of_dcts) == 0:
+            return {}
+        smallest = min(list_of_dcts, key=len)
+        iterator: Iterator[Mapping[str, str]] = iter(list_of_dcts)
+    else:
+        iterator = iter(list_of_dcts)
+        smallest = next(iterator, None)
+        if smallest is None:
+            return {}
+
+    intersection = dict(smallest)
+
+    if not intersection:
+        return intersection
+
+    for dct in iterator:
+        if dct is smallest:
+            continue
+        if len(dct) < len(intersection):
+            intersection = {
+                key: value
+                for key, value in dct.items()
+                if intersection.get(key, _MISSING) == value
+            }
+        else:
+            intersection = {
+                key: value
+                for key, value in intersection.items()
+                if dct.get(key, _MISSING) == value
+            }
+        if not intersection:
+            break
+
+    return intersection
+
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    """Deserializes a JSON document.
+
+    Uses `orjson` if it is installed and falls back to the standard library
+    `json` module otherwise.
+
+    Args:
+        data (Union[bytes, bytearray, str]): JSON document to deserialize.
+
+    Returns:
+        Any: Deserialized Python object.
     """
 
-    if len(list_of_dcts) == 0:
-        return {}
-    elif len(list_of_dcts) == 1:
-        return list_of_dcts[0].copy()
+    if orjson is not None:
+        return orjson.loads(data)
+
+    return json.loads(data)
+
+
+def _encode_default(obj: Any) -> Any:
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if isinstance(obj, datetime):
+        return format_datetime(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """Serializes an object to a compact UTF-8 encoded JSON document.
+
+    Uses `orjson` if it is installed and falls back to the standard library
+    `json` module otherwise. Mappings that are not a `dict` are serialized
+    like a `dict` and timestamps with `format_datetime`, so both produce the
+    same output.
+
+    Args:
+        obj (Any): Object to serialize.
+
+    Returns:
+        bytes: JSON document.
+    """
+
+    if orjson is not None:
+        return orjson.dumps(
+            obj, default=_encode_default, option=orjson.OPT_PASSTHROUGH_DATETIME
+        )
+
+    return json.dumps(
+        obj, default=_encode_default, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+@lru_cache(maxsize=4096)
+def format_datetime(dt: datetime) -> str:
+    """Formats a timestamp like Alertmanager in RFC 3339 format with `Z` suffix.
+
+    Trailing zeros of the fraction are removed. Naive timestamps are treated
+    as UTC. The zero time is formatted as `0001-01-01T00:00:00Z`, also if it
+    has a positive offset and thus lies before the smallest representable
+    time in UTC. Results are cached because the same timestamps tend to
+    repeat in a group.
+
+    Args:
+        dt (datetime): Timestamp to format.
+
+    Returns:
+        str: Formatted timestamp.
+    """
+
+    offset = dt.utcoffset()
+    if offset:
+        try:
+            dt = dt - offset
+        except OverflowError:
+            # Before the zero time or after year 9999 in UTC. Clamp.
+            dt = datetime.min if dt.year == 1 else datetime.max
+
+    text = (
+        f"{dt.year:04}-{dt.month:02}-{dt.day:02}"
+        f"T{dt.hour:02}:{dt.minute:02}:{dt.second:02}"
+    )
+
+    if dt.microsecond:
+        text += f".{dt.microsecond:06}".rstrip("0")
+
+    return text + "Z"
+
+
+@lru_cache(maxsize=4096)
+def parse_timestamp(text: str) -> datetime:
+    """Parses a timestamp in the RFC 3339 format used by Alertmanager.
+
+    Handles fractions of up to nanosecond precision by truncating them to
+    microseconds like Pydantic does. Anything else, for example timestamps
+    without timezone, is passed on to Pydantic's `parse_datetime`. Results
+    are cached because the same timestamps tend to repeat in and across
+    payloads. The zero time `0001-01-01T00:00:00Z` is the most common one.
+
+    Args:
+        text (str): Timestamp to parse.
+
+    Returns:
+        datetime: Timezone aware timestamp.
+
+    Raises:
+        ValueError: If the timestamp is invalid.
+    """
+
+    match = _TIMESTAMP.match(text)
+
+    if match is None:
+        return parse_datetime(text)
+
+    year, month, day, hour, minute, second, fraction, utc, sign, hours, minutes = (
+        match.groups()
+    )
+
+    if utc:
+        tzinfo = timezone.utc
+    else:
+        offset = timedelta(hours=int(hours), minutes=int(minutes))
+        tzinfo = timezone(-offset if sign == "-" else offset)
+
+    return datetime(
+        int(year),
+        int(month),
+        int(day),
+        int(hour),
+        int(minute),
+        int(second),
+        int(fraction.ljust(6, "0")) if fraction else 0,
+        tzinfo,
+    )
+
+
+class ElementCounter:
+    """Counts how many dictionaries carry each key-value combination.
+
+    Allows keeping the intersection of a changing collection of dictionaries
+    up-to-date in time proportional to the change instead of the size of the
+    collection.
+
+    Args:
+        dcts (Iterable[Dict[str, str]], optional): Dictionaries to count
+            initially. Will not be mutated. Defaults to no dictionaries.
+    """
+
+    def __init__(self, dcts: Iterable[Dict[str, str]] = ()) -> None:
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self.total = 0
+
+        for dct in dcts:
+            self.add(dct)
+
+    def add(self, dct: Dict[str, str]) -> None:
+        """Counts all elements of a dictionary that joins the collection."""
+
+        self.total += 1
+        for key, value in dct.items():
+            self.increment(key, value)
+
+    def discard(self, dct: Dict[str, str]) -> None:
+        """Uncounts all elements of a dictionary that leaves the collection."""
+
+        self.total -= 1
+        for key, value in dct.items():
+            self.decrement(key, value)
+
+    def increment(self, key: str, value: str) -> None:
+        """Counts a single key-value combination once more."""
+
+        values = self.counts.setdefault(key, {})
+        values[value] = values.get(value, 0) + 1
+
+    def decrement(self, key: str, value: str) -> None:
+        """Counts a single key-value combination once less."""
+
+        values = self.counts[key]
+        if values[value] == 1:
+            del values[value]
+            if not values:
+                del self.counts[key]
+        else:
+            values[value] -= 1
+
+    def common(self, key: str) -> Optional[str]:
+        """Returns the value shared by all dictionaries for the given key.
+
+        Returns:
+            Optional[str]: The value if every dictionary contains the key with
+                the same value. Otherwise `None`.
+        """
+
+        values = self.counts.get(key)
+
+        if values and len(values) == 1:
+            value, count = next(iter(values.items()))
+            if count == self.total:
+                return value
+
+        return None
+
+    def intersection(self) -> Dict[str, str]:
+        """Returns the key-value intersection of all counted dictionaries."""
+
+        intersection = {}
+
+        for key, values in self.counts.items():
+            if len(values) == 1:
+                value, count = next(iter(values.items()))
+                if count == self.total:
+                    intersection[key] = value
+
+        return intersection
+
+
+class DeepSizer:
+    """Sums the sizes of objects and everything they reference.
+
+    Every object is counted once across all calls of `size`, so consecutive
+    calls attribute shared objects to the first call that reaches them.
+    Classes, modules and functions are neither counted nor followed. Also
+    counts strings that are equal to an already counted string but are a
+    separate object.
+
+    Args:
+        exclude (Iterable[Any], optional): Objects that are neither counted
+            nor followed. Defaults to no objects.
+    """
+
+    def __init__(self, exclude: Iterable[Any] = ()) -> None:
+        self.seen: Set[int] = {id(obj) for obj in exclude}
+        self.strings: Dict[str, str] = {}
+        self.duplicate_strings = 0
+        self.duplicate_string_bytes = 0
+
+    def size(self, *objs: Any) -> int:
+        """Returns the size in bytes of all objects not counted before."""
+
+        total = 0
+        stack = list(objs)
+
+        while stack:
+            obj = stack.pop()
+
+            if id(obj) in self.seen or isinstance(obj, _NOT_SIZED):
+                continue
+            self.seen.add(id(obj))
+
+            size = sys.getsizeof(obj)
+            total += size
+
+            if type(obj) is str:
+                if self.strings.setdefault(obj, obj) is not obj:
+                    self.duplicate_strings += 1
+                    self.duplicate_string_bytes += size
+            else:
+                stack.extend(gc.get_referents(obj))
+                if isinstance(obj, dict):
+                    # Not referents of dicts with only string keys.
+                    stack.extend(obj)
+
+        return total
+
+
+class CopyOnWriteDict(MutableMapping[str, str]):
+    """Mapping that shares its storage with others until it is written to.
+
+    Reading is delegated to the shared `dict`. The first write copies the
+    shared `dict`, so changes never leak into other mappings that share the
+    same storage.
+
+    Args:
+        data (Dict[str, str]): Shared storage. Will not be mutated.
+    """
+
+    __slots__ = ("_data", "_owned")
+
+    def __init__(self, data: Dict[str, str]) -> None:
+        self._data = data
+        self._owned = False
+
+    def _own(self) -> Dict[str, str]:
+        if not self._owned:
+            self._data = dict(self._data)
+            self._owned = True
+        return self._data
+
+    def __getitem__(self, key: str) -> str:
+        return self._data[key]
+
+    def __setitem__(self, key: str, value: str) -> None:
+        self._own()[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self._own()[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CopyOnWriteDict):
+            return self._data == other._data
+        return self._data == other
+
+    def __repr__(self) -> str:
+        return repr(self._data)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._data.get(key, default)
+
+    def pop(self, key: str, *args: Any) -> Any:
+        if key not in self._data:
+            if args:
+                return args[0]
+            raise KeyError(key)
+        return self._own().pop(key)
+
+    def keys(self) -> KeysView[str]:
+        return self._data.keys()
 
-    list_of_sets = [set(dct.items()) for dct in list_of_dcts]
+    def values(self) -> ValuesView[str]:
+        return self._data.values()
 
-    intersection_set = list_of_sets[0].intersection(*list_of_sets[1:])
+    def items(self) -> ItemsView[str, str]:
+        return self._data.items()
 
-    return dict(intersection_set)
+    def copy(self) -> Dict[str, str]:
+        return dict(self._data)
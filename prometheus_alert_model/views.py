@@ -0,0 +1,237 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+from datetime import datetime
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple, Union
+
+from .main import (
+    _ALERT_FIELD_NAMES,
+    _ALERT_FIELDS,
+    _GROUP_FIELD_NAMES,
+    _GROUP_FIELDS,
+    Alert,
+    AlertGroup,
+)
+from .utils import loads, parse_timestamp
+
+_ALERT_ALIASES = frozenset(_ALERT_FIELD_NAMES)
+_GROUP_ALIASES = frozenset(_GROUP_FIELD_NAMES)
+
+
+def _extra(obj: Mapping[str, Any], known: frozenset) -> Optional[Dict[str, Any]]:
+    """Returns entries with unknown keys or `None` if there are none."""
+
+    if obj.keys() <= known:
+        return None
+
+    return {key: value for key, value in obj.items() if key not in known}
+
+
+class AlertView(NamedTuple):
+    """Compact read-only view of an alert.
+
+    A named tuple without `__dict__` and without any validation or change
+    tracking. Uses a fraction of the memory of `Alert` and attributes are
+    read faster. Annotations and labels are shared with the object the view
+    was built from and must not be mutated. Use `to_alert` to get a mutable
+    `Alert`. Specific elements are not available on views.
+    """
+
+    fingerprint: str
+    status: str
+    labels: Dict[str, str]
+    annotations: Dict[str, str]
+    starts_at: datetime
+    ends_at: datetime
+    generator_url: str
+    extra: Optional[Dict[str, Any]] = None
+    """Fields that are not part of the Alertmanager schema. `None` if there
+    are none."""
+
+    @classmethod
+    def from_obj(cls, obj: Dict[str, Any]) -> "AlertView":
+        """Creates view from a trusted decoded alert without validating it.
+
+        Timestamps are parsed with a cache, so repeated timestamps like the
+        zero time are only parsed once.
+
+        Args:
+            obj (Dict[str, Any]): Decoded alert with the keys used by
+                Alertmanager. Will not be mutated.
+
+        Returns:
+            AlertView: View of the alert.
+        """
+
+        return cls(
+            obj["fingerprint"],
+            obj["status"],
+            obj["labels"],
+            obj["annotations"],
+            parse_timestamp(obj["startsAt"]),
+            parse_timestamp(obj["endsAt"]),
+            obj["generatorURL"],
+            _extra(obj, _ALERT_ALIASES),
+        )
+
+    @classmethod
+    def from_alert(cls, alert: Alert) -> "AlertView":
+        """Creates view of an alert. Shares annotations and labels with it.
+
+        Args:
+            alert (Alert): Alert to view.
+
+        Returns:
+            AlertView: View of the alert.
+        """
+
+        values = alert.__dict__
+
+        return cls(
+            values["fingerprint"],
+            values["status"],
+            values["labels"],
+            values["annotations"],
+            alert.starts_at,
+            alert.ends_at,
+            values["generator_url"],
+            _extra(values, _ALERT_FIELDS),
+        )
+
+    def to_alert(self) -> Alert:
+        """Creates a mutable alert with copies of annotations and labels.
+
+        Returns:
+            Alert: Alert constructed without validation.
+        """
+
+        return Alert.construct(
+            fingerprint=self.fingerprint,
+            status=self.status,
+            labels=dict(self.labels),
+            annotations=dict(self.annotations),
+            starts_at=self.starts_at,
+            ends_at=self.ends_at,
+            generator_url=self.generator_url,
+            **(self.extra or {}),
+        )
+
+
+class AlertGroupView(NamedTuple):
+    """Compact read-only view of an alert group.
+
+    Like `AlertView`, it shares dictionaries with the object it was built
+    from. Use `to_group` to get a mutable `AlertGroup`.
+
+    ```python
+    view = AlertGroupView.from_json(request_body)
+    for alert in view.alerts:
+        print(alert.fingerprint, alert.status, alert.labels["severity"])
+    ```
+    """
+
+    receiver: str
+    status: str
+    alerts: Tuple[AlertView, ...]
+    group_labels: Dict[str, str]
+    common_labels: Dict[str, str]
+    common_annotations: Dict[str, str]
+    external_url: str
+    version: str
+    group_key: str
+    truncated_alerts: int = 0
+    extra: Optional[Dict[str, Any]] = None
+    """Fields that are not part of the Alertmanager schema. `None` if there
+    are none."""
+
+    @classmethod
+    def from_json(cls, data: Union[bytes, bytearray, str]) -> "AlertGroupView":
+        """Creates view from trusted JSON without validating it.
+
+        Decodes with `orjson` if it is installed.
+
+        Args:
+            data (Union[bytes, bytearray, str]): JSON encoded payload.
+
+        Returns:
+            AlertGroupView: View of the alert group.
+        """
+
+        return cls.from_obj(loads(data))
+
+    @classmethod
+    def from_obj(cls, obj: Dict[str, Any]) -> "AlertGroupView":
+        """Creates view from a trusted decoded payload without validating it.
+
+        Args:
+            obj (Dict[str, Any]): Decoded payload with the keys used by
+                Alertmanager. Will not be mutated.
+
+        Returns:
+            AlertGroupView: View of the alert group.
+        """
+
+        return cls(
+            obj["receiver"],
+            obj["status"],
+            tuple([AlertView.from_obj(alert) for alert in obj["alerts"]]),
+            obj["groupLabels"],
+            obj["commonLabels"],
+            obj["commonAnnotations"],
+            obj["externalURL"],
+            obj["version"],
+            obj["groupKey"],
+            obj.get("truncatedAlerts", 0),
+            _extra(obj, _GROUP_ALIASES),
+        )
+
+    @classmethod
+    def from_group(cls, alert_group: AlertGroup) -> "AlertGroupView":
+        """Creates view of an alert group. Shares dictionaries with it.
+
+        Args:
+            alert_group (AlertGroup): Alert group to view.
+
+        Returns:
+            AlertGroupView: View of the alert group.
+        """
+
+        values = alert_group.__dict__
+
+        return cls(
+            values["receiver"],
+            values["status"],
+            tuple([AlertView.from_alert(alert) for alert in values["alerts"]]),
+            values["group_labels"],
+            values["common_labels"],
+            values["common_annotations"],
+            values["external_url"],
+            values["version"],
+            values["group_key"],
+            values["truncated_alerts"],
+            _extra(values, _GROUP_FIELDS),
+        )
+
+    def to_group(self) -> AlertGroup:
+        """Creates a mutable alert group with copies of all dictionaries.
+
+        Returns:
+            AlertGroup: Alert group constructed without validation.
+        """
+
+        alert_group = AlertGroup.construct(
+            receiver=self.receiver,
+            status=self.status,
+            alerts=[alert.to_alert() for alert in self.alerts],
+            group_labels=dict(self.group_labels),
+            common_labels=dict(self.common_labels),
+            common_annotations=dict(self.common_annotations),
+            external_url=self.external_url,
+            version=self.version,
+            group_key=self.group_key,
+            truncated_alerts=self.truncated_alerts,
+            **(self.extra or {}),
+        )
+        alert_group.update_specific_elements()
+
+        return alert_group
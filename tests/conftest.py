@@ -3,8 +3,9 @@
 
 import os
 import pathlib
+import random
 import shutil
-from typing import Optional
+from typing import Any, Dict, Optional
 
 import pytest
 from devtools import debug
@@ -34,6 +35,78 @@ class Helpers:
             debug(element)
             print(f"\n{Helpers.separator}\n")
 
+    @staticmethod
+    def build_payload(
+        alerts: int = 1000,
+        labels: int = 10,
+        common_fraction: float = 0.5,
+        annotation_size: int = 100,
+        resolved_fraction: float = 0.0,
+        seed: int = 0,
+    ) -> Dict[str, Any]:
+        """Builds a synthetic Alertmanager payload.
+
+        The same arguments always lead to the same payload.
+
+        Args:
+            alerts: Number of alerts in the group.
+            labels: Number of labels per alert.
+            common_fraction: Fraction of labels that all alerts share.
+            annotation_size: Length of the common `runbook` annotation. Every
+                alert also has the common `summary` and a specific
+                `description` annotation.
+            resolved_fraction: Probability of an alert being resolved.
+            seed: Seed for the random number generator.
+        """
+
+        rng = random.Random(seed)
+        common_count = int(labels * common_fraction)
+        common_labels = {f"common_{i}": f"value_{i}" for i in range(common_count)}
+        common_annotations = {
+            "summary": "Something is broken",
+            "runbook": "x" * annotation_size,
+        }
+
+        payload_alerts = []
+        for i in range(alerts):
+            resolved = rng.random() < resolved_fraction
+            payload_alerts.append(
+                {
+                    "status": "resolved" if resolved else "firing",
+                    "labels": {
+                        **common_labels,
+                        **{
+                            f"specific_{j}": f"value_{i}_{j}"
+                            for j in range(labels - common_count)
+                        },
+                    },
+                    "annotations": {**common_annotations, "description": f"Alert {i}"},
+                    "startsAt": "2020-11-03T17:51:36.14925565Z",
+                    "endsAt": (
+                        f"2020-11-03T{rng.randrange(18, 24)}:{rng.randrange(60):02}:00Z"
+                        if resolved
+                        else "0001-01-01T00:00:00Z"
+                    ),
+                    "generatorURL": "http://9e6d80bea9ef:9090/graph?g0.",
+                    "fingerprint": f"{i:016x}",
+                }
+            )
+
+        firing = any(alert["status"] == "firing" for alert in payload_alerts)
+
+        return {
+            "receiver": "generic",
+            "status": "firing" if firing or not payload_alerts else "resolved",
+            "alerts": payload_alerts,
+            "groupLabels": {},
+            "commonLabels": common_labels,
+            "commonAnnotations": common_annotations,
+            "externalURL": "http://1217896f2a1d:9093",
+            "version": "4",
+            "groupKey": "{}:{}",
+            "truncatedAlerts": 0,
+        }
+
 
 @pytest.fixture
 def helpers():
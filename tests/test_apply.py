@@ -0,0 +1,152 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import json
+import re
+import timeit
+
+import pytest
+
+from prometheus_alert_model.main import AlertGroup
+
+OPERATIONS = [
+    ("remove", {"labels": "severity", "annotations": ["nothing"]}),
+    ("remove_re", {"labels": [r"^foo", re.compile(r"^specific_0$")]}),
+    ("add", {"labels": {"mu": "sik", "cluster": "a"}, "annotations": {"this": "x"}}),
+    ("override", {"annotations": {"description": "foo"}}),
+    ("add_prefix", {"labels": {"alertname": "PREFIX: "}}),
+    ("add", {"labels": {"alertname": "ignored"}}),
+]
+
+
+def apply_sequentially(alert_group: AlertGroup, operations) -> None:
+    for action, kwargs in operations:
+        getattr(alert_group, action)(**kwargs)
+
+
+def test_apply_matches_sequential(helpers, data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    expected = AlertGroup(**payload)
+    apply_sequentially(expected, OPERATIONS)
+
+    alert_group = AlertGroup(**payload)
+    alert_group.apply(OPERATIONS)
+    helpers.wrapped_debug(alert_group)
+
+    assert alert_group.dict() == expected.dict()
+    assert alert_group.common_labels == {
+        "alertname": "PREFIX: WhatEver",
+        "mu": "sik",
+        "cluster": "a",
+    }
+    assert alert_group.alerts[1].specific_annotations == {"this": "isspecific"}
+
+
+def test_apply_matches_sequential_large(helpers):
+    payload = helpers.build_payload(alerts=50, labels=10)
+    operations = [
+        ("add_prefix", {"labels": {"common_0": "x"}}),
+        ("remove_re", {"labels": r"^specific_[01]$"}),
+        ("override", {"labels": {"specific_2": "same"}}),
+        ("add", {"labels": {"specific_3": "value_0_3"}}),
+    ]
+
+    expected = AlertGroup(**payload)
+    apply_sequentially(expected, operations)
+
+    alert_group = AlertGroup(**payload)
+    alert_group.apply(operations)
+
+    assert alert_group.dict() == expected.dict()
+
+
+def test_apply_indexed(helpers, data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    expected = AlertGroup(**payload)
+    expected.index_common_elements()
+    apply_sequentially(expected, OPERATIONS)
+
+    alert_group = AlertGroup(**payload)
+    alert_group.index_common_elements()
+    alert_group.apply(OPERATIONS)
+
+    assert alert_group.dict() == expected.dict()
+    assert alert_group._counters["labels"].counts == expected._counters["labels"].counts
+
+
+def test_apply_unknown_action(helpers, data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    alert_group = AlertGroup(**payload)
+
+    with pytest.raises(ValueError):
+        alert_group.apply([("remove", {"labels": "mu"}), ("drop", {"labels": "mu"})])
+
+    assert "mu" in alert_group.alerts[0].labels
+
+
+def test_apply_add_prefix_missing_name(helpers):
+    alert_group = AlertGroup(**helpers.build_payload(alerts=5, labels=4))
+    expected = alert_group.dict()
+
+    with pytest.raises(KeyError):
+        alert_group.apply(
+            [
+                ("add", {"labels": {"env": "prod"}}),
+                ("remove", {"labels": "common_0"}),
+                ("add_prefix", {"labels": {"env": "x", "common_0": "x"}}),
+            ]
+        )
+
+    assert alert_group.dict() == expected
+
+    alert_group.apply(
+        [
+            ("add", {"labels": {"specific_0": "diverged"}}),
+            ("add_prefix", {"labels": {"specific_0": "x"}}),
+        ]
+    )
+
+    assert "specific_0" not in alert_group.common_labels
+    assert alert_group.alerts[1].labels["specific_0"] == "xvalue_1_0"
+
+
+@pytest.mark.slow
+def test_apply_benchmark(helpers):
+    raw = json.dumps(helpers.build_payload(alerts=2000, labels=20)).encode()
+    operations = [
+        ("remove_re", {"labels": r"^specific_[01]$"}),
+        ("add", {"labels": {"cluster": "a"}}),
+        ("override", {"annotations": {"summary": "foo"}}),
+        ("add_prefix", {"labels": {"common_0": "x"}}),
+        ("remove", {"annotations": "runbook"}),
+    ]
+
+    def timed(transform):
+        timings = []
+        for _ in range(5):
+            alert_group = AlertGroup.from_trusted_json(raw)
+            start = timeit.default_timer()
+            transform(alert_group)
+            timings.append(timeit.default_timer() - start)
+        return min(timings)
+
+    expected = AlertGroup.from_trusted_json(raw)
+    apply_sequentially(expected, operations)
+    alert_group = AlertGroup.from_trusted_json(raw)
+    alert_group.apply(operations)
+
+    assert alert_group.dict() == expected.dict()
+
+    helpers.wrapped_debug(
+        {
+            "sequential": timed(lambda group: apply_sequentially(group, operations)),
+            "apply": timed(lambda group: group.apply(operations)),
+        },
+        "Five actions on 2000 alerts with 20 labels each (seconds)",
+    )
@@ -0,0 +1,135 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+"""Benchmarks of the main operations at several scales.
+
+Timings are divided by the timing of a fixed calibration loop, so baselines
+stored in `data/benchmark-baselines.json` can be compared across machines.
+By default measurements are only reported. Comparing them against the
+baselines is opt-in, because timings on shared CI runners or under coverage
+vary far more than any sensible tolerance. If enabled, a benchmark fails if
+it is slower than its baseline times the tolerance. Measurements below one
+millisecond are too noisy and are never checked.
+
+- `BENCHMARK_CHECK`: Set to `1` to fail on regressions against the baselines.
+- `BENCHMARK_TOLERANCE`: Allowed slowdown factor. Defaults to 1.5.
+- `BENCHMARK_UPDATE`: Set to `1` to write measured values as new baselines.
+
+```
+BENCHMARK_CHECK=1 pytest -m slow tests/test_benchmarks.py
+BENCHMARK_UPDATE=1 pytest -m slow tests/test_benchmarks.py
+```
+"""
+
+import gc
+import json
+import os
+import pathlib
+import time
+from typing import Any, Callable, Dict
+
+import pytest
+
+from prometheus_alert_model import AlertGroup
+
+BASELINES_PATH = pathlib.Path(__file__).parent.joinpath(
+    "data", "benchmark-baselines.json"
+)
+CHECK = os.environ.get("BENCHMARK_CHECK") == "1"
+TOLERANCE = float(os.environ.get("BENCHMARK_TOLERANCE", "1.5"))
+UPDATE = os.environ.get("BENCHMARK_UPDATE") == "1"
+REPEAT = 5
+MIN_SECONDS = 0.001
+
+SCALES = [(100, 10), (1000, 20), (5000, 40)]
+
+
+def _measure(setup: Callable[[], Any], operation: Callable[[Any], Any]) -> float:
+    """Returns the best time of running the operation on fresh setups."""
+
+    best = float("inf")
+    for _ in range(REPEAT):
+        state = setup()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            operation(state)
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best
+
+
+def _calibration_loop(_: Any) -> None:
+    dct: Dict[str, int] = {}
+    for i in range(200000):
+        dct[str(i % 1000)] = i
+
+
+def _touch_specific(group: AlertGroup) -> None:
+    group.update_specific_elements()
+    for alert in group.alerts:
+        alert.specific_annotations
+        alert.specific_labels
+
+
+OPERATIONS: Dict[str, Callable[[AlertGroup], Any]] = {
+    "update_common_elements": lambda group: group.update_common_elements(),
+    "update_specific_elements": _touch_specific,
+    "remove": lambda group: group.remove("description", ["specific_0", "common_0"]),
+    "remove_re": lambda group: group.remove_re("^desc.*$", r"^specific_[0-4]$"),
+    "add": lambda group: group.add({"team": "a"}, {"severity": "critical"}),
+    "override": lambda group: group.override({"summary": "b"}, {"common_0": "c"}),
+    "add_prefix": lambda group: group.add_prefix({"summary": "d"}, {"common_0": "e"}),
+    "json": lambda group: group.json(),
+}
+
+
+@pytest.fixture(scope="module")
+def baselines():
+    calibration = _measure(lambda: None, _calibration_loop)
+    stored = json.loads(BASELINES_PATH.read_text()) if BASELINES_PATH.exists() else {}
+    measured: Dict[str, float] = {}
+
+    yield calibration, stored, measured
+
+    if UPDATE:
+        BASELINES_PATH.write_text(
+            json.dumps({**stored, **measured}, indent=2, sort_keys=True) + "\n"
+        )
+
+
+def _check(helpers, baselines, key: str, seconds: float) -> None:
+    calibration, stored, measured = baselines
+    relative = seconds / calibration
+    measured[key] = round(relative, 4)
+    baseline = stored.get(key)
+
+    helpers.wrapped_debug(
+        {"seconds": seconds, "relative": relative, "baseline": baseline},
+        f"Benchmark {key}",
+    )
+
+    if CHECK and baseline is not None and not UPDATE and seconds >= MIN_SECONDS:
+        assert relative <= baseline * TOLERANCE, f"{key} regressed"
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("alerts, labels", SCALES)
+def test_benchmark_parse(helpers, baselines, alerts, labels):
+    payload = helpers.build_payload(alerts, labels, resolved_fraction=0.2)
+
+    best = _measure(lambda: payload, lambda payload: AlertGroup(**payload))
+
+    _check(helpers, baselines, f"parse/{alerts}x{labels}", best)
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("alerts, labels", SCALES)
+@pytest.mark.parametrize("operation", list(OPERATIONS))
+def test_benchmark_operation(helpers, baselines, operation, alerts, labels):
+    payload = helpers.build_payload(alerts, labels, resolved_fraction=0.2)
+
+    best = _measure(lambda: AlertGroup(**payload), OPERATIONS[operation])
+
+    _check(helpers, baselines, f"{operation}/{alerts}x{labels}", best)
@@ -0,0 +1,122 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import gzip
+import json
+import sys
+import tracemalloc
+
+import pytest
+
+from prometheus_alert_model import AlertGroup
+from prometheus_alert_model.cli import main
+
+RULES = [
+    {"action": "remove", "labels": ["specific_1"]},
+    {"action": "remove_re", "annotations": "^run.*$"},
+    {"action": "add", "labels": {"env": "prod"}},
+    {"action": "override", "labels": {"common_0": "overridden"}},
+    {"action": "add_prefix", "annotations": {"summary": "Prod: "}},
+]
+
+
+def write_input(helpers, path, payloads, alerts=3):
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "wb") as file:
+        for i in range(payloads):
+            payload = helpers.build_payload(alerts=alerts, labels=4, seed=i)
+            payload["groupKey"] = str(i)
+            file.write(json.dumps(payload).encode() + b"\n")
+
+
+def test_transform(helpers, tmp_path, capsys):
+    write_input(helpers, tmp_path / "a.jsonl", 2)
+    write_input(helpers, tmp_path / "b.jsonl.gz", 2)
+    tmp_path.joinpath("rules.json").write_text(json.dumps(RULES))
+
+    code = main(
+        [
+            "transform",
+            str(tmp_path / "a.jsonl"),
+            str(tmp_path / "b.jsonl.gz"),
+            "--rules",
+            str(tmp_path / "rules.json"),
+            "--output",
+            str(tmp_path / "out.jsonl"),
+            "--timing",
+        ]
+    )
+
+    lines = tmp_path.joinpath("out.jsonl").read_bytes().splitlines()
+    groups = [AlertGroup.parse_raw(line) for line in lines]
+    assert code == 0
+    assert [alert_group.group_key for alert_group in groups] == ["0", "1", "0", "1"]
+
+    alert_group = groups[0]
+    assert alert_group.common_labels["env"] == "prod"
+    assert alert_group.common_labels["common_0"] == "overridden"
+    assert alert_group.common_annotations["summary"].startswith("Prod: ")
+    assert "runbook" not in alert_group.common_annotations
+    assert all("specific_1" not in alert.labels for alert in alert_group.alerts)
+
+    err = capsys.readouterr().err
+    assert "Transformed 4 payloads with 12 alerts" in err
+    assert all(stage in err for stage in ("read", "parse", "transform", "write"))
+
+
+def test_transform_stdin_stdout(helpers, tmp_path, monkeypatch, capfdbinary):
+    write_input(helpers, tmp_path / "in.jsonl", 3)
+
+    with tmp_path.joinpath("in.jsonl").open("rb") as stdin:
+        monkeypatch.setattr(sys, "stdin", stdin)
+        assert main(["transform", "--trusted"]) == 0
+
+    captured = capfdbinary.readouterr()
+    assert len(captured.out.splitlines()) == 3
+    assert captured.err == b""
+
+
+def test_transform_yaml_rules_require_pyyaml(tmp_path, monkeypatch):
+    from prometheus_alert_model import cli
+
+    monkeypatch.setattr(cli, "yaml", None)
+    tmp_path.joinpath("rules.yml").write_text("- action: add\n")
+
+    with pytest.raises(ValueError):
+        main(["transform", "--rules", str(tmp_path / "rules.yml")])
+
+
+@pytest.mark.slow
+def test_transform_benchmark(helpers, tmp_path, capsys):
+    write_input(helpers, tmp_path / "in.jsonl", 200, alerts=50)
+    tmp_path.joinpath("rules.json").write_text(json.dumps(RULES))
+
+    peaks = {}
+    for payloads in (50, 200):
+        with tmp_path.joinpath("in.jsonl").open("rb") as file:
+            tmp_path.joinpath("part.jsonl").write_bytes(
+                b"".join(next(file) for _ in range(payloads))
+            )
+
+        tracemalloc.start()
+        main(
+            [
+                "transform",
+                str(tmp_path / "part.jsonl"),
+                "--rules",
+                str(tmp_path / "rules.json"),
+                "--output",
+                str(tmp_path / "out.jsonl"),
+                "--timing",
+            ]
+        )
+        peaks[payloads] = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+
+    helpers.wrapped_debug(
+        {"peak MiB for 50 payloads": peaks[50], "peak MiB for 200": peaks[200]},
+        "Streaming transform of payloads with 50 alerts each",
+    )
+    helpers.wrapped_debug(capsys.readouterr().err, "Timing per stage")
+
+    assert peaks[200] < peaks[50] * 1.5
@@ -0,0 +1,122 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import json
+import timeit
+
+import pytest
+
+from prometheus_alert_model import columns
+from prometheus_alert_model.main import AlertGroup
+
+
+@pytest.fixture(params=["numpy", "array"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(columns, "numpy", None)
+    return request.param
+
+
+def test_to_columns(helpers, data_path, backend):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    alert_group = AlertGroup(**payload)
+    view = alert_group.to_columns()
+    helpers.wrapped_debug(view.codes)
+
+    assert view.names == ["alertname", "foo_bar_qux", "mu", "severity"]
+    assert view.column("mu") == ["sik", None]
+    assert view.common() == alert_group.common_labels
+    assert view.counts("severity") == {"warning": 2}
+    assert view.counts("mu") == {"sik": 1}
+    assert view.positions("mu", "sik") == [0]
+    assert view.positions("mu", "nope") == []
+    assert view.positions("nope", "sik") == []
+
+
+def test_to_columns_annotations(helpers, data_path, backend):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    alert_group = AlertGroup(**payload)
+    view = alert_group.to_columns("annotations")
+
+    assert view.common() == alert_group.common_annotations
+    assert view.column("this") == [None, "isspecific"]
+
+
+def test_to_columns_write(helpers, data_path, backend):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    alert_group = AlertGroup(**payload)
+    alert_group.index_common_elements()
+    view = alert_group.to_columns()
+
+    view.set("mu", "sik")
+    view.set("cluster", "a", positions=[1])
+    view.remove("foo_bar_qux")
+    view.remove("does_not_exist")
+    view.write(alert_group)
+    helpers.wrapped_debug(alert_group)
+
+    assert alert_group.alerts[0].labels == {
+        "alertname": "WhatEver",
+        "mu": "sik",
+        "severity": "warning",
+    }
+    assert alert_group.alerts[1].labels["cluster"] == "a"
+    assert alert_group.common_labels == {
+        "alertname": "WhatEver",
+        "mu": "sik",
+        "severity": "warning",
+    }
+    assert alert_group.alerts[0].specific_labels == {}
+    assert alert_group.alerts[1].specific_labels == {"cluster": "a"}
+    assert alert_group._counters["labels"].intersection() == alert_group.common_labels
+
+
+def test_to_columns_empty_group(helpers, data_path, backend):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    payload["alerts"] = []
+    view = AlertGroup(**payload).to_columns()
+
+    assert view.common() == {}
+
+
+def test_to_columns_write_size_mismatch(helpers, data_path, backend):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    alert_group = AlertGroup(**payload)
+    view = alert_group.to_columns()
+    alert_group.alerts.pop()
+
+    with pytest.raises(ValueError):
+        view.write(alert_group)
+
+
+@pytest.mark.slow
+def test_to_columns_benchmark(helpers, backend):
+    alert_group = AlertGroup.from_trusted_json(
+        json.dumps(helpers.build_payload(alerts=5000, labels=40))
+    )
+    view = alert_group.to_columns()
+
+    assert view.common() == alert_group.common_labels
+
+    helpers.wrapped_debug(
+        {
+            "to_columns": min(timeit.repeat(alert_group.to_columns, number=1, repeat=3)),
+            "common via columns": min(timeit.repeat(view.common, number=1, repeat=3)),
+            "update_common_labels": min(
+                timeit.repeat(alert_group.update_common_labels, number=1, repeat=3)
+            ),
+        },
+        f"Columnar view of 5000 alerts with 40 labels each, {backend} (seconds)",
+    )
@@ -0,0 +1,106 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import gc
+import json
+import pickle
+import tracemalloc
+
+import pytest
+
+from prometheus_alert_model.main import AlertGroup
+from prometheus_alert_model.utils import CopyOnWriteDict
+
+
+def build_shared_payload(helpers, alerts):
+    payload = helpers.build_payload(alerts=alerts, labels=10)
+    for alert in payload["alerts"]:
+        del alert["annotations"]["description"]
+    return payload
+
+
+def test_compact_shares_identical_elements(helpers):
+    alert_group = AlertGroup.parse_raw(json.dumps(build_shared_payload(helpers, 3)))
+    expected = alert_group.dict()
+    expected_json = alert_group.json()
+
+    alert_group.compact()
+    helpers.wrapped_debug(alert_group)
+
+    annotations = [alert.annotations for alert in alert_group.alerts]
+    assert all(isinstance(dct, CopyOnWriteDict) for dct in annotations)
+    assert annotations[0]._data is annotations[1]._data is annotations[2]._data
+    assert all(type(alert.labels) is dict for alert in alert_group.alerts)
+
+    names = [next(iter(alert.labels)) for alert in alert_group.alerts]
+    assert names[0] is names[1] is names[2]
+
+    assert alert_group.dict() == expected
+    assert alert_group.json() == expected_json
+    assert type(alert_group.dict()["alerts"][0]["annotations"]) is dict
+
+
+def test_compact_copy_on_write(helpers):
+    alert_group = AlertGroup.parse_raw(json.dumps(build_shared_payload(helpers, 3)))
+    alert_group.compact()
+
+    assert alert_group.alerts[0].specific_annotations == {}
+
+    alert_group.alerts[0].annotations["hello"] = "world"
+
+    assert alert_group.alerts[0].annotations["hello"] == "world"
+    assert "hello" not in alert_group.alerts[1].annotations
+    assert alert_group.alerts[0].specific_annotations == {}
+
+    alert_group.update_specific_annotations()
+
+    assert alert_group.alerts[0].specific_annotations == {"hello": "world"}
+    assert alert_group.alerts[1].specific_annotations == {}
+
+
+def test_compact_methods_keep_semantics(helpers):
+    payload = build_shared_payload(helpers, 5)
+    operations = [
+        ("remove", {"annotations": "runbook"}),
+        ("add", {"annotations": {"a": "b"}}),
+        ("override", {"annotations": {"summary": "foo"}}),
+        ("add_prefix", {"annotations": {"summary": "PREFIX: "}}),
+        ("remove_re", {"labels": r"^specific_0$"}),
+    ]
+
+    expected = AlertGroup(**payload)
+    alert_group = AlertGroup(**payload)
+    alert_group.compact()
+    alert_group.index_common_elements()
+
+    for action, kwargs in operations:
+        getattr(expected, action)(**kwargs)
+        getattr(alert_group, action)(**kwargs)
+
+    assert alert_group.dict() == expected.dict()
+    assert pickle.loads(pickle.dumps(alert_group)) == expected
+
+
+@pytest.mark.slow
+def test_compact_memory_benchmark(helpers):
+    raw = json.dumps(build_shared_payload(helpers, 10000))
+
+    def measure(compact):
+        gc.collect()
+        tracemalloc.start()
+        alert_group = AlertGroup.from_trusted_json(raw)
+        if compact:
+            alert_group.compact()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return size / len(alert_group.alerts)
+
+    before = measure(compact=False)
+    after = measure(compact=True)
+    helpers.wrapped_debug(
+        {"before": before, "after": after},
+        "Bytes per alert in a group of 10000 alerts with 10 labels each",
+    )
+
+    assert after < before
@@ -0,0 +1,108 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import json
+import timeit
+
+import pytest
+
+from prometheus_alert_model import AlertGroup
+
+
+def test_diff(helpers):
+    previous = AlertGroup(**helpers.build_payload(alerts=6, labels=4))
+
+    payload = helpers.build_payload(alerts=8, labels=4)
+    del payload["alerts"][0]
+    payload["alerts"][0]["status"] = "resolved"
+    payload["alerts"][1]["labels"]["specific_0"] = "changed"
+    payload["alerts"][2]["annotations"]["description"] = "changed"
+    current = AlertGroup(**payload)
+    current.alerts[3].status = "resolved"
+    previous.alerts[5].status = "resolved"
+    previous.alerts[4].status = "resolved"
+
+    diff = current.diff(previous)
+
+    def fingerprints(alerts):
+        return [int(alert.fingerprint, 16) for alert in alerts]
+
+    assert fingerprints(diff.added) == [6, 7]
+    assert fingerprints(diff.removed) == [0]
+    assert diff.removed[0] is previous.alerts[0]
+    assert fingerprints(diff.resolved) == [1]
+    assert fingerprints(diff.changed) == [2, 3, 5]
+
+    assert not any(current.diff(current))
+
+
+def test_diff_after_mutation(helpers):
+    previous = AlertGroup(**helpers.build_payload(alerts=3, labels=4))
+    current = AlertGroup(**helpers.build_payload(alerts=3, labels=4))
+
+    assert not any(current.diff(previous))
+
+    current.remove_re(labels="^specific_1$")
+    assert len(current.diff(previous).changed) == 3
+
+    previous.remove(labels="specific_1")
+    assert not any(current.diff(previous))
+
+
+def test_diff_with_duplicate_fingerprints(data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    assert not any(AlertGroup(**payload).diff(AlertGroup(**payload)))
+
+    previous = AlertGroup(**payload)
+    current = AlertGroup(**payload)
+    current.alerts[1].status = "resolved"
+
+    diff = current.diff(previous)
+
+    assert diff.resolved == [current.alerts[1]]
+    assert diff.changed == []
+
+    current.alerts.pop()
+    diff = current.diff(previous)
+
+    assert diff.removed == [previous.alerts[1]]
+    assert diff.added == diff.resolved == diff.changed == []
+
+    diff = previous.diff(current)
+
+    assert diff.added == [previous.alerts[1]]
+    assert diff.removed == []
+
+
+@pytest.mark.slow
+def test_diff_benchmark(helpers):
+    raw = json.dumps(helpers.build_payload(alerts=5000, labels=20))
+    previous = AlertGroup.parse_raw(raw)
+
+    def compare(current):
+        before = {alert.fingerprint: alert for alert in previous.alerts}
+        return [
+            alert
+            for alert in current.alerts
+            if alert.labels != before[alert.fingerprint].labels
+            or alert.annotations != before[alert.fingerprint].annotations
+        ]
+
+    def measure(function):
+        # Every payload is a fresh group.
+        groups = [AlertGroup.parse_raw(raw) for _ in range(5)]
+        return min(timeit.repeat(lambda: function(groups.pop()), number=1, repeat=5))
+
+    previous.diff(previous)
+    results = {
+        "diff of fresh payload": measure(lambda current: current.diff(previous)),
+        "comparing full dicts": measure(compare),
+    }
+    helpers.wrapped_debug(results, "Diffing identical groups of 5000 alerts (seconds)")
+
+    current = AlertGroup.parse_raw(raw)
+    assert compare(current) == []
+    assert not any(current.diff(previous))
+    assert results["diff of fresh payload"] < results["comparing full dicts"] * 1.5
@@ -0,0 +1,181 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import json
+import timeit
+
+import pytest
+
+from prometheus_alert_model.main import Alert, AlertGroup
+from prometheus_alert_model.utils import ElementCounter, intersect
+
+
+def assert_common_consistent(alert_group: AlertGroup) -> None:
+    for target in ("annotations", "labels"):
+        dcts = [alert.__dict__[target] for alert in alert_group.alerts]
+        assert alert_group.__dict__[f"common_{target}"] == intersect(dcts)
+
+        if alert_group._counters is not None:
+            assert alert_group._counters[target].counts == ElementCounter(dcts).counts
+
+        for alert in alert_group.alerts:
+            common = alert_group.__dict__[f"common_{target}"]
+            assert getattr(alert, f"specific_{target}") == {
+                k: v for k, v in alert.__dict__[target].items() if k not in common
+            }
+
+
+def test_get_and_contains(helpers):
+    alert_group = AlertGroup(**helpers.build_payload(alerts=3, labels=4))
+    first, second, _ = alert_group.alerts
+
+    assert alert_group._fingerprints is None
+    assert first.fingerprint in alert_group
+    assert "unknown" not in alert_group
+    assert alert_group.get(second.fingerprint) is second
+    assert alert_group.get("unknown") is None
+    assert alert_group.get("unknown", first) is first
+
+
+def test_get_with_duplicate_fingerprints(data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    alert_group = AlertGroup(**payload)
+
+    assert alert_group.get("d57ff78af6ac95e8") is alert_group.alerts[1]
+
+
+def test_index_follows_direct_changes(helpers):
+    alert_group = AlertGroup(**helpers.build_payload(alerts=3, labels=4))
+    assert f"{0:016x}" in alert_group
+
+    alert = alert_group.alerts.pop(0)
+    assert f"{0:016x}" not in alert_group
+
+    alert_group.alerts = [alert]
+    assert alert_group.get(f"{0:016x}") is alert
+    assert len(alert_group._fingerprint_index()) == 1
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_remove_alerts(helpers, indexed):
+    alert_group = AlertGroup(**helpers.build_payload(alerts=10, labels=4))
+    alert_group.alerts[0].labels["common_0"] = "other"
+    alert_group.update_common_elements()
+    alert_group.update_specific_elements()
+    if indexed:
+        alert_group.index_common_elements()
+
+    assert "common_0" not in alert_group.common_labels
+
+    removed = alert_group.remove_alerts([f"{0:016x}", f"{5:016x}", "unknown"])
+
+    assert [alert.fingerprint for alert in removed] == [f"{0:016x}", f"{5:016x}"]
+    assert len(alert_group.alerts) == 8
+    assert f"{0:016x}" not in alert_group
+    assert alert_group.common_labels["common_0"] == "value_0"
+    assert removed[0].specific_labels["common_0"] == "other"
+    assert_common_consistent(alert_group)
+
+    assert alert_group.remove_alerts(["unknown"]) == []
+
+    alert_group.remove_alerts(alert.fingerprint for alert in list(alert_group.alerts))
+    assert alert_group.alerts == []
+    assert alert_group.common_labels == {}
+    assert_common_consistent(alert_group)
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_remove_alerts_keeps_specific_if_common_unchanged(helpers, indexed):
+    alert_group = AlertGroup(**helpers.build_payload(alerts=10, labels=4))
+    if indexed:
+        alert_group.index_common_elements()
+    common_labels = alert_group.common_labels
+    specific_labels = alert_group.alerts[1].specific_labels
+
+    alert_group.remove_alerts([f"{0:016x}"])
+
+    assert alert_group.common_labels is common_labels
+    assert alert_group.alerts[0].__dict__["specific_labels"] is specific_labels
+    assert_common_consistent(alert_group)
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_remove_alerts_with_duplicate_fingerprints(data_path, indexed):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    alert_group = AlertGroup(**payload)
+    if indexed:
+        alert_group.index_common_elements()
+    duplicates = alert_group.alerts[:2]
+
+    assert alert_group.get("d57ff78af6ac95e8") is duplicates[1]
+
+    removed = alert_group.remove_alerts(["d57ff78af6ac95e8"])
+
+    assert removed == duplicates
+    assert "d57ff78af6ac95e8" not in alert_group
+    assert all(a.fingerprint != "d57ff78af6ac95e8" for a in alert_group.alerts)
+    assert_common_consistent(alert_group)
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_add_alerts(helpers, indexed):
+    alert_group = AlertGroup(**helpers.build_payload(alerts=10, labels=4))
+    if indexed:
+        alert_group.index_common_elements()
+
+    new = Alert(**helpers.build_payload(alerts=11, labels=4)["alerts"][10])
+    new.labels["common_1"] = "other"
+
+    alert_group.add_alerts([new])
+
+    assert alert_group.get(f"{10:016x}") is new
+    assert len(alert_group.alerts) == 11
+    assert alert_group.common_labels == {"common_0": "value_0"}
+    assert new.specific_labels == {
+        "common_1": "other",
+        "specific_0": "value_10_0",
+        "specific_1": "value_10_1",
+    }
+    assert_common_consistent(alert_group)
+
+    alert_group.remove_alerts([new.fingerprint])
+    assert alert_group.common_labels == {"common_0": "value_0", "common_1": "value_1"}
+    assert_common_consistent(alert_group)
+
+
+def test_add_alerts_to_empty_group(helpers):
+    payload = helpers.build_payload(alerts=3, labels=4)
+    alerts = [Alert(**alert) for alert in payload["alerts"]]
+    alert_group = AlertGroup(**{**payload, "alerts": []})
+
+    alert_group.add_alerts(alerts)
+
+    assert alert_group.common_labels == payload["commonLabels"]
+    assert_common_consistent(alert_group)
+
+
+@pytest.mark.slow
+def test_get_benchmark(helpers):
+    alert_group = AlertGroup(**helpers.build_payload(alerts=5000, labels=20))
+    fingerprints = [alert.fingerprint for alert in alert_group.alerts[::50]]
+
+    def scan():
+        for fingerprint in fingerprints:
+            next(a for a in alert_group.alerts if a.fingerprint == fingerprint)
+
+    def lookup():
+        for fingerprint in fingerprints:
+            alert_group.get(fingerprint)
+
+    scanned = min(timeit.repeat(scan, number=1, repeat=5))
+    looked_up = min(timeit.repeat(lookup, number=1, repeat=5))
+    helpers.wrapped_debug(
+        {"linear scan": scanned, "get": looked_up},
+        "Looking up 100 of 5000 alerts by fingerprint (seconds)",
+    )
+
+    assert looked_up < scanned
@@ -0,0 +1,88 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import json
+import timeit
+
+import pytest
+
+from prometheus_alert_model import utils
+from prometheus_alert_model.main import Alert, AlertGroup
+
+
+def test_from_trusted_json_matches_parse_raw(helpers, data_path):
+    raw = data_path.joinpath("payload-simple-01.json").read_bytes()
+
+    expected = AlertGroup.parse_raw(raw)
+    alert_group = AlertGroup.from_trusted_json(raw)
+    helpers.wrapped_debug(alert_group)
+
+    assert isinstance(alert_group, AlertGroup)
+    assert all(isinstance(alert, Alert) for alert in alert_group.alerts)
+    assert alert_group.dict() == expected.dict()
+
+
+def test_from_trusted_json_specific_elements(helpers, data_path):
+    raw = data_path.joinpath("payload-simple-01.json").read_bytes()
+
+    alert_group = AlertGroup.from_trusted_json(raw)
+
+    assert alert_group.alerts[0].specific_labels == {"mu": "sik"}
+    assert alert_group.alerts[0].specific_annotations == {}
+    assert alert_group.alerts[1].specific_labels == {}
+    assert alert_group.alerts[1].specific_annotations == {"this": "isspecific"}
+
+
+def test_from_trusted_json_without_orjson(helpers, data_path, monkeypatch):
+    monkeypatch.setattr(utils, "orjson", None)
+    raw = data_path.joinpath("payload-simple-01.json").read_text()
+
+    alert_group = AlertGroup.from_trusted_json(raw)
+
+    assert alert_group.dict() == AlertGroup.parse_raw(raw).dict()
+
+
+def test_from_trusted_json_mutations(helpers, data_path):
+    raw = data_path.joinpath("payload-simple-01.json").read_bytes()
+
+    alert_group = AlertGroup.from_trusted_json(raw)
+    alert_group.remove_re(labels=r"^(foo|mu).*$")
+    alert_group.add_prefix(labels={"alertname": "PREFIX: "})
+
+    assert alert_group.common_labels == {
+        "alertname": "PREFIX: WhatEver",
+        "severity": "warning",
+    }
+    assert alert_group.alerts[0].specific_labels == {}
+
+
+def test_from_trusted_obj_does_not_mutate(helpers, data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+    original = json.loads(json.dumps(payload))
+
+    AlertGroup.from_trusted_obj(payload)
+
+    assert payload == original
+
+
+@pytest.mark.slow
+def test_from_trusted_json_benchmark(helpers):
+    raw = json.dumps(helpers.build_payload(alerts=2000, labels=20)).encode()
+
+    assert AlertGroup.from_trusted_json(raw).dict() == AlertGroup.parse_raw(raw).dict()
+
+    parse_raw = min(timeit.repeat(lambda: AlertGroup.parse_raw(raw), number=1, repeat=5))
+    trusted = min(
+        timeit.repeat(lambda: AlertGroup.from_trusted_json(raw), number=1, repeat=5)
+    )
+    helpers.wrapped_debug(
+        {
+            "parse_raw": parse_raw,
+            "from_trusted_json": trusted,
+            "speedup": parse_raw / trusted,
+        },
+        "Parsing 2000 alerts with 20 labels each (seconds)",
+    )
+
+    assert trusted < parse_raw
@@ -0,0 +1,93 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import json
+
+from prometheus_alert_model.main import AlertGroup
+from prometheus_alert_model.utils import ElementCounter, intersect
+
+
+def assert_counters_consistent(alert_group: AlertGroup) -> None:
+    for target in ("annotations", "labels"):
+        dcts = [alert.__dict__[target] for alert in alert_group.alerts]
+        fresh = ElementCounter(dcts)
+
+        assert alert_group._counters[target].counts == fresh.counts
+        assert alert_group._counters[target].total == fresh.total
+        assert alert_group.__dict__[f"common_{target}"] == intersect(dcts)
+
+
+def test_index_common_elements(helpers, data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    alert_group = AlertGroup(**payload)
+    alert_group.index_common_elements()
+    helpers.wrapped_debug(alert_group._counters)
+
+    assert alert_group.common_labels == {
+        "alertname": "WhatEver",
+        "foo_bar_qux": "foo_moo_zoom",
+        "severity": "warning",
+    }
+    assert_counters_consistent(alert_group)
+
+
+def test_index_common_elements_mutations(helpers, data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    alert_group = AlertGroup(**payload)
+    alert_group.index_common_elements()
+
+    alert_group.remove(labels="severity", annotations=["summary"])
+    assert_counters_consistent(alert_group)
+
+    alert_group.remove_re(labels=r"^foo", annotations=r"^this$")
+    assert_counters_consistent(alert_group)
+
+    alert_group.add(labels={"mu": "sik", "new": "value"})
+    assert_counters_consistent(alert_group)
+    assert alert_group.common_labels["mu"] == "sik"
+
+    alert_group.override(labels={"alertname": "foo"}, annotations={"a": "b"})
+    assert_counters_consistent(alert_group)
+
+    alert_group.add_prefix(labels={"alertname": "PREFIX: "})
+    assert_counters_consistent(alert_group)
+
+    assert alert_group.common_labels == {
+        "alertname": "PREFIX: foo",
+        "mu": "sik",
+        "new": "value",
+    }
+    assert alert_group.alerts[0].specific_labels == {}
+
+
+def test_index_update_common_elements_uses_counters(helpers, data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    alert_group = AlertGroup(**payload)
+    alert_group.index_common_elements()
+    alert_group.common_labels = {}
+
+    alert_group.update_common_labels()
+
+    assert alert_group.common_labels == {
+        "alertname": "WhatEver",
+        "foo_bar_qux": "foo_moo_zoom",
+        "severity": "warning",
+    }
+
+
+def test_update_common_elements_single_target(helpers, data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    alert_group = AlertGroup(**payload)
+    alert_group.common_labels = {}
+
+    alert_group.update_common_elements("labels")
+
+    assert len(alert_group.common_labels) == 3
@@ -0,0 +1,171 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import timeit
+from datetime import datetime, timezone
+
+import pytest
+
+from prometheus_alert_model import Alert, AlertGroup, Matcher
+from prometheus_alert_model.inhibition import InhibitionEngine, InhibitRule
+
+NOW = datetime(2020, 11, 3, 18, tzinfo=timezone.utc)
+
+
+def build_alert(fingerprint: str, status: str = "firing", **labels: str) -> Alert:
+    return Alert(
+        fingerprint=fingerprint,
+        status=status,
+        startsAt="2020-11-03T17:00:00Z",
+        endsAt="0001-01-01T00:00:00Z",
+        generatorURL="http://localhost:9090",
+        annotations={},
+        labels=labels,
+    )
+
+
+RULE = InhibitRule(['severity="critical"'], ['severity="warning"'], ["cluster"])
+
+
+def test_inhibit_rule_from_obj():
+    rule = InhibitRule.from_obj(
+        {
+            "source_matchers": ['severity="critical"'],
+            "target_match": {"severity": "warning"},
+            "target_match_re": {"team": "db|infra"},
+            "equal": ["cluster", "service"],
+        }
+    )
+
+    assert rule.source_matchers == [Matcher("severity", "critical")]
+    assert rule.target_matchers == [
+        Matcher("severity", "warning"),
+        Matcher("team", "db|infra", "=~"),
+    ]
+    assert rule.equal == ("cluster", "service")
+
+    with pytest.raises(ValueError):
+        InhibitRule([Matcher("summary", "x", target="annotations")], [])
+
+
+def test_is_inhibited():
+    engine = InhibitionEngine([RULE])
+    engine.update(
+        [
+            build_alert("1", severity="critical", cluster="a"),
+            build_alert("2", severity="critical"),
+        ],
+        at=NOW,
+    )
+
+    assert len(engine) == 2
+    assert engine.is_inhibited(build_alert("3", severity="warning", cluster="a"), NOW)
+    assert engine.is_inhibited(build_alert("4", severity="warning"), NOW)
+    assert not engine.is_inhibited(build_alert("5", severity="warning", cluster="b"), NOW)
+    assert not engine.is_inhibited(build_alert("6", severity="info", cluster="a"), NOW)
+
+
+def test_update_resolved_and_ended():
+    engine = InhibitionEngine([RULE])
+    target = build_alert("2", severity="warning", cluster="a")
+
+    engine.update([build_alert("1", severity="critical", cluster="a")], at=NOW)
+    assert engine.is_inhibited(target, NOW)
+
+    engine.update([build_alert("1", "resolved", severity="critical", cluster="a")])
+    assert len(engine) == 0
+    assert not engine.is_inhibited(target, NOW)
+
+    source = build_alert("1", severity="critical", cluster="a")
+    source.ends_at = datetime(2020, 11, 3, 19, tzinfo=timezone.utc)
+    engine.update([source], at=NOW)
+    assert engine.is_inhibited(target, NOW)
+    assert not engine.is_inhibited(target, datetime(2020, 11, 3, 19, tzinfo=timezone.utc))
+    assert len(engine) == 0
+
+    engine.update([build_alert("1", severity="critical", cluster="b")], at=NOW)
+    assert not engine.is_inhibited(target, NOW)
+
+
+def test_two_sided_match():
+    rule = InhibitRule(['team="db"'], ['severity="warning"'], ["cluster"])
+    engine = InhibitionEngine([rule])
+    both = build_alert("1", team="db", severity="warning", cluster="a")
+
+    engine.update([both], at=NOW)
+    assert not engine.is_inhibited(both, NOW)
+
+    engine.update([build_alert("2", team="db", severity="critical", cluster="a")], NOW)
+    assert engine.is_inhibited(both, NOW)
+
+
+def test_evaluate(helpers):
+    payload = helpers.build_payload(alerts=4, labels=2)
+    for i, alert in enumerate(payload["alerts"]):
+        alert["labels"].update(severity=["critical", "warning"][i % 2], cluster="a")
+    alert_group = AlertGroup(**payload)
+
+    engine = InhibitionEngine([RULE])
+    assert engine.evaluate(alert_group, NOW) == (
+        [],
+        [a.fingerprint for a in alert_group.alerts],
+    )
+
+    engine.update(alert_group, NOW)
+    inhibited, not_inhibited = engine.evaluate(alert_group, NOW)
+
+    assert inhibited == [f"{1:016x}", f"{3:016x}"]
+    assert not_inhibited == [f"{0:016x}", f"{2:016x}"]
+
+
+@pytest.mark.slow
+def test_is_inhibited_benchmark(helpers):
+    rules = [
+        InhibitRule(['severity="critical"'], ['severity="warning"'], ["cluster"]),
+        InhibitRule(['alertname="NodeDown"'], ['alertname!="NodeDown"'], ["node"]),
+    ]
+    alerts = [
+        build_alert(
+            str(i),
+            severity=["critical", "warning"][i % 2],
+            cluster=f"cluster-{i % 100}",
+            node=f"node-{i % 1000}",
+            alertname="NodeDown" if i % 7 == 0 else "Other",
+        )
+        for i in range(1000)
+    ]
+    engine = InhibitionEngine(rules)
+    engine.update(alerts, NOW)
+
+    def nested():
+        return [
+            target.fingerprint
+            for target in alerts
+            if any(
+                all(m.matches(target.labels.get(m.name)) for m in rule.target_matchers)
+                and any(
+                    all(
+                        m.matches(source.labels.get(m.name)) for m in rule.source_matchers
+                    )
+                    and all(
+                        source.labels.get(n, "") == target.labels.get(n, "")
+                        for n in rule.equal
+                    )
+                    for source in alerts
+                )
+                for rule in rules
+            )
+        ]
+
+    def evaluate():
+        return [alert.fingerprint for alert in alerts if engine.is_inhibited(alert, NOW)]
+
+    expected = nested()
+    looped = min(timeit.repeat(nested, number=1, repeat=1))
+    evaluated = min(timeit.repeat(evaluate, number=1, repeat=3))
+    helpers.wrapped_debug(
+        {"nested loop": looped, "engine": evaluated},
+        "Checking inhibition of 1000 alerts (seconds)",
+    )
+
+    assert expected == evaluate()
@@ -0,0 +1,163 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import json
+import timeit
+
+import pytest
+
+from prometheus_alert_model import AlertGroup, instrumentation
+from prometheus_alert_model.instrumentation import (
+    PrometheusHook,
+    add_hook,
+    recording,
+    remove_hook,
+)
+
+
+def test_mutations(helpers):
+    alert_group = AlertGroup.parse_obj(helpers.build_payload(alerts=4, labels=3))
+
+    with recording() as events:
+        alert_group.remove(labels="specific_0")
+        alert_group.remove_re(annotations=["^run", "^sum"])
+        alert_group.add(labels={"a": "1", "b": "2"})
+        alert_group.override({"summary": "x"})
+        alert_group.add_prefix(labels={"a": "prefix"})
+        alert_group.update_common_labels()
+        alert_group.update_specific_elements()
+
+    helpers.wrapped_debug(events)
+
+    assert [event.operation for event in events] == [
+        "remove",
+        "remove_re",
+        "add",
+        "override",
+        "add_prefix",
+        "update_common_labels",
+        "update_specific_elements",
+    ]
+    assert all(event.alerts == 4 for event in events)
+    assert all(event.seconds >= 0 for event in events)
+    assert [event.elements for event in events] == [4, 12, 8, 4, 4, 16, 24]
+
+
+def test_apply(helpers):
+    alert_group = AlertGroup.parse_obj(helpers.build_payload(alerts=4, labels=3))
+
+    with recording() as events:
+        alert_group.apply(
+            [
+                ("remove_re", {"labels": "^specific_"}),
+                ("add", {"labels": {"env": "prod"}, "annotations": {"team": "a"}}),
+            ]
+        )
+
+    assert [(e.operation, e.alerts, e.elements) for e in events] == [("apply", 4, 20)]
+
+
+def test_parsers(helpers):
+    payload = helpers.build_payload(alerts=3, labels=2)
+    raw = json.dumps(payload)
+
+    with recording() as events:
+        AlertGroup(**payload)
+        AlertGroup.parse_obj(payload)
+        AlertGroup.parse_raw(raw)
+        AlertGroup.from_trusted_obj(payload)
+        AlertGroup.from_trusted_json(raw, lazy_timestamps=True)
+
+    assert [(e.operation, e.alerts, e.elements) for e in events] == [
+        ("parse_obj", 3, 15),
+        ("parse_raw", 3, 15),
+        ("from_trusted_obj", 3, 15),
+        ("from_trusted_json", 3, 15),
+    ]
+
+
+def test_parse_raw_forwards_arguments(helpers):
+    raw = json.dumps(helpers.build_payload(alerts=3, labels=2))
+
+    with recording() as events:
+        alert_group = AlertGroup.parse_raw(
+            raw.encode("utf-16"), content_type="application/json", encoding="utf-16"
+        )
+
+    assert len(alert_group.alerts) == 3
+    assert [event.operation for event in events] == ["parse_raw"]
+
+
+def test_hooks(helpers):
+    alert_group = AlertGroup.parse_obj(helpers.build_payload(alerts=2, labels=2))
+    events = []
+
+    add_hook(events.append)
+    try:
+        alert_group.add(labels={"env": "prod"})
+        with pytest.raises(KeyError):
+            alert_group.add_prefix(labels={"missing": "prefix"})
+        alert_group.remove(labels="env")
+    finally:
+        remove_hook(events.append)
+
+    alert_group.add(labels={"env": "prod"})
+
+    assert [event.operation for event in events] == ["add", "remove"]
+    assert instrumentation._hooks == ()
+
+    with pytest.raises(ValueError):
+        remove_hook(events.append)
+
+
+def test_prometheus_hook(helpers):
+    prometheus_client = pytest.importorskip("prometheus_client")
+
+    registry = prometheus_client.CollectorRegistry()
+    hook = PrometheusHook(registry=registry, namespace="test")
+    alert_group = AlertGroup.parse_obj(helpers.build_payload(alerts=5, labels=2))
+
+    add_hook(hook)
+    try:
+        alert_group.remove(labels="specific_0")
+    finally:
+        remove_hook(hook)
+
+    def sample(name):
+        return registry.get_sample_value(name, {"operation": "remove"})
+
+    assert sample("test_operation_duration_seconds_count") == 1
+    assert sample("test_operation_alerts_sum") == 5
+    assert sample("test_operation_elements_sum") == 5
+
+
+def test_prometheus_hook_requires_prometheus_client(monkeypatch):
+    monkeypatch.setattr(instrumentation, "prometheus_client", None)
+
+    with pytest.raises(ImportError):
+        PrometheusHook()
+
+
+@pytest.mark.slow
+def test_instrumentation_benchmark(helpers):
+    alert_group = AlertGroup.parse_obj(helpers.build_payload(alerts=1, labels=1))
+    uninstrumented = AlertGroup.update_common_labels.__wrapped__  # type: ignore
+
+    def measure(function):
+        return min(timeit.repeat(function, number=100000, repeat=5))
+
+    results = {
+        "100k calls without instrumentation": measure(
+            lambda: uninstrumented(alert_group)
+        ),
+        "100k calls without hooks": measure(alert_group.update_common_labels),
+    }
+
+    with recording():
+        results["100k calls with hook"] = measure(alert_group.update_common_labels)
+
+    helpers.wrapped_debug(results, "update_common_labels on group with 1 alert")
+
+    assert results["100k calls without hooks"] < (
+        results["100k calls without instrumentation"] * 1.5
+    )
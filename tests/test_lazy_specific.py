@@ -0,0 +1,92 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import json
+import pickle
+
+from prometheus_alert_model.main import AlertGroup
+
+
+def test_specific_elements_are_lazy(helpers, data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    alert_group = AlertGroup(**payload)
+
+    for alert in alert_group.alerts:
+        assert "specific_labels" not in alert.__dict__
+        assert "specific_annotations" not in alert.__dict__
+
+    specific_labels = alert_group.alerts[0].specific_labels
+
+    assert specific_labels == {"mu": "sik"}
+    assert alert_group.alerts[0].specific_labels is specific_labels
+    assert "specific_annotations" not in alert_group.alerts[0].__dict__
+
+
+def test_specific_elements_cache_dropped_by_mutations(helpers, data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    alert_group = AlertGroup(**payload)
+
+    assert alert_group.alerts[0].specific_labels == {"mu": "sik"}
+
+    alert_group.remove(labels="severity")
+    alert_group.remove_re(labels=r"^foo")
+    alert_group.add(labels={"hello": "world"})
+    alert_group.override(labels={"mu": "sik"})
+    alert_group.add_prefix(labels={"alertname": "PREFIX: "})
+
+    for alert in alert_group.alerts:
+        assert "specific_labels" not in alert.__dict__
+
+    assert alert_group.alerts[0].specific_labels == {}
+    assert alert_group.alerts[1].specific_labels == {}
+    assert alert_group.common_labels == {
+        "alertname": "PREFIX: WhatEver",
+        "hello": "world",
+        "mu": "sik",
+    }
+
+
+def test_specific_elements_serialized(helpers, data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    alert_group = AlertGroup(**payload)
+    helpers.wrapped_debug(alert_group)
+
+    dct = alert_group.dict()
+
+    assert dct["alerts"][0]["specific_labels"] == {"mu": "sik"}
+    assert dct["alerts"][1]["specific_annotations"] == {"this": "isspecific"}
+    assert '"specific_labels": {"mu": "sik"}' in alert_group.json()
+
+
+def test_specific_elements_assignment(helpers, data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    alert_group = AlertGroup(**payload)
+    alert_group.alerts[0].specific_labels = {"a": "b"}
+
+    assert alert_group.alerts[0].specific_labels == {"a": "b"}
+
+    alert_group.update_specific_labels()
+
+    assert alert_group.alerts[0].specific_labels == {"mu": "sik"}
+
+
+def test_specific_elements_pickle_and_copy(helpers, data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    alert_group = AlertGroup(**payload)
+
+    unpickled = pickle.loads(pickle.dumps(alert_group))
+    assert unpickled == alert_group
+    assert unpickled.alerts[0].specific_labels == {"mu": "sik"}
+
+    copied = alert_group.alerts[1].copy(deep=True)
+    assert copied.specific_annotations == {"this": "isspecific"}
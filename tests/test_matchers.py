@@ -0,0 +1,188 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import json
+import random
+import re
+import timeit
+
+import pytest
+
+from prometheus_alert_model import AlertGroup, Matcher
+from prometheus_alert_model.matchers import ElementIndex
+
+
+@pytest.mark.parametrize(
+    "text, name, operator, value",
+    [
+        ('severity="critical"', "severity", "=", "critical"),
+        ("severity = critical", "severity", "=", "critical"),
+        ('team!~"db|infra"', "team", "!~", "db|infra"),
+        ('job=~".+"', "job", "=~", ".+"),
+        ('path!="a \\"b\\""', "path", "!=", 'a "b"'),
+        ("empty=", "empty", "=", ""),
+        ('instance=~"host\\.example"', "instance", "=~", "host\\.example"),
+        ('port=~"\\d+"', "port", "=~", "\\d+"),
+        ('text="a\\\\b\\nc"', "text", "=", "a\\b\nc"),
+    ],
+)
+def test_parse(text, name, operator, value):
+    matcher = Matcher.parse(text)
+
+    assert (matcher.name, matcher.operator, matcher.value) == (name, operator, value)
+    assert matcher.target == "labels"
+    assert matcher == Matcher(name, value, operator)
+
+
+def test_parse_regex_escapes():
+    assert Matcher.parse('instance=~"host\\.example"').matches("host.example")
+    assert not Matcher.parse('instance=~"host\\.example"').matches("hostxexample")
+    assert Matcher.parse('port=~"\\d+"').matches("9090")
+    assert not Matcher.parse('port=~"\\d+"').matches("http")
+
+
+@pytest.mark.parametrize("text", ["severity", '="x"', 'a=="b"', 'a=~"("'])
+def test_parse_invalid(text):
+    with pytest.raises((ValueError, re.error)):
+        Matcher.parse(text)
+
+
+def test_unknown_operator():
+    with pytest.raises(ValueError):
+        Matcher("a", "b", "==")  # type: ignore
+
+
+@pytest.mark.parametrize(
+    "matcher, value, expected",
+    [
+        (Matcher("a", "x"), "x", True),
+        (Matcher("a", "x"), None, False),
+        (Matcher("a", ""), None, True),
+        (Matcher("a", "x", "!="), None, True),
+        (Matcher("a", "", "!="), "", False),
+        (Matcher("a", "x|y", "=~"), "y", True),
+        (Matcher("a", "x|y", "=~"), "xy", False),
+        (Matcher("a", "x*", "=~"), None, True),
+        (Matcher("a", "x*", "!~"), None, False),
+        (Matcher("a", "x.*", "!~"), "yx", True),
+    ],
+)
+def test_matches(matcher, value, expected):
+    assert matcher.matches(value) is expected
+
+
+def test_element_index_against_matches():
+    rng = random.Random(0)
+    dcts = [
+        {
+            name: rng.choice(["", "a", "b", "ab"])
+            for name in ("x", "y", "z")
+            if rng.random() < 0.7
+        }
+        for _ in range(200)
+    ]
+    index = ElementIndex(dcts)
+
+    values = ["", "a", "b", "ab", "c", "a|b", "a.*", ".*", ".+"]
+    for _ in range(500):
+        matchers = [
+            Matcher(
+                rng.choice(["x", "y", "z", "missing"]),
+                rng.choice(values),
+                rng.choice(["=", "!=", "=~", "!~"]),
+            )
+            for _ in range(rng.randrange(4))
+        ]
+        expected = [
+            position
+            for position, dct in enumerate(dcts)
+            if all(matcher.matches(dct.get(matcher.name)) for matcher in matchers)
+        ]
+
+        assert index.select(matchers) == expected, matchers
+
+
+def test_select(helpers, data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    alert_group = AlertGroup(**payload)
+    alert_group.alerts[0].labels["severity"] = "critical"
+    alert_group.update_common_elements()
+    alert_group.update_specific_elements()
+
+    selected = alert_group.select(['severity="critical"'])
+    helpers.wrapped_debug(selected)
+
+    assert len(selected.alerts) == 1
+    assert selected.alerts[0] is not alert_group.alerts[0]
+    assert selected.alerts[0].labels == alert_group.alerts[0].labels
+    assert selected.common_labels["severity"] == "critical"
+    assert selected.alerts[0].specific_labels == {}
+    assert alert_group.alerts[0].specific_labels["severity"] == "critical"
+
+    selected.remove(labels="severity")
+    assert alert_group.alerts[0].labels["severity"] == "critical"
+
+    assert len(alert_group.select(['severity=~"warning|critical"']).alerts) == 2
+    assert len(alert_group.select([]).alerts) == 2
+    assert alert_group.select(['severity="unknown"']).alerts == []
+
+
+def test_select_annotations(data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    alert_group = AlertGroup(**payload)
+    summary = alert_group.alerts[0].annotations["summary"]
+
+    selected = alert_group.select(
+        [Matcher("summary", summary, target="annotations"), "severity=warning"]
+    )
+    assert len(selected.alerts) == 2
+
+    selected = alert_group.select([Matcher("summary", ".*", "!~", "annotations")])
+    assert selected.alerts == []
+
+
+def test_select_index_invalidation(helpers):
+    alert_group = AlertGroup(**helpers.build_payload(alerts=10, labels=4))
+
+    assert len(alert_group.select(["common_0=value_0"]).alerts) == 10
+    assert alert_group._element_indexes is not None
+
+    alert_group.override(labels={"common_0": "changed"})
+    assert alert_group._element_indexes is None
+    assert alert_group.select(["common_0=value_0"]).alerts == []
+
+    alert_group.alerts.pop()
+    assert len(alert_group.select(["common_0=changed"]).alerts) == 9
+
+
+@pytest.mark.slow
+def test_select_benchmark(helpers):
+    payload = helpers.build_payload(alerts=5000, labels=20)
+    for i, alert in enumerate(payload["alerts"]):
+        alert["labels"]["severity"] = ["critical", "warning", "info"][i % 3]
+        alert["labels"]["team"] = f"team-{i % 50}"
+    alert_group = AlertGroup(**payload)
+    matchers = [Matcher.parse('severity="critical"'), Matcher.parse('team=~"team-1.*"')]
+
+    def scan():
+        return [
+            alert
+            for alert in alert_group.alerts
+            if all(m.matches(alert.labels.get(m.name)) for m in matchers)
+        ]
+
+    def select():
+        return alert_group._element_index("labels").select(matchers)
+
+    assert len(scan()) == len(select())
+
+    scanned = min(timeit.repeat(scan, number=10, repeat=3))
+    selected = min(timeit.repeat(select, number=10, repeat=3))
+    helpers.wrapped_debug(
+        {"per-alert checks": scanned, "inverted index": selected},
+        "Matching 5000 alerts 10 times (seconds)",
+    )
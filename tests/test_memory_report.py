@@ -0,0 +1,99 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import json
+import timeit
+import tracemalloc
+
+import pytest
+
+from prometheus_alert_model import AlertGroup
+
+
+def test_total_matches_tracemalloc(helpers):
+    raw = json.dumps(helpers.build_payload(alerts=200, labels=10))
+
+    tracemalloc.start()
+    alert_group = AlertGroup.from_trusted_json(raw)
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    report = alert_group.memory_report()
+    helpers.wrapped_debug({"report": report._asdict(), "traced": traced})
+
+    assert 0.8 * traced < report.total < 1.2 * traced
+
+
+def test_categories(helpers):
+    payload = helpers.build_payload(alerts=10, labels=4)
+    payload["custom"] = ["x" * 1000]
+    payload["alerts"][0]["silencedBy"] = ["y" * 1000]
+    alert_group = AlertGroup.parse_raw(json.dumps(payload))
+
+    report = alert_group.memory_report()
+
+    assert report.total == sum(report[:7])
+    assert report.labels > 0 and report.annotations > 0 and report.alerts > 0
+    assert report.specific == 0
+    assert report.indexes == 0
+    assert report.extra > 2000
+
+    [alert.specific_labels for alert in alert_group.alerts]
+    alert_group.index_common_elements()
+    alert_group.get("0")
+
+    report = alert_group.memory_report()
+
+    assert report.specific > 0
+    assert report.indexes > 0
+    assert alert_group.memory_report() == report
+
+
+def test_duplicates_and_compact(helpers):
+    payload = helpers.build_payload(alerts=10, labels=4, common_fraction=1.0)
+    alert_group = AlertGroup.parse_raw(json.dumps(payload))
+
+    before = alert_group.memory_report()
+    alert_group.compact()
+    after = alert_group.memory_report()
+    helpers.wrapped_debug({"before": before._asdict(), "after": after._asdict()})
+
+    assert before.duplicate_dicts == 9
+    assert before.duplicate_dict_bytes > 0
+    assert before.duplicate_strings > 40
+    assert after.duplicate_dicts == 0
+    assert after.duplicate_string_bytes < before.duplicate_string_bytes
+    assert after.labels < before.labels - before.duplicate_dict_bytes // 2
+
+
+def test_alert_memory_report(helpers):
+    alert_group = AlertGroup.parse_obj(helpers.build_payload(alerts=3, labels=4))
+    alert = alert_group.alerts[0]
+
+    report = alert.memory_report()
+
+    assert report.group == report.indexes == 0
+    assert report.total == sum(report[:7])
+    assert report.labels < alert_group.memory_report().labels
+
+
+@pytest.mark.slow
+def test_memory_report_benchmark(helpers):
+    alert_group = AlertGroup.parse_raw(
+        json.dumps(helpers.build_payload(alerts=5000, labels=20))
+    )
+
+    seconds = min(timeit.repeat(alert_group.memory_report, number=1, repeat=3))
+    report = alert_group.memory_report()
+    alert_group.compact()
+
+    helpers.wrapped_debug(
+        {
+            "seconds": seconds,
+            "report": report._asdict(),
+            "after compact": alert_group.memory_report()._asdict(),
+        },
+        "Memory report of 5000 alerts with 20 labels",
+    )
+
+    assert report.total > 0
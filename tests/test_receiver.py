@@ -0,0 +1,229 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import asyncio
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from prometheus_alert_model import AlertGroup, RelabelPlan
+from prometheus_alert_model.receiver import WebhookReceiver
+
+
+async def request(port, body, method="POST", path="/", headers=""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n{headers}\r\n".encode()
+        + body
+    )
+    await writer.drain()
+    status_line = await reader.readuntil(b"\r\n")
+    await reader.readuntil(b"\r\n\r\n")
+    writer.close()
+    return int(status_line.split()[1])
+
+
+def test_serve(helpers):
+    body = json.dumps(helpers.build_payload(alerts=3, labels=4)).encode()
+    received = []
+
+    async def callback(alert_group):
+        received.append(alert_group)
+
+    async def main():
+        plan = RelabelPlan([{"action": "add", "labels": {"env": "test"}}])
+        receiver = WebhookReceiver([callback], transforms=[plan.apply], path="/alerts")
+        server = await receiver.serve("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+
+        statuses = [
+            await request(port, body, path="/alerts?x=1"),
+            await request(port, body, path="/other"),
+            await request(port, b"", method="GET", path="/alerts"),
+            await request(port, b"{", path="/alerts"),
+        ]
+        await receiver.stop()
+
+        return statuses
+
+    assert asyncio.run(main()) == [202, 404, 405, 202]
+    assert len(received) == 1
+    assert isinstance(received[0], AlertGroup)
+    assert received[0].common_labels["env"] == "test"
+
+
+def test_keep_alive(helpers):
+    body = json.dumps(helpers.build_payload(alerts=1, labels=2)).encode()
+    received = []
+
+    async def main():
+        async with WebhookReceiver([received.append], trusted=True) as receiver:
+            server = await receiver.serve("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            request = f"POST / HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n"
+            writer.write((request.encode() + body) * 2)
+            heads = [await reader.readuntil(b"\r\n\r\n") for _ in range(2)]
+            writer.write(b"POST / HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n")
+            heads.append(await reader.readuntil(b"\r\n\r\n"))
+            assert await reader.read() == b""
+            writer.close()
+
+        return heads
+
+    heads = asyncio.run(main())
+
+    assert [head.split()[1] for head in heads] == [b"202", b"202", b"411"]
+    assert b"Connection: close" in heads[2]
+    assert len(received) == 2
+
+
+def test_backpressure(helpers):
+    body = json.dumps(helpers.build_payload(alerts=1, labels=2)).encode()
+    errors = []
+
+    async def main():
+        release = asyncio.Event()
+
+        async def callback(alert_group):
+            await release.wait()
+
+        receiver = WebhookReceiver(
+            [callback],
+            max_queue=1,
+            concurrency=1,
+            max_body_size=len(body),
+            on_error=lambda body, error: errors.append(error),
+        )
+        server = await receiver.serve("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+
+        statuses = [await request(port, body)]
+        while receiver._queue.qsize():
+            await asyncio.sleep(0.01)
+        statuses += [await request(port, b"{}"), await request(port, body)]
+        statuses.append(await request(port, body + b" "))
+
+        release.set()
+        await receiver.stop()
+
+        return statuses
+
+    assert asyncio.run(main()) == [202, 202, 429, 413]
+    assert len(errors) == 1
+
+
+def test_submit_requires_start():
+    with pytest.raises(RuntimeError):
+        WebhookReceiver([]).submit(b"{}")
+
+
+def test_asgi(helpers):
+    body = json.dumps(helpers.build_payload(alerts=2, labels=2)).encode()
+    received = []
+
+    async def call(scope, messages):
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        await receiver(scope, receive, send)
+        return sent
+
+    async def main():
+        lifespan = await call(
+            {"type": "lifespan"},
+            [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}],
+        )
+        assert [m["type"] for m in lifespan] == [
+            "lifespan.startup.complete",
+            "lifespan.shutdown.complete",
+        ]
+
+        http = {"type": "http", "method": "POST", "path": "/"}
+        sent = await call(
+            http,
+            [
+                {"type": "http.request", "body": body[:10], "more_body": True},
+                {"type": "http.request", "body": body[10:]},
+            ],
+        )
+        assert sent[0]["status"] == 202
+        sent = await call({**http, "method": "PUT"}, [{"type": "http.request"}])
+        assert sent[0]["status"] == 405
+
+        await receiver.stop()
+
+    receiver = WebhookReceiver([received.append])
+    asyncio.run(main())
+
+    assert len(received) == 1
+    assert not receiver.running
+
+
+def test_process_pool(helpers):
+    body = json.dumps(helpers.build_payload(alerts=3, labels=4)).encode()
+    received = []
+
+    async def main():
+        plan = RelabelPlan([{"action": "labeldrop", "regex": "specific_.*"}])
+        with ProcessPoolExecutor(2) as executor:
+            async with WebhookReceiver(
+                [received.append], transforms=[plan.apply], executor=executor
+            ) as receiver:
+                for _ in range(3):
+                    receiver.submit(body)
+
+    asyncio.run(main())
+
+    assert len(received) == 3
+    assert all(not a.specific_labels for a in received[0].alerts)
+
+
+@pytest.mark.slow
+def test_receiver_benchmark(helpers):
+    large = json.dumps(helpers.build_payload(alerts=5000, labels=20)).encode()
+    small = json.dumps(helpers.build_payload(alerts=5, labels=20)).encode()
+    latencies = {}
+
+    async def main():
+        sent = {}
+
+        def callback(alert_group):
+            size = len(alert_group.alerts)
+            latencies.setdefault(size, time.perf_counter() - sent[size])
+
+        async with WebhookReceiver([callback]) as receiver:
+            server = await receiver.serve("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+
+            sent[5000] = time.perf_counter()
+            await request(port, large)
+            sent[5] = time.perf_counter()
+            await request(port, small)
+
+            start = time.perf_counter()
+            statuses = await asyncio.gather(*(request(port, small) for _ in range(50)))
+            elapsed = time.perf_counter() - start
+
+        return statuses, elapsed
+
+    statuses, elapsed = asyncio.run(main())
+    helpers.wrapped_debug(
+        {
+            "large payload until callback": latencies[5000],
+            "small payload sent after large until callback": latencies[5],
+            "50 concurrent small requests": elapsed,
+        },
+        "Receiving payloads with 5000 and 5 alerts (seconds)",
+    )
+
+    assert latencies[5] < latencies[5000]
+    assert statuses.count(202) + statuses.count(429) == 50
@@ -0,0 +1,92 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import json
+
+import pytest
+
+from prometheus_alert_model import RelabelPlan
+from prometheus_alert_model.main import AlertGroup
+
+CONFIG = [
+    {"action": "labeldrop", "regex": "foo.*|mu"},
+    {"action": "add", "labels": {"cluster": "a"}},
+    {"action": "add_prefix", "annotations": {"summary": "Cluster A: "}},
+    {"action": "remove", "annotations": "this"},
+]
+
+
+def test_relabel_plan(helpers, data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    alert_group = AlertGroup(**payload)
+    RelabelPlan(CONFIG).apply(alert_group)
+    helpers.wrapped_debug(alert_group)
+
+    assert alert_group.common_labels == {
+        "alertname": "WhatEver",
+        "severity": "warning",
+        "cluster": "a",
+    }
+    assert alert_group.common_annotations["summary"] == (
+        "Cluster A: Prometheus job missing (instance )"
+    )
+    for alert in alert_group.alerts:
+        assert alert.specific_labels == {}
+        assert alert.specific_annotations == {}
+
+
+def test_relabel_plan_matches_methods(helpers, data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    expected = AlertGroup(**payload)
+    expected.remove_re(labels=r"^(?:foo.*|mu)$")
+    expected.add(labels={"cluster": "a"})
+    expected.add_prefix(annotations={"summary": "Cluster A: "})
+    expected.remove(annotations="this")
+
+    alert_group = AlertGroup(**payload)
+    RelabelPlan(CONFIG).apply(alert_group)
+
+    assert alert_group.dict() == expected.dict()
+
+
+def test_relabel_plan_labeldrop_is_anchored(helpers, data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    alert_group = AlertGroup(**payload)
+    RelabelPlan([{"action": "labeldrop", "regex": "foo"}]).apply(alert_group)
+
+    assert "foo_bar_qux" in alert_group.common_labels
+
+
+def test_relabel_plan_reused(helpers, data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+
+    plan = RelabelPlan(CONFIG, cache_size=2)
+    alert_groups = [AlertGroup(**payload) for _ in range(3)]
+    plan.apply_all(alert_groups)
+
+    for alert_group in alert_groups:
+        assert alert_group.dict() == alert_groups[0].dict()
+        assert "mu" not in alert_group.alerts[0].labels
+
+    assert len(plan._steps[0][2]) <= 2
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        [{"labels": "a"}],
+        [{"action": "drop", "labels": "a"}],
+        [{"action": "labeldrop"}],
+        [{"action": "remove", "label": "a"}],
+    ],
+)
+def test_relabel_plan_invalid(config):
+    with pytest.raises(ValueError):
+        RelabelPlan(config)
@@ -62,3 +62,26 @@ def test_remove_re_multiple_annotations(helpers, data_path):
     for alert in alert_group.alerts:
         assert alert.annotations == {}
         assert alert.specific_annotations == {}
+
+
+def test_remove_re_matches_every_name_once(helpers):
+    class CountingPattern:
+        def __init__(self, pattern):
+            self.pattern = re.compile(pattern)
+            self.searched = []
+
+        def search(self, string):
+            self.searched.append(string)
+            return self.pattern.search(string)
+
+    alert_group = AlertGroup(**helpers.build_payload(alerts=100, labels=10))
+    patterns = [CountingPattern(r"^specific_0$"), CountingPattern(r"^common_1$")]
+
+    alert_group.remove_re(labels=patterns)
+
+    assert len(patterns[0].searched) == len(set(patterns[0].searched)) == 10
+    assert "common_1" not in alert_group.common_labels
+    for alert in alert_group.alerts:
+        assert "specific_0" not in alert.labels
+        assert "specific_0" not in alert.specific_labels
+        assert "common_1" not in alert.labels
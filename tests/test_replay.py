@@ -0,0 +1,167 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import gzip
+import json
+import pickle
+import timeit
+
+import pytest
+
+from prometheus_alert_model import AlertGroup, RelabelPlan, utils
+from prometheus_alert_model.cli import main
+from prometheus_alert_model.replay import Replay, read_lines
+
+RULES = [{"action": "add", "labels": {"replayed": "true"}}]
+
+
+def build_lines(helpers, payloads, alerts=3):
+    lines = []
+    for i in range(payloads):
+        payload = helpers.build_payload(alerts=alerts, labels=4, seed=i)
+        payload["groupKey"] = str(i)
+        lines.append(json.dumps(payload).encode())
+    return lines
+
+
+def test_read_lines(helpers, tmp_path):
+    lines = build_lines(helpers, 4)
+    tmp_path.joinpath("a.jsonl").write_bytes(b"\n".join(lines[:2]) + b"\n\n")
+    with gzip.open(tmp_path.joinpath("b.jsonl.gz"), "wb") as file:
+        file.write(b"\n".join(lines[2:]))
+
+    paths = [str(tmp_path / "a.jsonl"), str(tmp_path / "b.jsonl.gz")]
+
+    assert list(read_lines(paths)) == lines
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_replay(helpers, workers):
+    lines = build_lines(helpers, 10)
+    plan = RelabelPlan(RULES)
+
+    replay = Replay(lines, transforms=[plan.apply], workers=workers, chunk_size=3)
+    results = [AlertGroup.parse_raw(line) for line in replay]
+
+    assert [alert_group.group_key for alert_group in results] == [
+        str(i) for i in range(10)
+    ]
+    assert all(g.common_labels["replayed"] == "true" for g in results)
+    assert (replay.payloads, replay.alerts) == (10, 30)
+    assert replay.payloads_per_second > 0
+    assert "10 payloads with 30 alerts" in str(replay)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_replay_error(helpers, workers):
+    lines = build_lines(helpers, 4)
+    lines[2] = b"{}"
+    replay = Replay(lines, workers=workers, chunk_size=3)
+    results = []
+
+    with pytest.raises(ValueError, match="Payload 3 is invalid"):
+        results.extend(replay)
+
+    assert len(results) == 2
+    assert (replay.payloads, replay.alerts) == (2, 6)
+    assert [number for number, _ in replay.errors] == [3]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("trusted", [False, True])
+def test_replay_skip_invalid(helpers, workers, trusted):
+    lines = build_lines(helpers, 6)
+    lines[1] = b"{}"
+    lines[4] = b"not json"
+    replay = Replay(
+        lines, workers=workers, chunk_size=2, trusted=trusted, skip_invalid=True
+    )
+
+    results = [AlertGroup.parse_raw(line) for line in replay]
+
+    assert [g.group_key for g in results] == ["0", "2", "3", "5"]
+    assert (replay.payloads, replay.alerts) == (4, 12)
+    assert [number for number, _ in replay.errors] == [2, 5]
+    assert "2 invalid payloads" in str(replay)
+
+
+def test_cli_replay(helpers, tmp_path, capsys):
+    lines = build_lines(helpers, 5)
+    tmp_path.joinpath("in.jsonl").write_bytes(b"\n".join(lines))
+    tmp_path.joinpath("rules.json").write_text(json.dumps(RULES))
+
+    code = main(
+        [
+            "replay",
+            str(tmp_path / "in.jsonl"),
+            "--rules",
+            str(tmp_path / "rules.json"),
+            "--output",
+            str(tmp_path / "out.jsonl"),
+            "--workers",
+            "2",
+            "--chunk-size",
+            "2",
+        ]
+    )
+
+    output = tmp_path.joinpath("out.jsonl").read_bytes().splitlines()
+    assert code == 0
+    assert len(output) == 5
+    assert AlertGroup.parse_raw(output[4]).common_labels["replayed"] == "true"
+    assert "Replayed 5 payloads with 15 alerts" in capsys.readouterr().err
+
+
+def test_cli_replay_skip_invalid(helpers, tmp_path, capsys):
+    lines = build_lines(helpers, 3)
+    lines.insert(1, b"{}")
+    tmp_path.joinpath("in.jsonl").write_bytes(b"\n".join(lines))
+
+    code = main(
+        [
+            "replay",
+            str(tmp_path / "in.jsonl"),
+            "--output",
+            str(tmp_path / "out.jsonl"),
+            "--workers",
+            "1",
+            "--skip-invalid",
+        ]
+    )
+
+    err = capsys.readouterr().err
+    assert code == 0
+    assert len(tmp_path.joinpath("out.jsonl").read_bytes().splitlines()) == 3
+    assert "Skipped payload 2: ValidationError" in err
+    assert "1 invalid payloads" in err
+
+
+@pytest.mark.slow
+def test_replay_benchmark(helpers):
+    lines = build_lines(helpers, 200, alerts=200)
+    plan = RelabelPlan(RULES)
+
+    def replay(workers, chunk_size):
+        return sum(1 for _ in Replay(lines, [plan.apply], workers, chunk_size))
+
+    alert_group = AlertGroup.parse_raw(lines[0])
+    pickled = min(timeit.repeat(lambda: pickle.dumps(alert_group), number=10, repeat=3))
+    encoded = min(timeit.repeat(alert_group.to_webhook_json, number=10, repeat=3))
+
+    results = {
+        "single process": min(timeit.repeat(lambda: replay(1, 64), number=1, repeat=1)),
+        "4 processes, chunks of 1": min(
+            timeit.repeat(lambda: replay(4, 1), number=1, repeat=1)
+        ),
+        "4 processes, chunks of 16": min(
+            timeit.repeat(lambda: replay(4, 16), number=1, repeat=1)
+        ),
+        "pickle 10 groups": pickled,
+        "to_webhook_json 10 groups": encoded,
+    }
+    helpers.wrapped_debug(results, "Replaying 200 payloads with 200 alerts (seconds)")
+
+    # Workers return JSON because it is cheaper to transfer than pickled
+    # models. Only holds with orjson, the standard library is slower.
+    if utils.orjson is not None:
+        assert encoded < pickled
@@ -0,0 +1,147 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import random
+import timeit
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from prometheus_alert_model import AlertGroup, Matcher
+from prometheus_alert_model.silences import Silence, SilenceSet
+
+NOW = datetime(2020, 11, 3, 18, tzinfo=timezone.utc)
+START = NOW - timedelta(hours=1)
+END = NOW + timedelta(hours=1)
+
+
+def build_group(helpers, alerts: int = 10) -> AlertGroup:
+    payload = helpers.build_payload(alerts=alerts, labels=4)
+    for i, alert in enumerate(payload["alerts"]):
+        alert["labels"]["team"] = f"team-{i % 5}"
+        alert["labels"]["severity"] = "critical" if i % 2 else "warning"
+    return AlertGroup(**payload)
+
+
+def test_silence_from_obj():
+    silence = Silence.from_obj(
+        {
+            "id": "abc",
+            "matchers": [
+                {"name": "team", "value": "db", "isRegex": False},
+                {"name": "env", "value": "prod", "isRegex": False, "isEqual": False},
+                {"name": "job", "value": "node.*", "isRegex": True, "isEqual": True},
+                {"name": "dc", "value": "eu.*", "isRegex": True, "isEqual": False},
+            ],
+            "startsAt": "2020-11-03T17:00:00.000Z",
+            "endsAt": "2020-11-03T19:00:00.000Z",
+            "createdBy": "someone",
+        }
+    )
+
+    assert silence.id == "abc"
+    assert silence.matchers == [
+        Matcher("team", "db"),
+        Matcher("env", "prod", "!="),
+        Matcher("job", "node.*", "=~"),
+        Matcher("dc", "eu.*", "!~"),
+    ]
+    assert silence.is_active(NOW)
+    assert not silence.is_active(END)
+
+
+def test_silence_invalid():
+    with pytest.raises(ValueError):
+        Silence([], START, END)
+
+    with pytest.raises(ValueError):
+        Silence([Matcher("summary", "x", target="annotations")], START, END)
+
+
+def test_evaluate(helpers):
+    alert_group = build_group(helpers)
+    silence_set = SilenceSet(
+        [
+            Silence(['team="team-1"'], START, END),
+            Silence(['team="team-2"', 'severity="critical"'], START, END),
+            Silence(['team="team-3"'], END, END + timedelta(hours=1)),
+            Silence(['team="team-1"'], END, END + timedelta(hours=1)),
+        ]
+    )
+
+    silenced, unsilenced = silence_set.evaluate(alert_group, at=NOW)
+
+    assert silenced == [f"{i:016x}" for i in (1, 6, 7)]
+    assert unsilenced == [f"{i:016x}" for i in (0, 2, 3, 4, 5, 8, 9)]
+
+    silenced, _ = silence_set.evaluate(alert_group, at=END)
+    assert silenced == [f"{i:016x}" for i in (1, 3, 6, 8)]
+
+    silenced, _ = silence_set.evaluate(alert_group)
+    assert silenced == []
+
+
+def test_evaluate_against_matches(helpers):
+    rng = random.Random(0)
+    alert_group = build_group(helpers, alerts=50)
+    silences = [
+        Silence(
+            [
+                Matcher(
+                    rng.choice(["team", "severity", "missing"]),
+                    rng.choice(["team-1", "team-.*", "critical", "", ".*"]),
+                    rng.choice(["=", "!=", "=~", "!~"]),
+                )
+                for _ in range(rng.randrange(1, 3))
+            ],
+            START,
+            END,
+        )
+        for _ in range(30)
+    ]
+
+    silenced, unsilenced = SilenceSet(silences).evaluate(alert_group, at=NOW)
+
+    expected = [
+        alert.fingerprint
+        for alert in alert_group.alerts
+        if any(
+            all(m.matches(alert.labels.get(m.name)) for m in silence.matchers)
+            for silence in silences
+        )
+    ]
+    assert silenced == expected
+    assert len(silenced) + len(unsilenced) == 50
+
+
+@pytest.mark.slow
+def test_evaluate_benchmark(helpers):
+    alert_group = build_group(helpers, alerts=2000)
+    silences = [
+        Silence([f'team="team-{i % 5}"', f'specific_0="value_{i * 10}_0"'], START, END)
+        for i in range(500)
+    ]
+    silence_set = SilenceSet(silences)
+
+    def nested():
+        return [
+            alert.fingerprint
+            for alert in alert_group.alerts
+            if any(
+                all(m.matches(alert.labels.get(m.name)) for m in silence.matchers)
+                for silence in silences
+                if silence.is_active(NOW)
+            )
+        ]
+
+    def evaluate():
+        return silence_set.evaluate(alert_group, at=NOW)[0]
+
+    assert nested() == evaluate()
+
+    looped = min(timeit.repeat(nested, number=1, repeat=1))
+    evaluated = min(timeit.repeat(evaluate, number=1, repeat=3))
+    helpers.wrapped_debug(
+        {"silences x alerts": looped, "silence set": evaluated},
+        "Evaluating 500 silences against 2000 alerts (seconds)",
+    )
@@ -0,0 +1,237 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import random
+import timeit
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from prometheus_alert_model import AlertGroup, Matcher
+from prometheus_alert_model.store import AlertStore
+
+NOW = datetime(2020, 11, 3, 18, tzinfo=timezone.utc)
+
+
+def build_group(helpers, group_key: str, alerts: int, offset: int = 0) -> AlertGroup:
+    payload = helpers.build_payload(alerts=alerts + offset, labels=4)
+    payload["alerts"] = payload["alerts"][offset:]
+    payload["groupKey"] = group_key
+    for alert in payload["alerts"]:
+        alert["labels"]["group"] = group_key
+    return AlertGroup(**payload)
+
+
+def assert_indexes_consistent(store: AlertStore) -> None:
+    alerts = list(store)
+
+    for alert in alerts:
+        assert store.get(alert.fingerprint) is alert
+        assert alert in store.select([Matcher("group", alert.labels["group"])])
+
+    for group_key, slots in store._by_group_key.items():
+        for slot in slots:
+            assert group_key in store._group_keys[slot]
+    assert sum(len(slots) for slots in store._by_group_key.values()) == sum(
+        len(store._group_keys[slot]) for slot in store._slots.values()
+    )
+    assert all(store._group_keys[slot] for slot in store._slots.values())
+    assert store._index.size == len(alerts)
+    assert len(store._free) + len(alerts) == len(store._alerts)
+
+
+def test_ingest_and_query(helpers):
+    store = AlertStore()
+    store.ingest(build_group(helpers, "a", 3), at=NOW)
+    store.ingest(build_group(helpers, "b", 2, offset=3), at=NOW)
+
+    assert len(store) == 5
+    assert f"{0:016x}" in store
+    assert "unknown" not in store
+    assert store.get("unknown") is None
+    assert [alert.fingerprint for alert in store.by_group_key("b")] == [
+        f"{3:016x}",
+        f"{4:016x}",
+    ]
+    assert store.by_group_key("unknown") == []
+    assert len(store.select(['group="a"', "specific_0=~value_[12]_0"])) == 2
+    assert len(store.select(['group!="a"'])) == 2
+    assert_indexes_consistent(store)
+
+    with pytest.raises(ValueError):
+        store.select([Matcher("summary", "x", target="annotations")])
+
+
+def test_upsert(helpers):
+    store = AlertStore()
+    store.ingest(build_group(helpers, "a", 3), at=NOW)
+
+    resend = build_group(helpers, "a", 3)
+    resend.alerts[0].labels["severity"] = "critical"
+    resend.alerts[1].status = "resolved"
+    store.ingest(resend, at=NOW + timedelta(minutes=1))
+
+    assert len(store) == 2
+    assert store.get(f"{0:016x}") is resend.alerts[0]
+    assert store.get(f"{2:016x}") is resend.alerts[2]
+    assert f"{1:016x}" not in store
+    assert store.select(['severity="critical"']) == [resend.alerts[0]]
+    assert_indexes_consistent(store)
+
+    moved = build_group(helpers, "b", 1)
+    store.ingest(moved, at=NOW + timedelta(minutes=2))
+
+    assert [alert.fingerprint for alert in store.by_group_key("b")] == [f"{0:016x}"]
+    assert [alert.fingerprint for alert in store] == [f"{2:016x}", f"{0:016x}"]
+    assert_indexes_consistent(store)
+
+    store.discard(f"{2:016x}")
+    store.discard("unknown")
+    assert len(store) == 1
+    assert_indexes_consistent(store)
+
+
+def test_alert_in_several_groups(helpers):
+    store = AlertStore()
+    store.ingest(build_group(helpers, "a", 3), at=NOW)
+    store.ingest(build_group(helpers, "b", 2, offset=1), at=NOW)
+    slots = dict(store._slots)
+
+    store.ingest(build_group(helpers, "a", 3), at=NOW + timedelta(minutes=1))
+
+    assert dict(store._slots) == slots
+    assert len(store) == 3
+    assert [alert.fingerprint for alert in store.by_group_key("a")] == [
+        f"{0:016x}",
+        f"{1:016x}",
+        f"{2:016x}",
+    ]
+    assert [alert.fingerprint for alert in store.by_group_key("b")] == [
+        f"{1:016x}",
+        f"{2:016x}",
+    ]
+    assert_indexes_consistent(store)
+
+    resolved = build_group(helpers, "a", 2, offset=1)
+    for alert in resolved.alerts:
+        alert.status = "resolved"
+    store.ingest(resolved, at=NOW + timedelta(minutes=2))
+
+    assert len(store) == 3
+    assert [alert.fingerprint for alert in store.by_group_key("a")] == [f"{0:016x}"]
+    assert len(store.by_group_key("b")) == 2
+    assert_indexes_consistent(store)
+
+    resolved.group_key = "b"
+    store.ingest(resolved, at=NOW + timedelta(minutes=3))
+
+    assert len(store) == 1
+    assert store.by_group_key("b") == []
+    assert_indexes_consistent(store)
+
+
+def test_indexed_labels(helpers):
+    store = AlertStore(indexed_labels=["group"])
+    store.ingest(build_group(helpers, "a", 3), at=NOW)
+    store.ingest(build_group(helpers, "b", 2, offset=3), at=NOW)
+
+    assert list(store._index.positions) == ["group"]
+    assert len(store.select(['group="a"', "specific_0=~value_[12]_0"])) == 2
+    assert len(store.select(["specific_0=~value_[14]_0"])) == 2
+    assert_indexes_consistent(store)
+
+    store.ingest(build_group(helpers, "b", 3), at=NOW)
+    assert len(store.by_group_key("b")) == 5
+    assert_indexes_consistent(store)
+
+
+def test_keep_resolved(helpers):
+    store = AlertStore(keep_resolved=True)
+    alert_group = build_group(helpers, "a", 2)
+    alert_group.alerts[0].status = "resolved"
+
+    store.ingest(alert_group, at=NOW)
+
+    assert store.get(f"{0:016x}").status == "resolved"
+
+
+def test_eviction(helpers):
+    store = AlertStore(ttl=timedelta(minutes=5), max_alerts=4)
+
+    store.ingest(build_group(helpers, "a", 3), at=NOW)
+    store.ingest(build_group(helpers, "b", 2, offset=3), at=NOW + timedelta(minutes=1))
+
+    assert len(store) == 4
+    assert f"{0:016x}" not in store
+
+    store.ingest(build_group(helpers, "a", 1, offset=1), at=NOW + timedelta(minutes=4))
+    assert store.evict(NOW + timedelta(minutes=5, seconds=30)) == 1
+    assert [alert.fingerprint for alert in store] == [
+        f"{3:016x}",
+        f"{4:016x}",
+        f"{1:016x}",
+    ]
+
+    store.ingest([], at=NOW + timedelta(minutes=10))
+    assert len(store) == 0
+    assert store._by_group_key == {}
+    assert store._index.positions == {}
+
+    store.ingest(build_group(helpers, "c", 2), at=NOW + timedelta(minutes=11))
+    assert len(store._alerts) == 5
+    assert_indexes_consistent(store)
+
+
+def test_random_operations(helpers):
+    rng = random.Random(0)
+    store = AlertStore(max_alerts=30)
+    at = NOW
+
+    for _ in range(200):
+        at += timedelta(seconds=1)
+        alert_group = build_group(helpers, rng.choice("abc"), 5, rng.randrange(40))
+        for alert in alert_group.alerts:
+            alert.labels["severity"] = rng.choice(["critical", "warning"])
+            if rng.random() < 0.2:
+                alert.status = "resolved"
+        store.ingest(alert_group, at=at)
+
+        assert len(store) <= 30
+        assert_indexes_consistent(store)
+
+
+@pytest.mark.slow
+def test_store_benchmark(helpers):
+    payload = helpers.build_payload(alerts=100000, labels=10)
+    groups = []
+    for i in range(100):
+        alerts = payload["alerts"][i * 1000 : (i + 1) * 1000]
+        for alert in alerts:
+            alert["labels"]["group"] = f"group-{i}"
+        groups.append(AlertGroup(**{**payload, "alerts": alerts, "groupKey": str(i)}))
+    store = AlertStore(max_alerts=200000, indexed_labels=["group"])
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    ingest = min(timeit.repeat(lambda: store.ingest(groups, at=NOW), number=1, repeat=1))
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    resend = min(
+        timeit.repeat(lambda: store.ingest(groups[0], at=NOW), number=1, repeat=3)
+    )
+    select = min(
+        timeit.repeat(lambda: store.select(['group="group-7"']), number=1, repeat=3)
+    )
+    helpers.wrapped_debug(
+        {
+            "ingest 100000 alerts": ingest,
+            "ingest resend of 1000 alerts": resend,
+            "select 1000 alerts by label": select,
+            "store overhead (MiB)": (after - before) / 2**20,
+        },
+        "Alert store with 100000 alerts (seconds)",
+    )
+
+    assert len(store) == 100000
@@ -0,0 +1,128 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import io
+import json
+import tracemalloc
+
+import pytest
+
+from prometheus_alert_model.main import AlertGroup
+from prometheus_alert_model.streaming import AlertGroupReader
+
+
+def read_all(reader):
+    alert_group = reader.header
+    alert_group.alerts.extend(reader)
+    return alert_group
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 65536])
+def test_reader(helpers, data_path, chunk_size):
+    raw = data_path.joinpath("payload-simple-01.json").read_bytes()
+    expected = AlertGroup.parse_raw(raw)
+
+    reader = AlertGroupReader(io.BytesIO(raw), chunk_size=chunk_size)
+    helpers.wrapped_debug(reader.header)
+
+    assert reader.header.group_key == expected.group_key
+    assert reader.header.common_labels == expected.common_labels
+    assert reader.header.alerts == []
+
+    alerts = list(reader)
+
+    assert [alert.dict() for alert in alerts] == [
+        alert.dict() for alert in expected.alerts
+    ]
+    assert alerts[0].specific_labels == {"mu": "sik"}
+    assert list(reader) == []
+
+
+def test_reader_alerts_last(helpers, data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+    payload["extra"] = "kept"
+    payload["alerts"] = payload.pop("alerts")
+    payload["skipped"] = "skipped"
+    raw = json.dumps(payload, indent=2)
+
+    reader = AlertGroupReader(io.StringIO(raw), chunk_size=5)
+
+    assert reader._spool is None
+
+    alert_group = read_all(reader)
+    expected = AlertGroup.parse_raw(raw)
+    del expected.__dict__["skipped"]
+
+    assert alert_group.extra == "kept"
+    assert alert_group.dict() == expected.dict()
+
+
+def test_reader_trusted(helpers, data_path):
+    raw = data_path.joinpath("payload-simple-01.json").read_bytes()
+
+    alert_group = read_all(AlertGroupReader(io.BytesIO(raw), trusted=True))
+
+    assert alert_group.dict() == AlertGroup.parse_raw(raw).dict()
+
+
+def test_reader_multibyte_characters(helpers, data_path):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+    payload["alerts"][0]["annotations"]["description"] = "Überlauf ✓ 🔥"
+    raw = json.dumps(payload, ensure_ascii=False).encode()
+
+    alert_group = read_all(AlertGroupReader(io.BytesIO(raw), chunk_size=1))
+
+    assert alert_group.alerts[0].annotations["description"] == "Überlauf ✓ 🔥"
+
+
+@pytest.mark.parametrize("raw", [b"", b"[]", b'{"receiver": "generic", "alerts": [{'])
+def test_reader_invalid(raw):
+    with pytest.raises(ValueError):
+        list(AlertGroupReader(io.BytesIO(raw)))
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_reader_missing_alerts(data_path, trusted):
+    with data_path.joinpath("payload-simple-01.json").open() as file:
+        payload = json.load(file)
+    del payload["alerts"]
+    raw = json.dumps(payload).encode()
+
+    with pytest.raises(ValueError):
+        AlertGroup.parse_raw(raw)
+    with pytest.raises(ValueError):
+        AlertGroupReader(io.BytesIO(raw), trusted=trusted)
+
+
+@pytest.mark.slow
+def test_reader_memory_benchmark(helpers):
+    payload = helpers.build_payload(alerts=5000, labels=20)
+    for alert in payload["alerts"]:
+        alert["annotations"]["description"] = "x" * 4096
+    raw = json.dumps(payload).encode()
+
+    def peak(read):
+        tracemalloc.start()
+        read()
+        size = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return size
+
+    def stream():
+        for _ in AlertGroupReader(io.BytesIO(raw), spool_size=1 << 20):
+            pass
+
+    results = {
+        "parse_raw": peak(lambda: AlertGroup.parse_raw(raw)),
+        "AlertGroupReader": peak(stream),
+    }
+
+    helpers.wrapped_debug(
+        results, "Peak bytes allocated for 5000 alerts with 4 KiB descriptions"
+    )
+
+    # The spool, a few chunks and a single alert, independent of the payload.
+    assert results["AlertGroupReader"] < 8 * (1 << 20)
+    assert results["AlertGroupReader"] < results["parse_raw"] / 10
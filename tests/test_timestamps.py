@@ -0,0 +1,168 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import copy
+import json
+import pickle
+import timeit
+
+import pytest
+from pydantic import ValidationError
+from pydantic.datetime_parse import parse_datetime
+
+from prometheus_alert_model import AlertGroup
+from prometheus_alert_model.utils import parse_timestamp
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "0001-01-01T00:00:00Z",
+        "2020-11-03T17:51:36Z",
+        "2020-11-03T17:51:36.1Z",
+        "2020-11-03T17:51:36.14925565Z",
+        "2020-11-03T17:51:36.149255659Z",
+        "2020-11-03T17:51:36.149+02:00",
+        "2020-11-03T17:51:36-05:30",
+        "2020-11-03 17:51:36Z",
+        "2020-11-03T17:51:36",
+    ],
+)
+def test_parse_timestamp_matches_pydantic(text):
+    parsed = parse_timestamp(text)
+    expected = parse_datetime(text)
+
+    assert parsed == expected
+    assert parsed.utcoffset() == expected.utcoffset()
+    assert parsed.microsecond == expected.microsecond
+
+
+def test_parse_timestamp_cache():
+    assert parse_timestamp("2020-11-03T17:51:36Z") is parse_timestamp(
+        "2020-11-03T17:51:36Z"
+    )
+
+    with pytest.raises(ValueError):
+        parse_timestamp("2020-13-03T17:51:36Z")
+    with pytest.raises(ValueError):
+        parse_timestamp("yesterday")
+
+
+def test_parse_raw_uses_parser(helpers):
+    payload = helpers.build_payload(alerts=2, labels=2)
+    alert_group = AlertGroup.parse_obj(payload)
+
+    assert alert_group.alerts[0].starts_at is parse_timestamp(
+        payload["alerts"][0]["startsAt"]
+    )
+
+    payload["alerts"][0]["startsAt"] = "2020-13-03T17:51:36Z"
+    with pytest.raises(ValidationError):
+        AlertGroup.parse_obj(payload)
+
+
+def test_lazy_timestamps(helpers):
+    raw = json.dumps(helpers.build_payload(alerts=3, labels=4, resolved_fraction=0.5))
+    expected = AlertGroup.parse_raw(raw)
+
+    alert_group = AlertGroup.from_trusted_json(raw, lazy_timestamps=True)
+    alert = alert_group.alerts[0]
+
+    assert "starts_at" not in alert.__dict__
+    assert alert.starts_at == expected.alerts[0].starts_at
+    assert "starts_at" in alert.__dict__
+    assert "ends_at" not in alert.__dict__
+
+    assert alert_group.dict() == expected.dict()
+    assert alert_group.alerts[1] == expected.alerts[1]
+
+
+def test_lazy_timestamps_field_order(helpers):
+    payload = helpers.build_payload(alerts=3, labels=4)
+    payload["alerts"][0]["silencedBy"] = ["id"]
+    raw = json.dumps(payload)
+    expected = AlertGroup.parse_raw(raw)
+
+    alert_group = AlertGroup.from_trusted_json(raw, lazy_timestamps=True)
+    alert_group.alerts[1].ends_at
+
+    assert repr(alert_group) == repr(expected)
+    assert alert_group.json() == expected.json()
+    assert [list(a.dict()) for a in alert_group.alerts] == [
+        list(a.dict()) for a in expected.alerts
+    ]
+
+
+def test_lazy_timestamps_copies(helpers):
+    raw = json.dumps(helpers.build_payload(alerts=3, labels=4))
+    expected = AlertGroup.parse_raw(raw)
+
+    for alert_group in [
+        pickle.loads(pickle.dumps(AlertGroup.from_trusted_json(raw, True))),
+        copy.deepcopy(AlertGroup.from_trusted_json(raw, True)),
+        AlertGroup.from_trusted_json(raw, True).copy(),
+        AlertGroup.from_trusted_json(raw, True).select(["common_0=value_0"]),
+    ]:
+        assert [a.ends_at for a in alert_group.alerts] == [
+            a.ends_at for a in expected.alerts
+        ]
+
+
+def test_lazy_timestamps_to_webhook_json(data_path):
+    raw = data_path.joinpath("payload-simple-01.json").read_bytes()
+
+    alert_group = AlertGroup.from_trusted_json(raw, lazy_timestamps=True)
+    alert_group.alerts[1].ends_at
+    data = json.loads(alert_group.to_webhook_json())
+
+    assert data["alerts"][0]["startsAt"] == "2020-11-03T17:51:36.14925565Z"
+    assert data["alerts"][1]["startsAt"] == "2020-11-03T17:51:36.14925565Z"
+    assert data["alerts"][1]["endsAt"] == "0001-01-01T00:00:00Z"
+    assert "starts_at" not in alert_group.alerts[0].__dict__
+
+
+@pytest.mark.slow
+def test_timestamps_benchmark(helpers):
+    raw = json.dumps(helpers.build_payload(alerts=5000, labels=20))
+    texts = [
+        f"2020-11-03T17:{i // 60 % 60:02}:{i % 60:02}.14925565Z" for i in range(5000)
+    ]
+
+    def read(alert_group):
+        return lambda: [alert.starts_at for alert in alert_group.alerts]
+
+    results = {
+        "pydantic parse_datetime 5000 distinct": min(
+            timeit.repeat(lambda: [parse_datetime(t) for t in texts], number=1, repeat=5)
+        ),
+        "parse_timestamp 5000 distinct uncached": min(
+            timeit.repeat(
+                lambda: [parse_timestamp.__wrapped__(t) for t in texts],
+                number=1,
+                repeat=5,
+            )
+        ),
+        "parse_timestamp 5000 cached": min(
+            timeit.repeat(lambda: [parse_timestamp(t) for t in texts], number=1, repeat=5)
+        ),
+        "from_trusted_json": min(
+            timeit.repeat(lambda: AlertGroup.from_trusted_json(raw), number=1, repeat=5)
+        ),
+        "from_trusted_json lazy": min(
+            timeit.repeat(
+                lambda: AlertGroup.from_trusted_json(raw, True), number=1, repeat=5
+            )
+        ),
+        "read starts_at of lazy group": min(
+            timeit.repeat(
+                lambda: read(AlertGroup.from_trusted_json(raw, True))(),
+                number=1,
+                repeat=5,
+            )
+        ),
+    }
+    helpers.wrapped_debug(results, "Parsing timestamps of 5000 alerts (seconds)")
+
+    assert results["parse_timestamp 5000 distinct uncached"] < (
+        results["pydantic parse_datetime 5000 distinct"]
+    )
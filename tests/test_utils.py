@@ -1,7 +1,12 @@
 # Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
 # Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
 
-from prometheus_alert_model.utils import intersect
+import sys
+import timeit
+
+import pytest
+
+from prometheus_alert_model.utils import DeepSizer, ElementCounter, intersect
 
 
 def test_intersect_none():
@@ -92,3 +97,96 @@ def test_intersect_multiple_v4():
         )
         == {"a": "a"}
     )
+
+
+def test_intersect_generator():
+    assert intersect(
+        {"a": "a", "b": "b", "c": "c"} if i % 2 else {"a": "a", "b": "b"}
+        for i in range(5)
+    ) == {"a": "a", "b": "b"}
+
+
+def test_intersect_generator_empty():
+    assert intersect(dct for dct in []) == {}
+
+
+def test_intersect_stops_early():
+    def dcts():
+        yield {"a": "a"}
+        yield {"b": "b"}
+        raise AssertionError("Should not be reached")
+
+    assert intersect(dcts()) == {}
+
+
+def test_intersect_does_not_mutate():
+    dcts = [{"a": "a", "b": "b"}, {"a": "a"}]
+
+    intersect(dcts)
+
+    assert dcts == [{"a": "a", "b": "b"}, {"a": "a"}]
+
+
+def _intersect_sets(list_of_dcts):
+    list_of_sets = [set(dct.items()) for dct in list_of_dcts]
+    return dict(list_of_sets[0].intersection(*list_of_sets[1:]))
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize(
+    "description, build",
+    [
+        ("empty", lambda i: {}),
+        ("full overlap", lambda i: {f"label_{j}": f"value_{j}" for j in range(40)}),
+        ("disjoint", lambda i: {f"label_{i}_{j}": f"value_{j}" for j in range(40)}),
+    ],
+)
+def test_intersect_benchmark(helpers, description, build):
+    dcts = [build(i) for i in range(5000)]
+
+    assert intersect(dcts) == _intersect_sets(dcts)
+
+    sets = min(timeit.repeat(lambda: _intersect_sets(dcts), number=1, repeat=5))
+    current = min(timeit.repeat(lambda: intersect(dcts), number=1, repeat=5))
+    helpers.wrapped_debug(
+        {"set based": sets, "intersect": current},
+        f"Intersecting 5000 dicts, {description} (seconds)",
+    )
+
+
+def test_element_counter():
+    counter = ElementCounter([{"a": "a", "b": "b"}, {"a": "a", "b": "c"}])
+
+    assert counter.total == 2
+    assert counter.common("a") == "a"
+    assert counter.common("b") is None
+    assert counter.common("c") is None
+    assert counter.intersection() == {"a": "a"}
+
+    counter.discard({"a": "a", "b": "c"})
+
+    assert counter.intersection() == {"a": "a", "b": "b"}
+
+    counter.decrement("b", "b")
+    counter.increment("b", "x")
+
+    assert counter.counts == {"a": {"a": 1}, "b": {"x": 1}}
+
+
+def test_element_counter_empty():
+    assert ElementCounter().intersection() == {}
+
+
+def test_deep_sizer():
+    shared = {"a": "x" * 100}
+    sizer = DeepSizer(exclude=[shared["a"]])
+
+    assert sizer.size([shared, shared]) == (
+        sys.getsizeof([]) + 2 * 8 + sys.getsizeof(shared) + sys.getsizeof("a")
+    )
+    assert sizer.size(shared) == 0
+
+    strings = ["".join(["a", "b"]), "".join(["a", "b"])]
+    assert sizer.size(*strings) == 2 * sys.getsizeof("ab")
+    assert sizer.duplicate_strings == 1
+    assert sizer.duplicate_string_bytes == sys.getsizeof("ab")
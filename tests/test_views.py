@@ -0,0 +1,128 @@
+# Copyright © 2020 Tim Schwenke <tim.and.trallnag+code@gmail.com>
+# Licensed under Apache License 2.0 <http://www.apache.org/licenses/LICENSE-2.0>
+
+import json
+import pickle
+import timeit
+import tracemalloc
+
+import pytest
+
+from prometheus_alert_model import AlertGroup
+from prometheus_alert_model.views import AlertGroupView, AlertView
+
+
+def test_from_json_matches_parse_raw(helpers, data_path):
+    raw = data_path.joinpath("payload-simple-01.json").read_bytes()
+
+    alert_group = AlertGroup.parse_raw(raw)
+    view = AlertGroupView.from_json(raw)
+    helpers.wrapped_debug(view)
+
+    assert view.group_key == alert_group.group_key
+    assert view.common_labels == alert_group.common_labels
+    assert view.truncated_alerts == 0
+    assert view.extra is None
+    for alert, alert_view in zip(alert_group.alerts, view.alerts):
+        assert alert_view.fingerprint == alert.fingerprint
+        assert alert_view.labels == alert.labels
+        assert alert_view.starts_at == alert.starts_at
+        assert alert_view.ends_at == alert.ends_at
+        assert alert_view.generator_url == alert.generator_url
+
+    assert view.to_group().dict() == alert_group.dict()
+    assert AlertGroupView.from_group(alert_group) == view
+
+
+def test_read_only(helpers):
+    view = AlertGroupView.from_obj(helpers.build_payload(alerts=2, labels=2))
+
+    with pytest.raises(AttributeError):
+        view.status = "resolved"  # type: ignore
+    with pytest.raises(AttributeError):
+        view.alerts[0].status = "resolved"  # type: ignore
+    with pytest.raises(AttributeError):
+        view.alerts[0].__dict__
+
+    assert pickle.loads(pickle.dumps(view)) == view
+
+
+def test_extra_fields(helpers):
+    payload = helpers.build_payload(alerts=2, labels=2)
+    payload["custom"] = "value"
+    payload["alerts"][0]["silencedBy"] = ["id"]
+
+    view = AlertGroupView.from_obj(payload)
+
+    assert view.extra == {"custom": "value"}
+    assert view.alerts[0].extra == {"silencedBy": ["id"]}
+    assert view.alerts[1].extra is None
+
+    alert_group = view.to_group()
+    assert alert_group.custom == "value"
+    assert alert_group.alerts[0].silencedBy == ["id"]
+    assert AlertGroupView.from_group(alert_group) == view
+
+
+def test_to_group_copies(helpers):
+    payload = helpers.build_payload(alerts=3, labels=4)
+    view = AlertGroupView.from_obj(payload)
+
+    alert_group = view.to_group()
+    alert_group.add(labels={"new": "label"})
+    alert_group.remove(labels="common_0")
+
+    assert "new" not in view.alerts[0].labels
+    assert "common_0" in view.common_labels
+    assert alert_group.alerts[0].specific_labels == {
+        "specific_0": "value_0_0",
+        "specific_1": "value_0_1",
+    }
+    assert AlertView.from_alert(alert_group.alerts[0]).labels["new"] == "label"
+
+
+@pytest.mark.slow
+def test_views_benchmark(helpers):
+    payload = helpers.build_payload(alerts=5000, labels=20)
+    raw = json.dumps(payload).encode()
+
+    def measure(build):
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        alert_group = build()
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return alert_group, (after - before) / 5000
+
+    alert_group, model_bytes = measure(lambda: AlertGroup.from_trusted_json(raw))
+    view, view_bytes = measure(lambda: AlertGroupView.from_json(raw))
+    alert, alert_view = alert_group.alerts[0], view.alerts[0]
+
+    def read(alert):
+        return lambda: (alert.fingerprint, alert.status, alert.labels, alert.starts_at)
+
+    results = {
+        "bytes per Alert incl. dicts": model_bytes,
+        "bytes per AlertView incl. dicts": view_bytes,
+        "object bytes Alert": (
+            alert.__sizeof__()
+            + alert.__dict__.__sizeof__()
+            + alert.__fields_set__.__sizeof__()
+        ),
+        "object bytes AlertView": alert_view.__sizeof__(),
+        "from_trusted_json": min(
+            timeit.repeat(lambda: AlertGroup.from_trusted_json(raw), number=1, repeat=5)
+        ),
+        "AlertGroupView.from_json": min(
+            timeit.repeat(lambda: AlertGroupView.from_json(raw), number=1, repeat=5)
+        ),
+        "1M reads of 4 attributes on Alert": min(
+            timeit.repeat(read(alert), number=250000, repeat=5)
+        ),
+        "1M reads of 4 attributes on AlertView": min(
+            timeit.repeat(read(alert_view), number=250000, repeat=5)
+        ),
+    }
+    helpers.wrapped_debug(results, "Alert and AlertView with 20 labels each")
+
+    assert view_bytes < model_bytes